@@ -0,0 +1,221 @@
+"""
+Times the wdc commands on synthetic histories of several sizes
+
+Usage: python -m benchmarks.commands_benchmark [--years 1 5 10] [--tasks-per-day 12] [--repeat 5]
+                                               [--no-process] [--output results.json] [--compare earlier.json]
+
+Every command is run in this process, once right after the in memory caches were cleared and then
+--repeat times with the caches kept like in wdc shell or wdc serve. Unless --no-process is given it is
+also run --repeat times as a new wdc process, the way shell hooks run it. The results are written as
+JSON to --output or to stdout. With --compare the medians are compared to the ones of an earlier run.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import wdc.helper.io as task_io
+from benchmarks.history import History, generate_history, temporary_home
+from wdc.helper import index
+from wdc.helper.daemon import run_command
+from wdc.runner import cli
+
+REPOSITORY = Path(__file__).resolve().parent.parent
+# Runs the wdc entry point in a new process with the arguments following it
+PROCESS_COMMAND = [sys.executable, '-c', 'import sys; sys.argv[0] = "wdc"; from wdc.client import main; main()']
+
+Command = Tuple[str, List[str]]
+
+
+def commands(history: History) -> List[Command]:
+    """
+    The benchmarked commands, working on the last days of the history like a user would
+
+    :param history: The generated history
+    :return: (name, arguments) pairs
+    """
+    last_day = history.last_day
+    month_start = f'{last_day[0:8]}01'
+    year_start = (date.fromisoformat(last_day) - timedelta(days=364)).isoformat()
+    task_id = history.task_ids[len(history.task_ids) // 2]
+
+    return [
+        ('calc', ['calc', '0800']),
+        ('start', ['start', '0700', '-d', last_day, '-t', 'benchmark', '-m', 'benchmark task']),
+        ('end', ['end', '-d', last_day, '-e', '2000']),
+        ('list', ['list', '-d', last_day]),
+        ('list month', ['list', '--from', month_start, '--to', last_day]),
+        ('info', ['info', task_id]),
+        ('amend', ['amend', task_id, '-m', 'benchmark amend']),
+        ('export month', ['export', '--from', month_start, '--to', last_day, '--pipe']),
+        ('export year', ['export', '--from', year_start, '--to', last_day, '--pipe', '--ndjson'])
+    ]
+
+
+def _seconds(function: Callable[[], int]) -> Tuple[float, int]:
+    start = time.perf_counter()
+    exit_code = function()
+
+    return time.perf_counter() - start, exit_code
+
+
+def _in_process(args: List[str]) -> int:
+    return run_command(cli, args)[2]
+
+
+def _new_process(home_dir: Path, args: List[str]) -> int:
+    # The wdc home directory is found in the home directory of the user
+    environment = dict(os.environ, HOME=str(home_dir.parent), PYTHONPATH=str(REPOSITORY))
+
+    return subprocess.run(PROCESS_COMMAND + args, env=environment, cwd=str(REPOSITORY),
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+
+
+def time_command(home_dir: Path, args: List[str], repeat: int, process: bool) -> Dict:
+    """
+    Times one command
+
+    :param home_dir: The wdc home directory holding the history
+    :param args: The command line arguments, without the program name
+    :param repeat: The number of timed runs
+    :param process: If True the command is also timed in new processes
+    :return: The timings in seconds and the exit code of the first run
+    """
+    task_io.month_cache().clear()
+    first, exit_code = _seconds(lambda: _in_process(args))
+    runs = [_seconds(lambda: _in_process(args))[0] for _ in range(repeat)]
+
+    result = {
+        'exit_code': exit_code,
+        'in_process_first_s': first,
+        'in_process_median_s': statistics.median(runs),
+        'in_process_min_s': min(runs)
+    }
+
+    if process:
+        runs = [_seconds(lambda: _new_process(home_dir, args))[0] for _ in range(repeat)]
+        result['process_median_s'] = statistics.median(runs)
+        result['process_min_s'] = min(runs)
+
+    return result
+
+
+def run_benchmarks(years: List[int], tasks_per_day: int, repeat: int, process: bool) -> List[Dict]:
+    """
+    Generates a history of every size and times all commands on it
+
+    :return: One result per history size and command
+    """
+    results = []
+
+    for history_years in years:
+        with temporary_home() as home_dir:
+            print(f'Writing {history_years} years with {tasks_per_day} tasks per day ...', file=sys.stderr)
+            history = generate_history(history_years, tasks_per_day)
+            size = sum(os.path.getsize(home_dir / name) for name in index.task_files(home_dir))
+
+            for name, args in commands(history):
+                result = {
+                    'years': history_years,
+                    'tasks': history.tasks,
+                    'rows': history.rows,
+                    'size_bytes': size,
+                    'command': name,
+                    'args': args
+                }
+                result.update(time_command(home_dir, args, repeat, process))
+                results.append(result)
+
+                if result['exit_code'] != 0:
+                    print(f'{name} exited with {result["exit_code"]}', file=sys.stderr)
+
+    return results
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(REPOSITORY), capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _version() -> str:
+    version_file = REPOSITORY / 'version'
+
+    return version_file.read_text().strip() if version_file.exists() else ''
+
+
+def print_table(results: List[Dict], earlier: List[Dict], file) -> None:
+    """
+    Prints the medians of the results, and how they compare to the earlier ones if given
+    """
+    earlier_results = {(result['years'], result['command']): result for result in earlier}
+    keys = ['in_process_median_s', 'process_median_s']
+
+    print(f'{"years":>5}  {"command":<14}{"in process":>14}{"new process":>14}', file=file)
+    for result in results:
+        line = f'{result["years"]:>5}  {result["command"]:<14}'
+        before = earlier_results.get((result['years'], result['command']), {})
+
+        for key in keys:
+            if key not in result:
+                line += f'{"-":>14}'
+            elif key in before and before[key] > 0:
+                line += f'{result[key] * 1000:>8.1f}{result[key] / before[key]:>5.2f}x'
+            else:
+                line += f'{result[key] * 1000:>11.1f} ms'
+
+        print(line, file=file)
+
+    if earlier:
+        print('Times in ms, followed by the ratio to the earlier run (above 1 is slower)', file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 5, 10])
+    parser.add_argument('--tasks-per-day', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-process', action='store_true', help='Do not time the commands in new processes')
+    parser.add_argument('--output', help='The file the JSON results are written to instead of stdout')
+    parser.add_argument('--compare', help='The JSON results of an earlier run')
+    arguments = parser.parse_args()
+
+    results = run_benchmarks(arguments.years, arguments.tasks_per_day, arguments.repeat, not arguments.no_process)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'version': _version(),
+        'revision': _revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'tasks_per_day': arguments.tasks_per_day,
+        'repeat': arguments.repeat,
+        'results': results
+    }
+
+    earlier = []
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            earlier = json.load(file)['results']
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print_table(results, earlier, sys.stdout)
+    else:
+        print_table(results, earlier, sys.stderr)
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Measures how long finding all versions of a task takes on a synthetic history
+
+Usage: python -m benchmarks.find_tasks_benchmark [--years 10] [--tasks-per-day 20] [--workers 4]
+
+The history is written by benchmarks.history to a temporary home directory that is removed afterwards.
+"""
+import argparse
+import os
+import time
+
+import wdc.helper.io as task_io
+from benchmarks.history import generate_history, temporary_home
+from wdc.helper import index
+
+
+def measure(function, *arguments) -> float:
+    start = time.perf_counter()
+    function(*arguments)
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--tasks-per-day', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    arguments = parser.parse_args()
+
+    with temporary_home() as home_dir:
+        print(f'Writing {arguments.years} years with {arguments.tasks_per_day} tasks per day ...')
+        history = generate_history(arguments.years, arguments.tasks_per_day)
+        task_id = history.task_ids[len(history.task_ids) // 2]
+        size = sum(os.path.getsize(home_dir / name) for name in index.task_files(home_dir))
+        print(f'{len(index.task_files(home_dir))} task files, {size / 2 ** 20:.1f} MiB')
+
+        def parse_everything():
+            for name in index.task_files(home_dir):
+                [task for task in task_io.read_task_file(home_dir / name) if task.id == task_id]
+
+        task_io.month_cache().max_entries = 0
+        results = [('scan, parsing every file', measure(parse_everything))]
+        for workers in sorted({1, arguments.workers}):
+            results.append((f'scan, {workers} worker(s)', measure(task_io.scan_tasks, task_id, workers)))
+        # Small histories are scanned in this process whatever the number of workers, the pool is measured anyway
+        threshold, task_io.PARALLEL_SCAN_BYTES = task_io.PARALLEL_SCAN_BYTES, 0
+        if arguments.workers > 1:
+            results.append((f'scan, {arguments.workers} worker processes',
+                            measure(task_io.scan_tasks, task_id, arguments.workers)))
+        task_io.PARALLEL_SCAN_BYTES = threshold
+        for workers in sorted({1, arguments.workers}):
+            results.append((f'index rebuild, {workers} worker(s)',
+                            measure(index.rebuild_id_index, home_dir, workers)))
+        results.append(('indexed lookup', measure(task_io.find_tasks, task_id)))
+
+        for name, seconds in results:
+            print(f'{name:<32}{seconds:>10.3f} s')
+
+
+if __name__ == '__main__':
+    main()
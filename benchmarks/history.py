@@ -0,0 +1,167 @@
+"""
+Writes a deterministic synthetic task history for the benchmarks
+
+The same arguments always produce the same task files. Every workday from Monday to Friday holds a
+sequence of back to back tasks, each written twice like wdc start and wdc end would do. Some tasks are
+amended later on, carry several tags or have long descriptions, some of which contain the delimiter and
+quote characters of the task files.
+"""
+import random
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, List, NamedTuple
+
+import wdc.helper.io as task_io
+from wdc.classes import WdcTask
+
+FIRST_DAY = date(2010, 1, 4)
+TAGS = ['dev', 'meeting', 'review', 'support', 'ops', 'docs', 'planning', 'travel']
+WORDS = ['fix', 'sync', 'customer', 'release', 'build', 'pipeline', 'backlog', 'interview', 'design',
+         'refactor', 'incident', 'budget', 'roadmap', 'migration', 'database', 'report']
+# The share of tasks with more than one tag, with a long description and amended later on
+MULTI_TAG_RATIO = 0.3
+LONG_DESCRIPTION_RATIO = 0.1
+AMEND_RATIO = 0.1
+
+
+class History(NamedTuple):
+    """
+    What has been written by generate_history
+
+    Attributes:
+        first_day -- The first date of the history
+        last_day -- The last date of the history
+        task_ids -- The id of one task per month, in the order of the months
+        tasks -- The number of tasks
+        rows -- The number of written rows, all versions of all tasks
+    """
+    first_day: str
+    last_day: str
+    task_ids: List[str]
+    tasks: int
+    rows: int
+
+
+@contextmanager
+def temporary_home() -> Iterator[Path]:
+    """
+    Points wdc to an empty temporary home directory, which is removed afterwards
+    """
+    home_dir = task_io.HOME_DIR_PATH
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        task_io.HOME_DIR_PATH = Path(temp_dir) / '.wdc'
+        task_io.HOME_DIR_PATH.mkdir()
+        task_io.month_cache().clear()
+        try:
+            yield task_io.HOME_DIR_PATH
+        finally:
+            task_io.HOME_DIR_PATH = home_dir
+            task_io.month_cache().clear()
+
+
+def _milliseconds(day: date, minute_of_day: int) -> int:
+    moment = datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(minutes=minute_of_day)
+
+    return int(moment.timestamp() * 1000)
+
+
+def _hhmm(minute_of_day: int) -> str:
+    return f'{minute_of_day // 60:02d}{minute_of_day % 60:02d}'
+
+
+def _description(generator: random.Random) -> str:
+    if generator.random() < LONG_DESCRIPTION_RATIO:
+        sentences = [' '.join(generator.choices(WORDS, k=12)) for _ in range(generator.randint(3, 8))]
+        # Now and then with the characters the task files have to quote
+        separator = generator.choice(['. ', '; ', '. ', ' | '])
+        return separator.join(sentences)
+
+    return ' '.join(generator.choices(WORDS, k=generator.randint(2, 6)))
+
+
+def _tags(generator: random.Random) -> str:
+    if generator.random() < MULTI_TAG_RATIO:
+        return ','.join(sorted(generator.sample(TAGS, generator.randint(2, 3))))
+
+    return generator.choice(TAGS)
+
+
+def _day_versions(generator: random.Random, day: date, tasks_per_day: int, amends: list) -> Iterator[WdcTask]:
+    minute = 7 * 60 + generator.randrange(90)
+
+    for _ in range(tasks_per_day):
+        task_id = f'{generator.getrandbits(32):08x}'
+        start = minute
+        minute = min(minute + generator.randrange(15, 90), 24 * 60 - 1)
+        tags = _tags(generator)
+        description = _description(generator)
+        started = WdcTask(task_id, day.isoformat(), _hhmm(start), '', tags, description,
+                          str(_milliseconds(day, start)))
+
+        yield started
+        ended = WdcTask(task_id, started.date, started.start, _hhmm(minute), tags, description,
+                        str(_milliseconds(day, minute)))
+        yield ended
+
+        if generator.random() < AMEND_RATIO:
+            amends.append(ended)
+
+
+def _amended(generator: random.Random, task: WdcTask, day: date) -> WdcTask:
+    # Written at the end of the workday it was amended on, or right after the task if that ended later
+    timestamp = max(_milliseconds(day, 18 * 60), int(task.timestamp)) + 1 + generator.randrange(60000)
+
+    return WdcTask(task.id, task.date, task.start, task.end, _tags(generator), f'{task.description} (amended)',
+                   str(timestamp))
+
+
+def _versions(generator: random.Random, days: int, tasks_per_day: int, history: dict) -> Iterator[WdcTask]:
+    amends: List[WdcTask] = []
+
+    for day_number in range(days):
+        day = FIRST_DAY + timedelta(days=day_number)
+        if day.weekday() >= 5:
+            continue
+
+        month = day.isoformat()[0:7]
+        if amends and amends[0].date[0:7] != month:
+            # Amends never cross a month so that every task file is written once
+            amends.clear()
+
+        for task in _day_versions(generator, day, tasks_per_day, amends):
+            history['rows'] += 1
+            if task.end == '':
+                history['tasks'] += 1
+                if month not in history['task_ids']:
+                    history['task_ids'][month] = task.id
+            yield task
+
+        while amends and generator.random() < 0.5:
+            history['rows'] += 1
+            yield _amended(generator, amends.pop(generator.randrange(len(amends))), day)
+
+        history['last_day'] = day.isoformat()
+
+
+def generate_history(years: int, tasks_per_day: int = 12, seed: int = 0) -> History:
+    """
+    Writes the synthetic history into the current wdc home directory, see temporary_home
+
+    :param years: The number of years, starting at FIRST_DAY
+    :param tasks_per_day: The number of tasks of every workday
+    :param seed: Selects one of the possible histories of the same size
+    :return: A summary of the written history
+    """
+    generator = random.Random(f'{years}:{tasks_per_day}:{seed}')
+    history = {'rows': 0, 'tasks': 0, 'task_ids': {}, 'last_day': ''}
+
+    task_io.write_tasks(_versions(generator, years * 365, tasks_per_day, history))
+
+    return History(first_day=FIRST_DAY.isoformat(),
+                   last_day=history['last_day'],
+                   task_ids=list(history['task_ids'].values()),
+                   tasks=history['tasks'],
+                   rows=history['rows'])
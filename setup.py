@@ -32,7 +32,7 @@ setup(
         'wdc.controller'
     ],
     entry_points={
-        'console_scripts': ['wdc = wdc.runner:cli']
+        'console_scripts': ['wdc = wdc.client:main']
     },
     description='Command line work day helper and logger',
     long_description=long_description,
@@ -47,7 +47,8 @@ setup(
     install_requires=[
         'click',
         'termtables',
-        'colored'
+        'colored',
+        'toml; python_version < "3.11"'
     ],
 
     classifiers=[
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import patch
+
+from freezegun import freeze_time
+
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.controller import balance
+from wdc.controller.balance import calculate_balance, count_workdays, first_date
+from wdc.helper.io import write_task, write_tasks
+from wdc.helper.storage import get_storage
+
+
+class CountWorkdaysFixture(unittest.TestCase):
+    def test_valid(self):
+        # 2020-10-26 is a Monday
+        self.assertEqual(5, count_workdays('2020-10-26', '2020-11-01'))
+        self.assertEqual(0, count_workdays('2020-10-31', '2020-11-01'))
+        self.assertEqual(1, count_workdays('2020-10-30', '2020-10-30'))
+        self.assertEqual(22, count_workdays('2020-10-01', '2020-10-31'))
+        self.assertEqual(262, count_workdays('2020-01-01', '2020-12-31'))
+
+    def test_empty_range(self):
+        self.assertEqual(0, count_workdays('2020-10-31', '2020-10-01'))
+
+
+@freeze_time('2020-12-15')
+class CalculateBalanceFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        write_tasks([
+            create_task('a', '2020-10-30', '1', end='1700'),
+            create_task('b', '2020-10-31', '1', start='1000', end='1100'),
+            create_task('c', '2020-11-02', '1', end='1600'),
+            create_task('d', '2020-12-14', '1', end='1615')
+        ])
+
+    def test_balance(self):
+        result = calculate_balance('2020-10-30', '2020-12-14')
+
+        self.assertEqual(32, result.workdays)
+        self.assertEqual(32 * 495, result.expected)
+        self.assertEqual(540 + 60 + 480 + 495, result.logged)
+        self.assertEqual(result.logged - result.expected, result.balance)
+
+    def test_parameters(self):
+        result = calculate_balance('2020-10-30', '2020-10-30', '0800', 0)
+
+        self.assertEqual(480, result.expected)
+        self.assertEqual(60, result.balance)
+
+    def test_closed_months_checkpointed(self):
+        calculate_balance('2020-10-01', '2020-12-15')
+
+        with patch('wdc.controller.balance.read_day_totals', wraps=balance.read_day_totals) as mock_reader:
+            result = calculate_balance('2020-10-01', '2020-12-15')
+
+            self.assertEqual(['202012'], [c.args[0] for c in mock_reader.call_args_list])
+            self.assertEqual(540 + 60 + 480 + 495, result.logged)
+
+    def test_changed_month_read_again(self):
+        calculate_balance('2020-10-01', '2020-12-15')
+        write_task(create_task('e', '2020-11-03', '1', end='0900'))
+
+        with patch('wdc.controller.balance.read_day_totals', wraps=balance.read_day_totals) as mock_reader:
+            result = calculate_balance('2020-10-01', '2020-12-15')
+
+            self.assertEqual(['202011', '202012'], [c.args[0] for c in mock_reader.call_args_list])
+            self.assertEqual(540 + 60 + 480 + 60 + 495, result.logged)
+
+    def test_checkpoints_of_other_storage_ignored(self):
+        # The signatures of different storages can be equal although their tasks are not
+        with patch('wdc.controller.balance.month_signature', return_value=(1, 1)):
+            calculate_balance('2020-10-01', '2020-12-15')
+
+            (self.home_path / 'settings.toml').write_text('[storage]\nbackend = "sqlite"\n')
+            sqlite_storage = get_storage()
+            self.addCleanup(sqlite_storage.close)
+            sqlite_storage.write_task(create_task('e', '2020-11-03', '1', end='0900'))
+
+            self.assertEqual(60, calculate_balance('2020-10-01', '2020-12-15').logged)
+
+    def test_first_date(self):
+        self.assertEqual('2020-10-01', first_date())
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, calculate_balance, '2020-12-01', '2020-10-01')
+        self.assertRaises(ValueError, calculate_balance, '2020.10.01', '2020-12-01')
+        self.assertRaises(ValueError, calculate_balance, '2020-10-01', '2020-12-01', '2400')
@@ -0,0 +1,154 @@
+import os
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.helper.cache import MonthCache
+from wdc.helper.io import month_cache, read_all_tasks, read_day_tasks, write_task, write_tasks
+from wdc.helper.task_file import file_signature, parse_rows
+
+
+class MonthCacheFixture(unittest.TestCase):
+    def setUp(self):
+        self.cache = MonthCache(max_entries=2, max_bytes=100)
+
+    def test_signature_mismatch(self):
+        self.cache.put(Path('a'), (10, 1), None, [create_task('1', '2020-10-01', '11')])
+
+        self.assertEqual(1, len(self.cache.get(Path('a'), (10, 1))))
+        self.assertIsNone(self.cache.get(Path('a'), (10, 2)))
+        # Outdated entries are kept so that parsing can be continued where they end
+        self.assertEqual((10, 1), self.cache.entry(Path('a')).signature)
+
+    def test_entry_bound(self):
+        self.cache.put(Path('a'), (10, 1), None, [])
+        self.cache.put(Path('b'), (10, 1), None, [])
+        self.cache.get(Path('a'), (10, 1))
+        self.cache.put(Path('c'), (10, 1), None, [])
+
+        self.assertIsNotNone(self.cache.get(Path('a'), (10, 1)))
+        self.assertIsNone(self.cache.get(Path('b'), (10, 1)))
+        self.assertIsNotNone(self.cache.get(Path('c'), (10, 1)))
+
+    def test_memory_bound(self):
+        self.cache.put(Path('a'), (60, 1), None, [])
+        self.cache.put(Path('b'), (60, 1), None, [])
+
+        self.assertIsNone(self.cache.get(Path('a'), (60, 1)))
+        self.assertEqual(60, self.cache.size)
+
+        self.cache.put(Path('c'), (200, 1), None, [])
+        self.assertIsNone(self.cache.get(Path('c'), (200, 1)))
+
+    def test_extend(self):
+        self.cache.put(Path('a'), (10, 1), None, [create_task('1', '2020-10-01', '11')])
+
+        self.cache.extend(Path('a'), (10, 1), (20, 2), None, [create_task('2', '2020-10-01', '12')])
+
+        self.assertEqual(['1', '2'], [t.id for t in self.cache.get(Path('a'), (20, 2))])
+        self.assertEqual(20, self.cache.size)
+
+    def test_extend_outdated(self):
+        self.cache.put(Path('a'), (10, 1), None, [])
+
+        self.cache.extend(Path('a'), (15, 1), (20, 2), None, [create_task('2', '2020-10-01', '12')])
+
+        self.assertEqual(0, len(self.cache))
+
+
+class CachedReadFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        write_task(create_task('task1', '2020-10-01', '11'))
+        write_task(create_task('task2', '2020-10-02', '12'))
+
+    def test_parsed_once(self):
+        read_all_tasks('2020-10-01')
+
+        with patch('wdc.helper.io.parse_rows') as mock_reader:
+            result = read_all_tasks('2020-10-01')
+            day_result = read_day_tasks('2020-10-02')
+
+            mock_reader.assert_not_called()
+
+        self.assertEqual(['task1', 'task2'], [t.id for t in result])
+        self.assertEqual(['task2'], [t.id for t in day_result])
+
+    def test_append_extends_entry(self):
+        read_all_tasks('2020-10-01')
+        task = create_task('task3', '2020-10-01', '13')
+        write_task(task)
+        task.end = '0900'
+
+        with patch('wdc.helper.io.parse_rows') as mock_reader:
+            result = read_all_tasks('2020-10-01')
+
+            mock_reader.assert_not_called()
+
+        self.assertEqual(['task1', 'task2', 'task3'], [t.id for t in result])
+        self.assertEqual('', result[2].end)
+
+    def test_only_appended_rows_parsed(self):
+        read_all_tasks('2020-10-01')
+
+        with open(str(self.home_path / '202010.csv'), 'a') as file:
+            file.write('task3;2020-10-01;0800;1000;t1;manual edit;13\r\n')
+
+        with patch('wdc.helper.io.parse_rows', wraps=parse_rows) as mock_parser:
+            result = read_all_tasks('2020-10-01')
+
+            self.assertEqual(1, mock_parser.call_count)
+            self.assertEqual(b'task3;2020-10-01;0800;1000;t1;manual edit;13\r\n', mock_parser.call_args.args[0])
+
+        self.assertEqual(['task1', 'task2', 'task3'], [t.id for t in result])
+
+    def test_changed_prefix_parsed_again(self):
+        read_all_tasks('2020-10-01')
+
+        with open(str(self.home_path / '202010.csv'), 'rb') as file:
+            content = file.read()
+        with open(str(self.home_path / '202010.csv'), 'wb') as file:
+            file.write(content.replace(b'task1', b'taskX') + b'task3;2020-10-01;0800;1000;t1;manual edit;13\r\n')
+
+        self.assertEqual(['taskX', 'task2', 'task3'], [t.id for t in read_all_tasks('2020-10-01')])
+
+    def test_changed_middle_parsed_again(self):
+        write_tasks([create_task(f'task{i}', '2020-10-03', str(100 + i), description='ddddd') for i in range(400)])
+        file_path = self.home_path / '202010.csv'
+        self.assertGreater(file_path.stat().st_size, 8 * 1024)
+
+        for task_id, appended in (('task200', b''), ('task201', b'task3;2020-10-01;0800;1000;t1;manual edit;13\r\n')):
+            with self.subTest(appended=appended):
+                read_all_tasks('2020-10-01')
+                content = file_path.read_bytes()
+                middle = content.index(f'{task_id};'.encode())
+                edited = content[:middle] + content[middle:].replace(b'ddddd', b'XXXXX', 1)
+                mtime = file_path.stat().st_mtime_ns
+                file_path.write_bytes(edited + appended)
+                # Coarse file system clocks could leave the modification time as it was
+                os.utime(str(file_path), ns=(mtime + 1000, mtime + 1000))
+
+                result = read_all_tasks('2020-10-01')
+
+                self.assertEqual('XXXXX', next(t for t in result if t.id == task_id).description)
+                self.assertEqual(bool(appended), result[-1].id == 'task3')
+
+    def test_shrunk_file_parsed_again(self):
+        read_all_tasks('2020-10-01')
+
+        with open(str(self.home_path / '202010.csv'), 'w') as file:
+            file.write('task3;2020-10-01;0800;1000;t1;manual edit;13\r\n')
+
+        self.assertEqual(['task3'], [t.id for t in read_all_tasks('2020-10-01')])
+
+    def test_external_change(self):
+        read_all_tasks('2020-10-01')
+
+        with open(str(self.home_path / '202010.csv'), 'a') as file:
+            file.write('task3;2020-10-01;0800;1000;t1;manual edit;13\r\n')
+
+        self.assertEqual(['task1', 'task2', 'task3'], [t.id for t in read_all_tasks('2020-10-01')])
+        file_path = self.home_path / '202010.csv'
+        self.assertEqual(3, len(month_cache().get(file_path, file_signature(file_path))))
@@ -1,6 +1,6 @@
 import unittest
 
-from wdc.calculator import calc_workday_end
+from wdc.calculator import calc_workday_end, calc_workday_ends, calc_batch, parse_batch_line, BATCH_SIZE
 
 
 class CalculatorFixture(unittest.TestCase):
@@ -16,3 +16,46 @@ class CalculatorFixture(unittest.TestCase):
             with self.subTest(scenario):
                 result = calc_workday_end(scenario[0], scenario[1], scenario[2])
                 self.assertEqual(str(result), scenario[3])
+
+
+class CalculatorBatchFixture(unittest.TestCase):
+    def test_workday_ends(self):
+        result = calc_workday_ends([480, 480, 1380], [30, 0, 30], [465, 465, 120])
+        self.assertEqual([975, 945, 90], result)
+
+    def test_parse_batch_line(self):
+        scenarios = [
+            ('0800', (480, 30, 465)),
+            ('0800 45', (480, 45, 465)),
+            ('0800;45;0800', (480, 45, 480)),
+            ('0800, 0, 0600\n', (480, 0, 360)),
+        ]
+
+        for line, expected in scenarios:
+            with self.subTest(line):
+                self.assertEqual(expected, parse_batch_line(line, 1, 30, 465))
+
+    def test_parse_batch_line_invalid(self):
+        for line in ['0860', '0800 -5', '0800 30 2500', '0800 30 0745 1', 'abc']:
+            with self.subTest(line):
+                with self.assertRaises(ValueError):
+                    parse_batch_line(line, 1, 30, 465)
+
+    def test_calc_batch_matches_single(self):
+        lines = ['0800', '', '0715 45', '2330;30;0200']
+        result = list(calc_batch(lines))
+
+        self.assertEqual([str(calc_workday_end('0800', 30, '0745')),
+                          str(calc_workday_end('0715', 45, '0745')),
+                          str(calc_workday_end('2330', 30, '0200'))], result)
+
+    def test_calc_batch_across_chunks(self):
+        lines = ['0800'] * (BATCH_SIZE + 10)
+        result = list(calc_batch(lines, 0, '0100'))
+
+        self.assertEqual(BATCH_SIZE + 10, len(result))
+        self.assertTrue(all(end == '0900' for end in result))
+
+    def test_calc_batch_invalid_line(self):
+        with self.assertRaisesRegex(ValueError, 'Line 2'):
+            list(calc_batch(['0800', '0860']))
@@ -1,11 +1,17 @@
+import json
+import subprocess
+import sys
 import unittest
 from unittest.mock import patch
 from click.testing import CliRunner
 
-from wdc.controller.export_import import ExportType
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.controller.balance import WorkBalance
+from wdc.controller.export_import import ExportType, ImportSummary
 from wdc.controller.work_day import WdcTaskInfo
 from wdc.classes import WdcTask
-from wdc.runner import cli, task_to_printout, print_info
+from wdc.helper.io import write_tasks
+from wdc.runner import cli, task_to_printout, tasks_to_printout, print_info
 from freezegun import freeze_time
 
 
@@ -43,6 +49,29 @@ class CalcCommandFixture(unittest.TestCase):
         result = self.cli_runner.invoke(cli, ['calc', '0800', '-d', '0860'])
         self.assertIn('0860 is not a valid time', result.output)
 
+    def test_batch_from_stdin(self):
+        result = self.cli_runner.invoke(cli, ['calc', '--batch', '-'], input='0800\n0800 45\n0800;0;0800\n')
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual('1615\n1630\n1600\n', result.output)
+
+    def test_batch_uses_options_as_defaults(self):
+        result = self.cli_runner.invoke(cli, ['calc', '--batch', '-', '-b', '0', '-d', '0800'], input='0800\n')
+        self.assertEqual('1600\n', result.output)
+
+    def test_batch_invalid_line(self):
+        result = self.cli_runner.invoke(cli, ['calc', '--batch', '-'], input='0800\n0860\n')
+        self.assertEqual(1, result.exit_code)
+        self.assertIn('Line 2: 0860 is not a valid time', result.output)
+
+    def test_batch_with_start(self):
+        result = self.cli_runner.invoke(cli, ['calc', '0800', '--batch', '-'], input='0800\n')
+        self.assertEqual(2, result.exit_code)
+
+    def test_missing_start(self):
+        result = self.cli_runner.invoke(cli, ['calc'])
+        self.assertEqual(2, result.exit_code)
+        self.assertIn('WORKDAY_START', result.output)
+
 
 class StartWorkTaskFixture(unittest.TestCase):
     def setUp(self):
@@ -156,6 +185,43 @@ class ListWorkTasksFixture(unittest.TestCase):
 
         self.assertIn('No tasks found', result.output)
 
+    @patch('wdc.runner.list_tasks_in_range')
+    def test_range(self, mock_controller):
+        mock_controller.return_value = iter([
+            WdcTask(
+                id='test_id',
+                date='2020-10-25',
+                start='0800',
+                end='0900',
+                tags='t1',
+                description='test_description',
+                timestamp='11'
+            )
+        ])
+
+        result = self.cli_runner.invoke(cli, ['list', '--from', '2020-10-01', '--to', '2020-10-31'])
+
+        self.assertEqual(0, result.exit_code)
+        mock_controller.assert_called_with('2020-10-01', '2020-10-31', False)
+        self.assertIn('│ test_id │ 2020-10-25 │ 08:00 │ 09:00 │ t1   │ test_descr.. │', result.output)
+
+    @patch('wdc.runner.today')
+    @patch('wdc.runner.list_tasks_in_range')
+    def test_range_until_today(self, mock_controller, mock_today):
+        mock_today.return_value = '2020-10-25'
+        mock_controller.return_value = iter([])
+
+        result = self.cli_runner.invoke(cli, ['list', '--from', '2020-10-01'])
+
+        mock_controller.assert_called_with('2020-10-01', '2020-10-25', False)
+        self.assertIn('No tasks found', result.output)
+
+    def test_invalid_range(self):
+        self.assertNotEqual(0, self.cli_runner.invoke(cli, ['list', '--to', '2020-10-31']).exit_code)
+        self.assertNotEqual(0, self.cli_runner.invoke(cli, ['list', '--from', '2020.10.01']).exit_code)
+        result = self.cli_runner.invoke(cli, ['list', '--from', '2020-10-31', '--to', '2020-10-01'])
+        self.assertNotEqual(0, result.exit_code)
+
 
 class HelperFunctionsFixture(unittest.TestCase):
     def test_ttask_to_printout_valid(self):
@@ -173,6 +239,16 @@ class HelperFunctionsFixture(unittest.TestCase):
 
         self.assertSequenceEqual(result, ['testId', '2020-10-25', '08:00', '09:00', 't1', 'testDescri..'])
 
+    def test_tasks_to_printout_open_task(self):
+        tasks = [create_task('task1', '2020-10-25', start='0800', end='0900'),
+                 create_task('task2', '2020-10-25', start='0930'),
+                 create_task('task3', '2020-10-25', start='1000', end='1130')]
+
+        result = tasks_to_printout(iter(tasks))
+
+        self.assertEqual([task_to_printout(task) for task in tasks], result)
+        self.assertEqual(['09:30', '', '10:00', '11:30'], result[1][2:4] + result[2][2:4])
+
 
 class InfoCommandFixture(unittest.TestCase):
     def setUp(self):
@@ -320,7 +396,7 @@ class ExportCommandFixture(unittest.TestCase):
     def setUp(self):
         self.cli_runner = CliRunner()
 
-    @patch('wdc.runner.export_tasks')
+    @patch('wdc.controller.export_import.export_tasks')
     def test_no_options(self, mock_controller):
         result = self.cli_runner.invoke(cli, ['export'])
 
@@ -337,7 +413,7 @@ class ExportCommandFixture(unittest.TestCase):
         # Assert that only the latest task version are requested
         self.assertFalse(call_args['export_all'])
 
-    @patch('wdc.runner.export_tasks')
+    @patch('wdc.controller.export_import.export_tasks')
     def test_all_options_given(self, mock_controller):
         result = self.cli_runner.invoke(cli,
                                         ['export', '-d', '2020-10-25', '-o', 'export_today.csv', '--csv', '--raw'])
@@ -355,6 +431,226 @@ class ExportCommandFixture(unittest.TestCase):
         # Assert that the RAW flag is set to true
         self.assertTrue(call_args['export_all'])
 
+    @patch('wdc.controller.export_import.export_tasks')
+    def test_range(self, mock_controller):
+        result = self.cli_runner.invoke(cli, ['export', '--from', '2020-10-01', '--to', '2020-10-31'])
+
+        self.assertEqual(0, result.exit_code)
+
+        call_args = mock_controller.call_args.kwargs
+
+        self.assertEqual('2020-10-01', call_args['date'])
+        self.assertEqual('2020-10-31', call_args['date_to'])
+
+    @patch('wdc.controller.export_import.export_tasks')
+    def test_pipe_writes_to_stdout(self, mock_controller):
+        mock_controller.side_effect = lambda **kwargs: kwargs['output'].write('[]')
+
+        result = self.cli_runner.invoke(cli, ['export', '--pipe'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual('[]\n', result.output)
+
+    @patch('wdc.controller.export_import.export_tasks')
+    def test_ndjson(self, mock_controller):
+        self.cli_runner.invoke(cli, ['export', '--ndjson'])
+
+        self.assertEqual(ExportType.NDJSON, mock_controller.call_args.kwargs['export_to'])
+        self.assertIsNone(mock_controller.call_args.kwargs['output'])
+
+    @patch('wdc.controller.export_import.export_tasks')
+    def test_jobs_and_split(self, mock_controller):
+        result = self.cli_runner.invoke(cli, ['export', '--from', '2020-01-01', '-j', '4', '--split'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(4, mock_controller.call_args.kwargs['jobs'])
+        self.assertTrue(mock_controller.call_args.kwargs['split'])
+
+    @patch('wdc.controller.export_import.export_tasks')
+    def test_invalid_jobs_and_split(self, mock_controller):
+        with self.subTest('no jobs'):
+            result = self.cli_runner.invoke(cli, ['export', '--jobs', '0'])
+            self.assertEqual(2, result.exit_code)
+
+        with self.subTest('split into stdout'):
+            result = self.cli_runner.invoke(cli, ['export', '--split', '--pipe'])
+            self.assertEqual(2, result.exit_code)
+
+        mock_controller.assert_not_called()
+
+
+class ImportCommandFixture(unittest.TestCase):
+    def setUp(self):
+        self.cli_runner = CliRunner()
+
+    @patch('wdc.controller.export_import.import_tasks')
+    def test_json_from_stdin(self, mock_controller):
+        mock_controller.return_value = ImportSummary(3, 2, 1, 0)
+
+        result = self.cli_runner.invoke(cli, ['import', '-'], input='[]')
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(ExportType.JSON, mock_controller.call_args.args[1])
+        self.assertEqual('', mock_controller.call_args.args[2])
+        self.assertIn('2 of 3 tasks imported', result.output)
+        self.assertIn('1 tasks were already stored', result.output)
+
+    @patch('wdc.controller.export_import.import_tasks')
+    def test_csv(self, mock_controller):
+        mock_controller.return_value = ImportSummary(0, 0, 0, 0)
+
+        with self.cli_runner.isolated_filesystem():
+            with open('export.csv', 'w') as file:
+                file.write('')
+
+            self.cli_runner.invoke(cli, ['import', 'export.csv'])
+            self.assertEqual(ExportType.CSV, mock_controller.call_args.args[1])
+
+            self.cli_runner.invoke(cli, ['import', '--csv', '-'], input='')
+            self.assertEqual(ExportType.CSV, mock_controller.call_args.args[1])
+
+    @patch('wdc.controller.export_import.import_tasks')
+    def test_date_of_older_exports(self, mock_controller):
+        mock_controller.return_value = ImportSummary(1, 1, 0, 0)
+
+        result = self.cli_runner.invoke(cli, ['import', '--date', '2020-10-01', '-'], input='[]')
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual('2020-10-01', mock_controller.call_args.args[2])
+        self.assertNotEqual(0, self.cli_runner.invoke(cli, ['import', '-d', '2020.10.01', '-'], input='[]').exit_code)
+
+    @patch('wdc.controller.export_import.import_tasks')
+    def test_invalid_file(self, mock_controller):
+        mock_controller.side_effect = ValueError('The import file is not a valid JSON export')
+
+        result = self.cli_runner.invoke(cli, ['import', '-'], input='[')
+
+        self.assertEqual(1, result.exit_code)
+        self.assertIn('not a valid JSON export', result.output)
+
+
+class CompactCommandFixture(unittest.TestCase):
+    def setUp(self):
+        self.cli_runner = CliRunner()
+
+    @patch('wdc.controller.maintenance.compact_tasks')
+    def test_no_options(self, mock_controller):
+        mock_controller.return_value = [('202010', 5, 3)]
+
+        result = self.cli_runner.invoke(cli, ['compact'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(('', 1), mock_controller.call_args.args)
+        self.assertIn('202010: 5 rows compacted to 3', result.output)
+
+    @patch('wdc.controller.maintenance.compact_tasks')
+    def test_all_options_given(self, mock_controller):
+        mock_controller.return_value = []
+
+        result = self.cli_runner.invoke(cli, ['compact', '--month', '202010', '--keep', '3'])
+
+        self.assertEqual(('202010', 3), mock_controller.call_args.args)
+        self.assertIn('No tasks found', result.output)
+
+    def test_invalid_month(self):
+        result = self.cli_runner.invoke(cli, ['compact', '-m', '2020-10'])
+
+        self.assertEqual(2, result.exit_code)
+
+    def test_invalid_keep(self):
+        result = self.cli_runner.invoke(cli, ['compact', '-k', '0'])
+
+        self.assertEqual(2, result.exit_code)
+
+
+class MigrateCommandFixture(unittest.TestCase):
+    def setUp(self):
+        self.cli_runner = CliRunner()
+
+    @patch('wdc.controller.maintenance.migrate_tasks')
+    def test_valid(self, mock_controller):
+        mock_controller.return_value = 42
+
+        result = self.cli_runner.invoke(cli, ['migrate', 'csv', 'sqlite'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(('csv', 'sqlite'), mock_controller.call_args.args)
+        self.assertIn('42 tasks copied from csv to sqlite', result.output)
+
+    def test_unknown_backend(self):
+        result = self.cli_runner.invoke(cli, ['migrate', 'csv', 'mongo'])
+
+        self.assertEqual(2, result.exit_code)
+
+
+class ReportCommandFixture(unittest.TestCase):
+    def setUp(self):
+        self.cli_runner = CliRunner()
+
+    @freeze_time('2020-10-25')
+    @patch('wdc.controller.report.build_report')
+    def test_no_options(self, mock_controller):
+        mock_controller.return_value = [('dev', 605), ('meeting', 45)]
+
+        result = self.cli_runner.invoke(cli, ['report'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(('2020-10-01', '2020-10-25', 'tag'), mock_controller.call_args.args)
+        self.assertIn('│ dev     │ 10:05    │', result.output)
+        self.assertIn('│ meeting │ 0:45     │', result.output)
+
+    @patch('wdc.controller.report.build_report')
+    def test_all_options_given(self, mock_controller):
+        mock_controller.return_value = []
+
+        result = self.cli_runner.invoke(cli, ['report', '-g', 'week', '--from', '2020-01-01', '--to', '2020-12-31'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(('2020-01-01', '2020-12-31', 'week'), mock_controller.call_args.args)
+        self.assertIn('No tasks found', result.output)
+
+    def test_unknown_grouping(self):
+        result = self.cli_runner.invoke(cli, ['report', '-g', 'decade'])
+
+        self.assertEqual(2, result.exit_code)
+
+
+class BalanceCommandFixture(unittest.TestCase):
+    def setUp(self):
+        self.cli_runner = CliRunner()
+
+    @freeze_time('2020-10-25')
+    @patch('wdc.controller.balance.first_date')
+    @patch('wdc.controller.balance.calculate_balance')
+    def test_no_options(self, mock_controller, mock_first_date):
+        mock_first_date.return_value = '2020-10-01'
+        mock_controller.return_value = WorkBalance('2020-10-01', '2020-10-25', 17, 17 * 495, 17 * 495 - 75)
+
+        result = self.cli_runner.invoke(cli, ['balance'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(('2020-10-01', '2020-10-25', '0745', 30), mock_controller.call_args.args)
+        self.assertIn('│ 2020-10-01 │ 2020-10-25 │ 17       │ 140:15   │ 139:00 │ -1:15   │', result.output)
+
+    @patch('wdc.controller.balance.first_date')
+    def test_no_tasks(self, mock_first_date):
+        mock_first_date.return_value = ''
+
+        result = self.cli_runner.invoke(cli, ['balance'])
+
+        self.assertIn('No tasks found', result.output)
+
+    @patch('wdc.controller.balance.calculate_balance')
+    def test_all_options_given(self, mock_controller):
+        mock_controller.return_value = WorkBalance('2020-10-01', '2020-10-31', 22, 22 * 480, 22 * 480 + 5)
+
+        result = self.cli_runner.invoke(cli, ['balance', '--from', '2020-10-01', '--to', '2020-10-31',
+                                              '-b', '0', '-d', '0800'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual(('2020-10-01', '2020-10-31', '0800', 0), mock_controller.call_args.args)
+        self.assertIn('+0:05', result.output)
+
 
 class PrintHelperFixture(unittest.TestCase):
     """
@@ -366,3 +662,92 @@ class PrintHelperFixture(unittest.TestCase):
         print_info('Test message')
 
         mock_print.assert_called_with('\n\x1b[38;5;0m\x1b[48;5;164minfo: Test message \x1b[0m\n')
+
+
+class TimingOptionsFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cli_runner = CliRunner(mix_stderr=False)
+
+        write_tasks([WdcTask('t1', '2020-10-25', '0800', '', 'dev', 'first', '1'),
+                     WdcTask('t1', '2020-10-25', '0800', '0900', 'dev', 'first', '2')])
+
+    def test_timing_json(self):
+        result = self.cli_runner.invoke(cli, ['--timing', 'json', 'list', '-d', '2020-10-25'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertIn('t1', result.stdout)
+
+        report = json.loads(result.stderr)
+        self.assertEqual('list', report['command'])
+        self.assertGreater(report['bytes_read'], 0)
+        self.assertGreater(report['files_opened'], 0)
+        self.assertGreater(report['seconds']['render'], 0.0)
+        self.assertAlmostEqual(report['total_seconds'], sum(report['seconds'].values()))
+
+    def test_timing_text(self):
+        result = self.cli_runner.invoke(cli, ['--timing', 'text', 'info', 't1'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertIn('info took', result.stderr)
+        self.assertIn('dedup/sort', result.stderr)
+
+    def test_no_timing(self):
+        result = self.cli_runner.invoke(cli, ['list', '-d', '2020-10-25'])
+
+        self.assertEqual('', result.stderr)
+
+    def test_profile_top(self):
+        result = self.cli_runner.invoke(cli, ['--profile-top', '3', 'list', '-d', '2020-10-25'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertIn('cumulative', result.stderr)
+
+    def test_profile_file(self):
+        profile_path = self.home_path / 'list.prof'
+
+        result = self.cli_runner.invoke(cli, ['--profile', str(profile_path), 'list', '-d', '2020-10-25'])
+
+        self.assertEqual(0, result.exit_code)
+        self.assertTrue(profile_path.exists())
+
+
+class ImportTimeFixture(unittest.TestCase):
+    """
+    Guards the start up time of the cli, shell hooks call wdc start on every context switch
+    """
+    # Modules only some commands need, they must not be loaded when the cli is imported
+    LAZY_MODULES = ['termtables', 'colored', 'json', 'sqlite3', 'multiprocessing', 'concurrent.futures', 'cProfile',
+                    'pstats', 'socketserver', 'asyncio', 'cmd', 'wdc.controller.export_import',
+                    'wdc.controller.maintenance', 'wdc.controller.balance', 'wdc.helper.daemon',
+                    'wdc.helper.http_api', 'wdc.helper.shell', 'wdc.controller.report', 'wdc.calculator',
+                    'wdc.helper.rollup', 'wdc.helper.snapshot', 'hashlib', 'secrets', 'shutil']
+    # The cumulative import time of wdc.runner in microseconds, below the about 125 ms it took when every command
+    # loaded the report and table libraries
+    IMPORT_BUDGET = 120000
+
+    @staticmethod
+    def import_times():
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import wdc.runner'],
+                                capture_output=True, text=True, check=True)
+
+        times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, module = line[len('import time:'):].split('|')
+            times[module.strip()] = int(cumulative)
+
+        return times
+
+    def test_lazy_modules_not_imported(self):
+        times = self.import_times()
+
+        self.assertIn('wdc.runner', times)
+        self.assertEqual([], [module for module in self.LAZY_MODULES if module in times])
+
+    def test_import_budget(self):
+        # The fastest of a few runs, the others may have been slowed down by the machine
+        fastest = min(self.import_times()['wdc.runner'] for _ in range(10))
+
+        self.assertLess(fastest, self.IMPORT_BUDGET)
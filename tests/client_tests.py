@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import patch
+
+from wdc.client import main, send_command
+
+
+class ClientFixture(unittest.TestCase):
+    def test_no_daemon(self):
+        self.assertIsNone(send_command(['list'], '/nonexistent/wdc.sock'))
+
+    @patch('wdc.runner.cli')
+    @patch('wdc.client.send_command')
+    def test_routed_to_daemon(self, mock_send, mock_cli):
+        mock_send.return_value = ('output\n', '', 3)
+
+        with patch('sys.argv', ['wdc', 'list', '-a']), patch('sys.stdout') as mock_stdout:
+            with self.assertRaises(SystemExit) as context:
+                main()
+
+        self.assertEqual(3, context.exception.code)
+        mock_send.assert_called_with(['list', '-a'])
+        mock_stdout.write.assert_called_with('output\n')
+        mock_cli.assert_not_called()
+
+    @patch('wdc.runner.cli')
+    @patch('wdc.client.send_command')
+    def test_fallback_without_daemon(self, mock_send, mock_cli):
+        mock_send.return_value = None
+
+        with patch('sys.argv', ['wdc', 'start', '0800']):
+            main()
+
+        mock_cli.assert_called_once()
+
+    @patch('wdc.runner.cli')
+    @patch('wdc.client.send_command')
+    def test_other_commands_not_routed(self, mock_send, mock_cli):
+        with patch('sys.argv', ['wdc', 'export', '--pipe']):
+            main()
+
+        mock_send.assert_not_called()
+        mock_cli.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
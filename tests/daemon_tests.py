@@ -0,0 +1,95 @@
+import os
+import socket
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.helpers import HomeDirTestCase
+from wdc.client import send_command
+from wdc.exceptions import DaemonError
+from wdc.helper.daemon import REQUEST_TIMEOUT, _CommandHandler, create_server, run_command, serve
+from wdc.runner import cli
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Needs unix sockets')
+class DaemonFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.socket_path = str(self.home_path / 'wdc.sock')
+
+    def start_daemon(self):
+        server = create_server(cli, self.socket_path)
+        thread = threading.Thread(target=serve, args=(server,))
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            thread.join()
+
+        self.addCleanup(stop)
+
+    def test_run_command(self):
+        stdout, stderr, exit_code = run_command(cli, ['calc', '0800'])
+
+        self.assertEqual(('1615\n', '', 0), (stdout, stderr, exit_code))
+
+    def test_run_command_usage_error(self):
+        stdout, stderr, exit_code = run_command(cli, ['calc', '0860'])
+
+        self.assertEqual(2, exit_code)
+        self.assertIn('0860 is not a valid time', stderr)
+
+    def test_commands_answered(self):
+        self.start_daemon()
+
+        self.assertEqual(0, send_command(['start', '0800', '-d', '2020-10-01', '-m', 'daemon'], self.socket_path)[2])
+        stdout, _, exit_code = send_command(['list', '-d', '2020-10-01'], self.socket_path)
+
+        self.assertEqual(0, exit_code)
+        self.assertIn('08:00', stdout)
+        self.assertTrue((self.home_path / '202010.csv').exists())
+
+    def test_stalled_client_disconnected(self):
+        self.assertEqual(REQUEST_TIMEOUT, _CommandHandler.timeout)
+
+        with patch.object(_CommandHandler, 'timeout', 0.2):
+            self.start_daemon()
+
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+                stalled.settimeout(5)
+                stalled.connect(self.socket_path)
+                stalled.sendall(b'{"args": ')
+
+                # Closed by the daemon without an answer
+                self.assertEqual(b'', stalled.recv(1024))
+
+            self.assertEqual(0, send_command(['list'], self.socket_path)[2])
+
+    def test_socket_removed_on_shutdown(self):
+        server = create_server(cli, self.socket_path)
+        thread = threading.Thread(target=serve, args=(server,))
+        thread.start()
+        server.shutdown()
+        thread.join()
+
+        self.assertFalse(os.path.exists(self.socket_path))
+        self.assertIsNone(send_command(['list'], self.socket_path))
+
+    def test_already_running(self):
+        self.start_daemon()
+
+        with self.assertRaises(DaemonError):
+            create_server(cli, self.socket_path)
+
+    def test_stale_socket_replaced(self):
+        Path(self.socket_path).write_text('')
+
+        self.assertIsNone(send_command(['list'], self.socket_path))
+
+        self.start_daemon()
+        self.assertEqual(0, send_command(['list'], self.socket_path)[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,16 @@
+import io
 import json
+import tempfile
 import unittest
-from unittest.mock import patch
+from pathlib import Path
+from unittest.mock import mock_open, patch
 
-from wdc.classes import WdcTask
-from wdc.controller.export_import import WdcTaskJsonEncoder, export_tasks, ExportType
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.classes import WdcTask, to_array
+from wdc.controller.export_import import WdcTaskJsonEncoder, export_chunks, export_tasks, import_tasks, ExportType, \
+    ImportSummary
+from wdc.exceptions import DateFormatError
+from wdc.helper.io import read_all_tasks, write_task
 
 
 class WdcTaskJsonEncoderFixture(unittest.TestCase):
@@ -21,6 +28,7 @@ class WdcTaskJsonEncoderFixture(unittest.TestCase):
 
         self.assertEqual("""{
     "id": "c411c941",
+    "date": "2020-10-25",
     "timestamp": "1595423306302",
     "tags": "home",
     "start": "0930",
@@ -53,6 +61,7 @@ class WdcTaskJsonEncoderFixture(unittest.TestCase):
         self.assertEqual("""[
     {
         "id": "c411c941",
+        "date": "2020-10-25",
         "timestamp": "1595423306302",
         "tags": "home",
         "start": "0930",
@@ -61,6 +70,7 @@ class WdcTaskJsonEncoderFixture(unittest.TestCase):
     },
     {
         "id": "c411c941",
+        "date": "2020-10-25",
         "timestamp": "1595423306302",
         "tags": "home",
         "start": "0930",
@@ -70,11 +80,15 @@ class WdcTaskJsonEncoderFixture(unittest.TestCase):
 ]""", result)
 
 
+def written(mock_file) -> str:
+    return ''.join(call.args[0] for call in mock_file.return_value.write.call_args_list)
+
+
 class ExportTasksFixture(unittest.TestCase):
 
     @patch('wdc.controller.export_import.today')
     @patch('wdc.controller.export_import.list_tasks')
-    @patch('wdc.controller.export_import.write_file')
+    @patch('wdc.controller.export_import.open', new_callable=mock_open, create=True)
     def test_default_parameters(self, mock_writer, mock_reader, mock_today):
         mock_today.return_value = '2020-10-25'
         mock_reader.return_value = [WdcTask(
@@ -90,6 +104,7 @@ class ExportTasksFixture(unittest.TestCase):
         expected_dump = """[
     {
         "id": "c411c941",
+        "date": "2020-10-25",
         "timestamp": "1595423306302",
         "tags": "home",
         "start": "0930",
@@ -99,13 +114,13 @@ class ExportTasksFixture(unittest.TestCase):
 ]"""
         result = export_tasks()
 
-        self.assertIn(expected_dump, mock_writer.call_args.args[0])
-        self.assertIn('export_202010.JSON', mock_writer.call_args.args[1])
-        self.assertIn(expected_dump, result)
+        self.assertIn(expected_dump, written(mock_writer))
+        self.assertIn('export_202010.JSON', mock_writer.call_args.args[0])
+        self.assertEqual(1, result)
 
     @patch('wdc.controller.export_import.today')
     @patch('wdc.controller.export_import.list_tasks')
-    @patch('wdc.controller.export_import.write_file')
+    @patch('wdc.controller.export_import.open', new_callable=mock_open, create=True)
     def test_fully_qualified_parameters(self, mock_writer, mock_reader, mock_today):
         mock_today.return_value = '2020-10-25'
         mock_reader.return_value = [WdcTask(
@@ -121,6 +136,7 @@ class ExportTasksFixture(unittest.TestCase):
         expected_dump = """[
     {
         "id": "c411c941",
+        "date": "2020-10-25",
         "timestamp": "1595423306302",
         "tags": "home",
         "start": "0930",
@@ -132,13 +148,13 @@ class ExportTasksFixture(unittest.TestCase):
 
         self.assertEqual('2020-08-18', mock_reader.call_args.args[0])
         mock_today.assert_not_called()
-        self.assertIn(expected_dump, mock_writer.call_args.args[0])
-        self.assertIn('myexport.json', mock_writer.call_args.args[1])
-        self.assertIn(expected_dump, result)
+        self.assertIn(expected_dump, written(mock_writer))
+        self.assertIn('myexport.json', mock_writer.call_args.args[0])
+        self.assertEqual(1, result)
 
     @patch('wdc.controller.export_import.today')
     @patch('wdc.controller.export_import.list_tasks')
-    @patch('wdc.controller.export_import.write_file')
+    @patch('wdc.controller.export_import.open', new_callable=mock_open, create=True)
     def test_csv_default_parameters(self, mock_writer, mock_reader, mock_today):
         mock_today.return_value = '2020-10-25'
         mock_reader.return_value = [WdcTask(
@@ -154,13 +170,13 @@ class ExportTasksFixture(unittest.TestCase):
         expected_dump = """c411c941;2020-10-25;0930;1000;home;test description;1595423306302"""
         result = export_tasks(export_to=ExportType.CSV)
 
-        self.assertIn(expected_dump, mock_writer.call_args.args[0])
-        self.assertIn('export_202010.CSV', mock_writer.call_args.args[1])
-        self.assertIn(expected_dump, result)
+        self.assertIn(expected_dump, written(mock_writer))
+        self.assertIn('export_202010.CSV', mock_writer.call_args.args[0])
+        self.assertEqual(1, result)
 
     @patch('wdc.controller.export_import.today')
     @patch('wdc.controller.export_import.list_tasks')
-    @patch('wdc.controller.export_import.write_file')
+    @patch('wdc.controller.export_import.open', new_callable=mock_open, create=True)
     def test_csv_default_parameters_multiple_tasks(self, mock_writer, mock_reader, mock_today):
         mock_today.return_value = '2020-10-25'
         mock_reader.return_value = [WdcTask(
@@ -187,6 +203,239 @@ class ExportTasksFixture(unittest.TestCase):
 c411c942;2020-10-25;0930;1000;home;test description1;1595423306303"""
         result = export_tasks(export_to=ExportType.CSV)
 
-        self.assertIn(expected_dump, mock_writer.call_args.args[0])
-        self.assertIn('export_202010.CSV', mock_writer.call_args.args[1])
-        self.assertIn(expected_dump, result)
+        self.assertIn(expected_dump, written(mock_writer))
+        self.assertIn('export_202010.CSV', mock_writer.call_args.args[0])
+        self.assertEqual(2, result)
+
+    @patch('wdc.controller.export_import.list_tasks_in_range')
+    @patch('wdc.controller.export_import.open', new_callable=mock_open, create=True)
+    def test_range(self, mock_writer, mock_reader):
+        mock_reader.return_value = iter([WdcTask(
+            id='c411c941',
+            date='2020-10-25',
+            start='0930',
+            end='1000',
+            tags='home',
+            description='test description',
+            timestamp='1595423306302'
+        )])
+
+        result = export_tasks('2020-10-01', export_to=ExportType.CSV, date_to='2020-10-31')
+
+        self.assertEqual(('2020-10-01', '2020-10-31', False), mock_reader.call_args.args)
+        self.assertIn('export_2020-10-01_2020-10-31.CSV', mock_writer.call_args.args[0])
+        self.assertIn('c411c941;2020-10-25;0930;1000;home;test description;1595423306302', written(mock_writer))
+        self.assertEqual(1, result)
+
+    @patch('wdc.controller.export_import.list_tasks')
+    def test_json_same_as_dumps(self, mock_reader):
+        tasks = [create_task('task1', '2020-10-01', '11', description='with\nline break'),
+                 create_task('task2', '2020-10-01', '12')]
+
+        for exported in [tasks, tasks[0:1], []]:
+            with self.subTest(len(exported)):
+                mock_reader.return_value = exported
+                output = io.StringIO()
+
+                result = export_tasks('2020-10-01', output=output)
+
+                self.assertEqual(len(exported), result)
+                self.assertEqual(json.dumps(exported, indent=4, cls=WdcTaskJsonEncoder), output.getvalue())
+
+    @patch('wdc.controller.export_import.list_tasks')
+    def test_ndjson(self, mock_reader):
+        mock_reader.return_value = [create_task('task1', '2020-10-01', '11'), create_task('task2', '2020-10-01', '12')]
+        output = io.StringIO()
+
+        export_tasks('2020-10-01', export_to=ExportType.NDJSON, output=output)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertEqual('task2', json.loads(lines[1])['id'])
+
+    @patch('wdc.controller.export_import.list_tasks')
+    def test_csv_quotes_delimiter(self, mock_reader):
+        mock_reader.return_value = [create_task('task1', '2020-10-01', '11', description='with; delimiter')]
+        output = io.StringIO()
+
+        export_tasks('2020-10-01', export_to=ExportType.CSV, output=output)
+
+        self.assertEqual('task1;2020-10-01;0800;;t1;|with; delimiter|;11\n', output.getvalue())
+
+
+class ParallelExportFixture(HomeDirTestCase):
+    HOME_DIR = 'home'
+
+    def setUp(self):
+        super().setUp()
+
+        write_task(create_task('task1', '2020-10-01', '11'))
+        write_task(create_task('task2', '2020-11-15', '12', description='with; delimiter'))
+        write_task(create_task('task1', '2020-10-01', '13'))
+        write_task(create_task('task3', '2021-01-31', '14'))
+
+    def export(self, export_to: ExportType, jobs: int) -> str:
+        output = io.StringIO()
+        export_tasks('2020-10-01', export_to=export_to, export_all=True, date_to='2021-01-31', output=output,
+                     jobs=jobs)
+
+        return output.getvalue()
+
+    def test_same_as_single_job(self):
+        for export_type in ExportType:
+            with self.subTest(export_type.name):
+                self.assertEqual(self.export(export_type, 1), self.export(export_type, 3))
+
+    def test_split(self):
+        file_path = str(self.temp_path / 'out.csv')
+
+        result = export_tasks('2020-10-01', file_path, ExportType.CSV, True, '2021-01-31', jobs=2, split=True)
+
+        self.assertEqual(4, result)
+        self.assertEqual(['out_202010.csv', 'out_202011.csv', 'out_202101.csv'],
+                         sorted(path.name for path in self.temp_path.glob('out_*')))
+        self.assertEqual(2, len((self.temp_path / 'out_202010.csv').read_text().splitlines()))
+
+    def test_invalid_jobs(self):
+        with self.assertRaises(ValueError):
+            export_tasks('2020-10-01', export_to=ExportType.CSV, date_to='2021-01-31', output=io.StringIO(), jobs=0)
+
+    def test_chunks_same_as_export(self):
+        for export_type in ExportType:
+            with self.subTest(export_type.name):
+                chunks = list(export_chunks('2020-10-01', export_type, True, '2021-01-31'))
+
+                self.assertNotIn('', chunks)
+                self.assertEqual(self.export(export_type, 1), ''.join(chunks))
+
+    def test_chunks_invalid_date(self):
+        with self.assertRaises(DateFormatError):
+            export_chunks('2020-10-32')
+
+
+def to_csv_export(tasks) -> io.StringIO:
+    return io.StringIO(''.join(';'.join(to_array(task)) + '\n' for task in tasks))
+
+
+def to_json_export(tasks) -> io.StringIO:
+    return io.StringIO(json.dumps(tasks, indent=4, cls=WdcTaskJsonEncoder))
+
+
+def stored(date: str):
+    return [to_array(task) for task in read_all_tasks(date)]
+
+
+class ImportTasksFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.tasks = [
+            create_task('task1', '2020-10-01', '11'),
+            create_task('task2', '2020-11-01', '12', description='with; delimiter'),
+            create_task('task1', '2020-10-01', '13'),
+        ]
+
+    def assert_imported(self):
+        self.assertEqual([to_array(self.tasks[0]), to_array(self.tasks[2])], stored('2020-10-01'))
+        self.assertEqual([to_array(self.tasks[1])], stored('2020-11-01'))
+
+    def test_json(self):
+        result = import_tasks(to_json_export(self.tasks), ExportType.JSON)
+
+        self.assertEqual(ImportSummary(3, 3, 0, 0), result)
+        self.assert_imported()
+
+    def test_csv(self):
+        result = import_tasks(to_csv_export(self.tasks), ExportType.CSV)
+
+        self.assertEqual(ImportSummary(3, 3, 0, 0), result)
+        self.assert_imported()
+
+    def test_json_read_in_pieces(self):
+        with patch('wdc.controller.export_import.READ_SIZE', 7):
+            result = import_tasks(to_json_export(self.tasks), ExportType.JSON)
+
+        self.assertEqual(ImportSummary(3, 3, 0, 0), result)
+        self.assert_imported()
+
+    def test_json_without_valid_date(self):
+        items = [json.loads(json.dumps(task, cls=WdcTaskJsonEncoder)) for task in self.tasks]
+        del items[0]['date']
+        items[1]['date'] = None
+        items[2]['date'] = '2020-13-01'
+
+        result = import_tasks(io.StringIO(json.dumps(items)), ExportType.JSON)
+
+        self.assertEqual(ImportSummary(3, 0, 0, 3), result)
+        self.assertEqual([], stored('2020-10-01'))
+
+    def test_baseline_json_export_with_date(self):
+        # Laid out like the exports of versions that only exported a single date and did not store it
+        tasks = [self.tasks[0], self.tasks[2]]
+        items = [{'id': t.id, 'timestamp': t.timestamp, 'tags': t.tags, 'start': t.start, 'end': t.end,
+                  'message': t.description} for t in tasks]
+        export = json.dumps(items, indent=4)
+
+        self.assertEqual(ImportSummary(2, 0, 0, 2), import_tasks(io.StringIO(export), ExportType.JSON))
+        self.assertEqual(ImportSummary(2, 2, 0, 0), import_tasks(io.StringIO(export), ExportType.JSON, '2020-10-01'))
+        self.assertEqual(ImportSummary(2, 0, 2, 0), import_tasks(io.StringIO(export), ExportType.JSON, '2020-10-01'))
+        self.assertEqual([to_array(task) for task in tasks], stored('2020-10-01'))
+
+        output = io.StringIO()
+        export_tasks('2020-10-01', export_all=True, output=output)
+
+        self.assertEqual(ImportSummary(2, 0, 2, 0), import_tasks(io.StringIO(output.getvalue()), ExportType.JSON))
+
+    def test_given_date_only_used_without_date(self):
+        result = import_tasks(to_json_export(self.tasks), ExportType.JSON, '2020-12-01')
+
+        self.assertEqual(ImportSummary(3, 3, 0, 0), result)
+        self.assert_imported()
+        self.assertEqual([], stored('2020-12-01'))
+
+    def test_invalid_given_date(self):
+        with self.assertRaises(DateFormatError):
+            import_tasks(to_json_export(self.tasks), ExportType.JSON, '2020-13-01')
+
+    def test_skips_stored_and_repeated_tasks(self):
+        write_task(self.tasks[0])
+
+        result = import_tasks(to_csv_export(self.tasks + [self.tasks[1]]), ExportType.CSV)
+
+        self.assertEqual(ImportSummary(4, 2, 2, 0), result)
+        self.assert_imported()
+
+    def test_import_twice(self):
+        import_tasks(to_json_export(self.tasks), ExportType.JSON)
+        result = import_tasks(to_json_export(self.tasks), ExportType.JSON)
+
+        self.assertEqual(ImportSummary(3, 0, 3, 0), result)
+        self.assert_imported()
+
+    def test_skips_invalid_tasks(self):
+        export = to_csv_export(self.tasks).getvalue() + 'task3;2020-13-01;0800;;;;14\nnot a task\n'
+
+        result = import_tasks(io.StringIO(export), ExportType.CSV)
+
+        self.assertEqual(ImportSummary(5, 3, 0, 2), result)
+        self.assert_imported()
+
+    def test_round_trip(self):
+        for export_type in ExportType:
+            with self.subTest(export_type.name):
+                with patch('wdc.controller.export_import.list_tasks_in_range') as mock_reader:
+                    mock_reader.return_value = iter(self.tasks)
+                    output = io.StringIO()
+                    export_tasks('2020-10-01', export_to=export_type, export_all=True, date_to='2020-11-30',
+                                 output=output)
+
+                with tempfile.TemporaryDirectory() as home_dir:
+                    with patch('wdc.helper.io.HOME_DIR_PATH', Path(home_dir)):
+                        result = import_tasks(io.StringIO(output.getvalue()), export_type)
+
+                        self.assertEqual(ImportSummary(3, 3, 0, 0), result)
+                        self.assert_imported()
+
+    def test_invalid_json(self):
+        with self.assertRaises(ValueError):
+            import_tasks(io.StringIO('[{"id": "task1"'), ExportType.JSON)
@@ -0,0 +1,47 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from wdc.classes import WdcTask
+
+
+def create_task(task_id: str,
+                date: str,
+                timestamp: str = '1',
+                start: str = '0800',
+                end: str = '',
+                tags: str = 't1',
+                description: str = 'description') -> WdcTask:
+    return WdcTask(
+        id=task_id,
+        date=date,
+        start=start,
+        end=end,
+        tags=tags,
+        description=description,
+        timestamp=timestamp
+    )
+
+
+class HomeDirTestCase(unittest.TestCase):
+    """
+    Runs every test against an empty temporary wdc home directory
+
+    Attributes:
+        temp_path -- The temporary directory, removed after the test
+        home_path -- The wdc home directory, HOME_DIR inside of the temporary directory
+    """
+    # The home directory relative to the temporary directory, the temporary directory itself if empty
+    HOME_DIR = ''
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+
+        self.temp_path = Path(temp_dir.name)
+        self.home_path = self.temp_path / self.HOME_DIR if self.HOME_DIR else self.temp_path
+
+        home_patch = patch('wdc.helper.io.HOME_DIR_PATH', self.home_path)
+        home_patch.start()
+        self.addCleanup(home_patch.stop)
@@ -0,0 +1,62 @@
+import unittest
+
+import wdc.helper.io as task_io
+from benchmarks.history import generate_history, temporary_home
+from wdc.controller.work_day import get_task_info
+from wdc.helper.index import task_files
+
+
+def written_history(years: int, tasks_per_day: int, seed: int = 0):
+    with temporary_home() as home_dir:
+        history = generate_history(years, tasks_per_day, seed)
+        files = {name: (home_dir / name).read_bytes() for name in task_files(home_dir)}
+        tasks = [task for name in sorted(files) for task in task_io.read_task_file(home_dir / name)]
+        histories = [get_task_info(task_id) for task_id in history.task_ids]
+
+    return history, files, tasks, histories
+
+
+class GenerateHistoryFixture(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.history, cls.files, cls.tasks, cls.histories = written_history(1, 4)
+
+    def test_deterministic(self):
+        self.assertEqual(self.files, written_history(1, 4)[1])
+        self.assertNotEqual(self.files, written_history(1, 4, seed=1)[1])
+
+    def test_summary(self):
+        self.assertEqual(13, len(self.files))
+        self.assertEqual(len(self.tasks), self.history.rows)
+        self.assertEqual(len({task.id for task in self.tasks}), self.history.tasks)
+        self.assertEqual(max(task.date for task in self.tasks), self.history.last_day)
+        self.assertTrue(all(task_info is not None for task_info in self.histories))
+
+    def test_only_workdays(self):
+        weekdays = {task.date for task in self.tasks if task.date in ('2010-01-09', '2010-01-10')}
+
+        self.assertEqual(set(), weekdays)
+
+    def test_realistic_tasks(self):
+        self.assertTrue(any(',' in task.tags for task in self.tasks))
+        self.assertTrue(any(len(task.description) > 200 for task in self.tasks))
+        self.assertTrue(any(';' in task.description for task in self.tasks))
+        self.assertTrue(any(task.description.endswith('(amended)') for task in self.tasks))
+
+    def test_amends_are_latest(self):
+        for task in self.tasks:
+            if task.description.endswith('(amended)'):
+                versions = [other for other in self.tasks if other.id == task.id]
+                self.assertEqual(task, max(versions, key=lambda version: int(version.timestamp)))
+
+    def test_home_restored(self):
+        home_dir = task_io.HOME_DIR_PATH
+
+        with temporary_home() as temp_home:
+            self.assertEqual(temp_home, task_io.HOME_DIR_PATH)
+
+        self.assertEqual(home_dir, task_io.HOME_DIR_PATH)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+import asyncio
+import contextlib
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.helper.http_api import ReadModel, is_loopback_host, start_api
+from wdc.helper.io import write_task
+
+
+async def send(port: int, request: str):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(request.encode('utf-8'))
+    response = await reader.read()
+    writer.close()
+
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split(b' ')[1]), head.decode('latin-1'), body
+
+
+def request(method: str, path: str, body: dict = None, version: str = 'HTTP/1.1', headers: dict = None) -> str:
+    data = json.dumps(body) if body is not None else ''
+    headers = dict({'Host': 'localhost:8421', 'Connection': 'close'}, **(headers or {}))
+    if body is not None:
+        headers.setdefault('Content-Type', 'application/json')
+    headers['Content-Length'] = len(data.encode('utf-8'))
+
+    lines = ''.join(f'{name}: {value}\r\n' for name, value in headers.items() if value is not None)
+    return f'{method} {path} {version}\r\n{lines}\r\n{data}'
+
+
+class HttpApiFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        write_task(create_task('task1', '2020-10-01', '11', end='0900'))
+        write_task(create_task('task2', '2020-11-15', '12', end='0900'))
+        write_task(create_task('task1', '2020-10-01', '13', end='0900'))
+
+    def exchange(self, *requests: str):
+        async def run():
+            server = await start_api()
+            port = server.sockets[0].getsockname()[1]
+            try:
+                return [await send(port, text) for text in requests]
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        return asyncio.run(run())
+
+    def test_list_day(self):
+        status, _, body = self.exchange(request('GET', '/tasks?date=2020-10-01'))[0]
+
+        self.assertEqual(200, status)
+        self.assertEqual([('task1', '13')], [(task['id'], task['timestamp']) for task in json.loads(body)])
+
+    def test_list_range_all_versions(self):
+        status, _, body = self.exchange(request('GET', '/tasks?from=2020-10-01&to=2020-11-30&all=1'))[0]
+
+        self.assertEqual(200, status)
+        self.assertEqual(['11', '13', '12'], [task['timestamp'] for task in json.loads(body)])
+
+    def test_start_is_listed(self):
+        (_, _, before), (status, _, body), (_, _, listed) = self.exchange(
+            request('GET', '/tasks?date=2020-10-01'),
+            request('POST', '/tasks', {'start': '1000', 'tags': ['a', 'b'], 'message': 'new', 'date': '2020-10-01'}),
+            request('GET', '/tasks?date=2020-10-01'))
+
+        self.assertEqual(1, len(json.loads(before)))
+        self.assertEqual(201, status)
+        self.assertEqual('a,b', json.loads(body)['tags'])
+        self.assertEqual(['0800', '1000'], [task['start'] for task in json.loads(listed)])
+
+    def test_amend_and_info(self):
+        (status, _, _), (_, _, body) = self.exchange(request('PATCH', '/tasks/task2', {'message': 'changed'}),
+                                                     request('GET', '/tasks/task2'))
+
+        self.assertEqual(200, status)
+        self.assertEqual('changed', json.loads(body)['current']['message'])
+        self.assertEqual(1, len(json.loads(body)['history']))
+
+    def test_errors(self):
+        responses = self.exchange(request('GET', '/tasks/unknown'),
+                                  request('DELETE', '/tasks'),
+                                  request('GET', '/unknown'),
+                                  request('GET', '/tasks?date=2020-13-01'),
+                                  request('GET', '/tasks?to=2020-10-01'),
+                                  request('POST', '/tasks', {'message': 'no start'}),
+                                  'garbage\r\n\r\n')
+
+        self.assertEqual([404, 405, 404, 400, 400, 400, 400], [status for status, _, _ in responses])
+        self.assertIn('error', json.loads(responses[0][2]))
+
+    def test_end_without_tasks(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status, _, body = self.exchange(request('POST', '/tasks/end', {'date': '2020-12-01', 'end': '1000'}))[0]
+
+        self.assertEqual(404, status)
+        self.assertIn('2020-12-01', json.loads(body)['error'])
+        self.assertEqual('', stderr.getvalue())
+
+    def test_foreign_host_refused(self):
+        responses = self.exchange(request('GET', '/tasks?date=2020-10-01', headers={'Host': 'attacker.example:8421'}),
+                                  request('GET', '/tasks?date=2020-10-01', headers={'Host': None}))
+
+        self.assertEqual([403, 403], [status for status, _, _ in responses])
+
+    def test_foreign_origin_refused(self):
+        responses = self.exchange(
+            request('POST', '/tasks', {'start': '1000'}, headers={'Origin': 'http://attacker.example'}),
+            request('GET', '/tasks', headers={'Origin': 'http://localhost:9000'}),
+            request('GET', '/tasks?date=2020-10-01', headers={'Origin': 'http://localhost:8421'}))
+
+        self.assertEqual([403, 403, 200], [status for status, _, _ in responses])
+
+    def test_changes_need_json(self):
+        text = {'Content-Type': 'text/plain'}
+        responses = self.exchange(request('POST', '/tasks', {'start': '1000'}, headers=text),
+                                  request('POST', '/tasks/end'),
+                                  request('PATCH', '/tasks/task2', {'message': 'changed'}, headers=text),
+                                  request('POST', '/tasks', {'start': '1000'},
+                                          headers={'Content-Type': 'application/json; charset=utf-8'}))
+
+        self.assertEqual([415, 415, 415, 201], [status for status, _, _ in responses])
+
+    def test_loopback_hosts(self):
+        for host in ['localhost', 'LOCALHOST:8421', '127.0.0.1:8421', '127.1.2.3', '[::1]:8421', '::1']:
+            with self.subTest(host):
+                self.assertTrue(is_loopback_host(host))
+
+        for host in ['', 'example.com', 'localhost.example.com:8421', '10.0.0.1', '[::2]:8421']:
+            with self.subTest(host):
+                self.assertFalse(is_loopback_host(host))
+
+    def test_export_streamed(self):
+        status, head, body = self.exchange(request('GET', '/export?from=2020-10-01&to=2020-11-30&format=ndjson'))[0]
+
+        self.assertEqual(200, status)
+        self.assertIn('Transfer-Encoding: chunked', head)
+        self.assertTrue(body.endswith(b'0\r\n\r\n'))
+
+    def test_export_without_chunks(self):
+        status, head, body = self.exchange(request('GET', '/export?date=2020-10-01&format=csv&all=true',
+                                                   version='HTTP/1.0'))[0]
+
+        self.assertEqual(200, status)
+        self.assertNotIn('chunked', head)
+        self.assertEqual(2, len(body.decode('utf-8').splitlines()))
+
+
+class ReadModelFixture(unittest.TestCase):
+    def setUp(self):
+        self.builds = 0
+
+    def build(self) -> bytes:
+        self.builds += 1
+        return str(self.builds).encode('utf-8')
+
+    @patch('wdc.helper.http_api.month_signature')
+    def test_answer_kept_until_month_changes(self, mock_signature):
+        mock_signature.return_value = (1, 1)
+        read_model = ReadModel()
+
+        self.assertEqual(b'1', read_model.answer(('key',), ['202010'], self.build))
+        self.assertEqual(b'1', read_model.answer(('key',), ['202010'], self.build))
+
+        mock_signature.return_value = (2, 2)
+        self.assertEqual(b'2', read_model.answer(('key',), ['202010'], self.build))
+
+    @patch('wdc.helper.http_api.month_signature')
+    def test_unknown_signature_not_kept(self, mock_signature):
+        mock_signature.return_value = None
+        read_model = ReadModel()
+
+        read_model.answer(('key',), ['202010'], self.build)
+        read_model.answer(('key',), ['202010'], self.build)
+
+        self.assertEqual(2, self.builds)
+
+    @patch('wdc.helper.http_api.month_signature')
+    def test_oldest_answer_dropped(self, mock_signature):
+        mock_signature.return_value = (1, 1)
+        read_model = ReadModel(max_entries=1)
+
+        read_model.answer(('first',), ['202010'], self.build)
+        read_model.answer(('second',), ['202010'], self.build)
+        read_model.answer(('first',), ['202010'], self.build)
+
+        self.assertEqual(3, self.builds)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+from unittest.mock import patch
+
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.helper import index
+from wdc.helper.io import write_task, find_tasks, read_day_tasks, scan_tasks, scan_workers
+from wdc.helper.pool import pool_map
+
+
+class IdIndexFixture(HomeDirTestCase):
+    def test_find_versions_across_months(self):
+        write_task(create_task('task1', '2020-09-30', '11'))
+        write_task(create_task('task2', '2020-09-30', '12'))
+        write_task(create_task('task1', '2020-10-01', '13', end='0900'))
+
+        result = find_tasks('task1')
+
+        self.assertEqual(['11', '13'], [t.timestamp for t in result])
+        self.assertEqual(['2020-09-30', '2020-10-01'], [t.date for t in result])
+
+    def test_index_updated_by_write(self):
+        write_task(create_task('task1', '2020-10-01', '11'))
+        find_tasks('task1')
+
+        with patch('wdc.helper.index.rebuild_id_index') as mock_rebuild:
+            write_task(create_task('task1', '2020-10-01', '12', end='0900'))
+            result = find_tasks('task1')
+
+            mock_rebuild.assert_not_called()
+
+        self.assertEqual(['11', '12'], [t.timestamp for t in result])
+
+    def test_missing_index_rebuilt(self):
+        write_task(create_task('task1', '2020-10-01', '11'))
+        index.rebuild_id_index(self.home_path)
+        (self.home_path / index.INDEX_DIR / index.ID_INDEX_DIR / index.MANIFEST_FILE).unlink()
+
+        result = find_tasks('task1')
+
+        self.assertEqual(1, len(result))
+
+    def test_external_change_rebuilds_index(self):
+        write_task(create_task('task1', '2020-10-01', '11'))
+        find_tasks('task1')
+
+        with open(str(self.home_path / '202010.csv'), 'a') as file:
+            file.write('task1;2020-10-01;0800;1000;t1;manual edit;12\r\n')
+
+        result = find_tasks('task1')
+
+        self.assertEqual(['11', '12'], [t.timestamp for t in result])
+
+    def test_unknown_task(self):
+        write_task(create_task('task1', '2020-10-01', '11'))
+
+        self.assertEqual([], find_tasks('unknown'))
+
+    def test_no_home_dir(self):
+        with patch('wdc.helper.io.HOME_DIR_PATH', self.home_path / 'missing'):
+            self.assertEqual([], find_tasks('task1'))
+
+    def test_multiline_description(self):
+        task = create_task('task1', '2020-10-01', '11')
+        task.description = 'first line\nsecond;line'
+        write_task(task)
+        write_task(create_task('task2', '2020-10-01', '12'))
+
+        self.assertEqual('first line\nsecond;line', find_tasks('task1')[0].description)
+        self.assertEqual('task2', find_tasks('task2')[0].id)
+
+    def test_parallel_scan(self):
+        write_task(create_task('task1', '2020-10-01', '13'))
+        write_task(create_task('task1', '2020-09-30', '11'))
+        write_task(create_task('task2', '2020-11-01', '12', end='task1'))
+        write_task(create_task('task1', '2020-11-01', '14', end='0900'))
+
+        with patch('wdc.helper.io.PARALLEL_SCAN_BYTES', 0):
+            result = scan_tasks('task1', workers=2)
+
+        self.assertEqual(['11', '13', '14'], [t.timestamp for t in result])
+        self.assertEqual(scan_tasks('task1', workers=1), result)
+
+    def test_small_files_scanned_in_process(self):
+        write_task(create_task('task1', '2020-09-30', '11'))
+        write_task(create_task('task1', '2020-10-01', '12'))
+
+        with patch('wdc.helper.io.pool_map', wraps=pool_map) as mock_pool:
+            result = scan_tasks('task1', workers=2)
+
+            self.assertEqual(1, mock_pool.call_args.args[2])
+
+        self.assertEqual(['11', '12'], [t.timestamp for t in result])
+
+    def test_parallel_rebuild(self):
+        write_task(create_task('task1', '2020-09-30', '11'))
+        write_task(create_task('task2', '2020-10-01', '12'))
+        write_task(create_task('task1', '2020-10-01', '13', end='0900'))
+        index_path = self.home_path / index.INDEX_DIR / index.ID_INDEX_DIR
+
+        index.rebuild_id_index(self.home_path, workers=1)
+        serial = {path.name: path.read_text() for path in index_path.iterdir()}
+        index.rebuild_id_index(self.home_path, workers=2)
+
+        self.assertEqual(serial, {path.name: path.read_text() for path in index_path.iterdir()})
+
+    def test_scan_workers_setting(self):
+        (self.home_path / 'settings.toml').write_text('[index]\nscan_workers = 3\n')
+
+        self.assertEqual(3, scan_workers())
+
+
+class DayIndexFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        write_task(create_task('task1', '2020-10-01', '11'))
+        write_task(create_task('task2', '2020-10-02', '12'))
+        write_task(create_task('task3', '2020-10-01', '13'))
+        write_task(create_task('task4', '2020-10-01', '14'))
+
+    def test_read_only_given_day(self):
+        result = read_day_tasks('2020-10-01')
+
+        self.assertEqual(['task1', 'task3', 'task4'], [t.id for t in result])
+
+    def test_consecutive_rows_merged(self):
+        self.assertEqual(2, len(index.day_ranges(self.home_path, '202010.csv', '2020-10-01')))
+
+    def test_many_days_at_once(self):
+        result = index.days_ranges(self.home_path, '202010.csv', {'2020-10-01', '2020-10-02', '2020-10-03'})
+
+        self.assertEqual({'2020-10-01', '2020-10-02'}, set(result))
+        self.assertEqual(index.day_ranges(self.home_path, '202010.csv', '2020-10-02'), result['2020-10-02'])
+
+    def test_index_updated_by_write(self):
+        read_day_tasks('2020-10-01')
+
+        with patch('wdc.helper.index.rebuild_day_index') as mock_rebuild:
+            write_task(create_task('task5', '2020-10-02', '15'))
+            result = read_day_tasks('2020-10-02')
+
+            mock_rebuild.assert_not_called()
+
+        self.assertEqual(['task2', 'task5'], [t.id for t in result])
+
+    def test_stale_index_rebuilt(self):
+        read_day_tasks('2020-10-01')
+
+        with open(str(self.home_path / '202010.csv'), 'a') as file:
+            file.write('task5;2020-10-02;0800;1000;t1;manual edit;15\r\n')
+
+        self.assertEqual(['task2', 'task5'], [t.id for t in read_day_tasks('2020-10-02')])
+
+    def test_no_tasks_for_day(self):
+        self.assertEqual([], read_day_tasks('2020-10-03'))
+        self.assertEqual([], read_day_tasks('2020-11-03'))
@@ -1,6 +1,12 @@
+import csv
+import io
 import unittest
+from unittest.mock import patch
 
-from wdc.helper.io import array_to_tags_string
+from tests.helpers import HomeDirTestCase
+from wdc.classes import WdcTask
+from wdc.helper.io import array_to_tags_string, last_task, write_task
+from wdc.helper.task_file import TAIL_BLOCK_SIZE, encode_row
 
 
 class ArrayToTagsString(unittest.TestCase):
@@ -18,3 +24,77 @@ class ArrayToTagsString(unittest.TestCase):
         test_result = array_to_tags_string(tags_list)
 
         self.assertEqual('', test_result)
+
+
+class EncodeRowFixture(unittest.TestCase):
+    def test_same_as_csv_writer(self):
+        rows = [
+            ['c411c941', '2020-10-25', '0930', '', 'home,work', 'test description', '1595423306302'],
+            ['c411c941', '2020-10-25', '0930', '1000', '', 'with; delimiter', '1595423306302'],
+            ['c411c941', '2020-10-25', '0930', '1000', '', 'with | quote', '1595423306302'],
+            ['c411c941', '2020-10-25', '0930', '1000', '', 'with\nnew line', '1595423306302'],
+            ['c411c941', '2020-10-25', '0930', '1000', '', 'with\rcarriage return', '1595423306302'],
+            ['', ''],
+            [''],
+        ]
+
+        for row in rows:
+            with self.subTest(row):
+                buffer = io.StringIO()
+                csv.writer(buffer, dialect='wdc').writerow(row)
+                self.assertEqual(buffer.getvalue().encode('utf-8'), encode_row(row))
+
+
+class LastTaskFixture(HomeDirTestCase):
+    def write_rows(self, content: bytes):
+        with open(str(self.home_path / '202010.csv'), 'wb') as file:
+            file.write(content)
+
+    def test_last_of_many(self):
+        for i in range(1000):
+            write_task(WdcTask(id=f'task{i}', date='2020-10-25', start='0800', end='', tags='',
+                               description='description', timestamp=str(i)))
+
+        result = last_task('2020-10-25')
+
+        self.assertEqual('task999', result.id)
+        self.assertEqual('999', result.timestamp)
+
+    def test_single_row(self):
+        self.write_rows(b'task1;2020-10-25;0800;;t1;description;11\r\n')
+
+        self.assertEqual('task1', last_task('2020-10-25').id)
+
+    def test_no_trailing_newline(self):
+        self.write_rows(b'task1;2020-10-25;0800;;t1;d;11\r\ntask2;2020-10-25;0900;;t1;d;12')
+
+        self.assertEqual('task2', last_task('2020-10-25').id)
+
+    def test_embedded_newlines(self):
+        self.write_rows(b'task1;2020-10-25;0800;;t1;d;11\r\n'
+                        b'task2;2020-10-25;0900;;t1;|first\nt3;2020-10-25;0800;;t1;d;13\nthird|;12\r\n')
+
+        result = last_task('2020-10-25')
+
+        self.assertEqual('task2', result.id)
+        self.assertEqual('first\nt3;2020-10-25;0800;;t1;d;13\nthird', result.description)
+
+    def test_description_longer_than_block(self):
+        description = 'x' * (3 * TAIL_BLOCK_SIZE) + '\n' + 'y' * TAIL_BLOCK_SIZE
+        write_task(WdcTask(id='task1', date='2020-10-25', start='0800', end='', tags='',
+                           description='first', timestamp='11'))
+        write_task(WdcTask(id='task2', date='2020-10-25', start='0800', end='', tags='',
+                           description=description, timestamp='12'))
+
+        self.assertEqual(description, last_task('2020-10-25').description)
+
+    @patch('wdc.helper.io.read_rows')
+    def test_corrupt_tail_falls_back(self, mock_reader):
+        self.write_rows(b'task1;2020-10-25;0800;;t1;d;11\r\ntask2;2020-')
+        mock_reader.return_value = [['task1', '2020-10-25', '0800', '', 't1', 'd', '11']]
+
+        self.assertEqual('task1', last_task('2020-10-25').id)
+        mock_reader.assert_called()
+
+    def test_missing_file(self):
+        self.assertRaises(FileNotFoundError, last_task, '2020-10-25')
@@ -0,0 +1,72 @@
+
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.controller.maintenance import compact_tasks
+from wdc.controller.work_day import list_tasks, get_task_info
+from wdc.helper.io import write_task
+
+
+class CompactTasksFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        write_task(create_task('task1', '2020-10-01', '11'))
+        write_task(create_task('task2', '2020-10-01', '12'))
+        write_task(create_task('task1', '2020-10-01', '13', end='0900'))
+        write_task(create_task('task1', '2020-10-01', '14', end='1000'))
+        # Amended to a different date in the same month
+        write_task(create_task('task2', '2020-10-02', '15', end='1000'))
+        write_task(create_task('task3', '2020-11-01', '16'))
+        write_task(create_task('task3', '2020-11-01', '17', end='1000'))
+
+    def test_keep_latest(self):
+        listed_before = sorted((t.id, t.timestamp) for t in list_tasks('2020-10-01', False))
+
+        result = compact_tasks('202010')
+
+        self.assertEqual([('202010', 5, 3)], result)
+        self.assertEqual(listed_before, sorted((t.id, t.timestamp) for t in list_tasks('2020-10-01', False)))
+        self.assertEqual(['15'], [t.timestamp for t in list_tasks('2020-10-02', False)])
+
+        task_info = get_task_info('task1')
+        self.assertEqual('14', task_info.current.timestamp)
+        self.assertEqual([], task_info.history)
+
+    def test_keep_multiple_versions(self):
+        result = compact_tasks('202010', keep=2)
+
+        self.assertEqual([('202010', 5, 4)], result)
+        self.assertEqual(['13'], [t.timestamp for t in get_task_info('task1').history])
+
+    def test_all_months(self):
+        result = compact_tasks()
+
+        self.assertEqual([('202010', 5, 3), ('202011', 2, 1)], result)
+
+    def test_broken_rows_kept(self):
+        with open(str(self.home_path / '202010.csv'), 'a') as file:
+            file.write('broken;2020-10-01\ntask4;2020-10-01;0800;;t1;description;x\n')
+
+        result = compact_tasks('202010')
+
+        self.assertEqual([('202010', 7, 5)], result)
+        rows = (self.home_path / '202010.csv').read_text().splitlines()
+        self.assertEqual(['broken;2020-10-01', 'task4;2020-10-01;0800;;t1;description;x'], rows[-2:])
+        self.assertEqual('14', get_task_info('task1').current.timestamp)
+
+    def test_one_field_row_kept(self):
+        list_tasks('2020-10-01', False)
+        with open(str(self.home_path / '202010.csv'), 'a') as file:
+            file.write('garbage\n')
+        write_task(create_task('task4', '2020-10-01', '18'))
+
+        compact_tasks('202010')
+
+        self.assertEqual(['task1', 'task2', 'task4'], sorted(t.id for t in list_tasks('2020-10-01', False)))
+        self.assertEqual('18', get_task_info('task4').current.timestamp)
+
+    def test_unknown_month(self):
+        self.assertEqual([], compact_tasks('202001'))
+
+    def test_invalid_parameters(self):
+        self.assertRaises(ValueError, compact_tasks, '2020-10')
+        self.assertRaises(ValueError, compact_tasks, '202010', 0)
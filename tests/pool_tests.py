@@ -0,0 +1,22 @@
+import unittest
+
+from wdc.helper.pool import pool_map
+
+
+def power(base, exponent):
+    return base ** exponent
+
+
+class PoolMapFixture(unittest.TestCase):
+    def test_serial(self):
+        self.assertEqual([1, 8, 9], list(pool_map(power, [(1, 2), (2, 3), (3, 2)], 1)))
+
+    def test_parallel_keeps_order(self):
+        self.assertEqual([1, 8, 9, 16], list(pool_map(power, [(1, 2), (2, 3), (3, 2), (2, 4)], 2)))
+
+    def test_no_arguments(self):
+        self.assertEqual([], list(pool_map(power, [], 4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.controller.report import build_report
+from wdc.helper.io import write_tasks
+
+
+class BuildReportFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        write_tasks([
+            create_task('a', '2020-10-30', '1', end='0900', tags='dev'),
+            create_task('b', '2020-10-30', '2', start='0900', tags='dev,review'),
+            create_task('b', '2020-10-30', '3', start='0900', end='1030', tags='dev,review'),
+            create_task('c', '2020-10-31', '4', start='2330', end='0030', tags=''),
+            create_task('d', '2020-11-02', '5', tags='dev'),
+            create_task('e', '2020-11-02', '6', start='1000', end='1200', tags='meeting'),
+            create_task('f', '2020-12-01', '7', end='1600', tags='dev')
+        ])
+
+    def test_by_tag(self):
+        result = build_report('2020-10-01', '2020-11-30', 'tag')
+
+        self.assertEqual([('-', 60), ('dev', 150), ('meeting', 120), ('review', 90)], result)
+
+    def test_by_date(self):
+        result = build_report('2020-10-30', '2020-11-02', 'date')
+
+        self.assertEqual([('2020-10-30', 150), ('2020-10-31', 60), ('2020-11-02', 120)], result)
+
+    def test_by_week(self):
+        result = build_report('2020-10-01', '2020-12-31', 'week')
+
+        self.assertEqual([('2020-W44', 210), ('2020-W45', 120), ('2020-W49', 480)], result)
+
+    def test_by_month(self):
+        result = build_report('2020-10-01', '2020-12-31', 'month')
+
+        self.assertEqual([('2020-10', 210), ('2020-11', 120), ('2020-12', 480)], result)
+
+    def test_by_year(self):
+        result = build_report('2020-10-01', '2020-12-31', 'year')
+
+        self.assertEqual([('2020', 810)], result)
+
+    def test_partial_month(self):
+        result = build_report('2020-10-31', '2020-11-01', 'date')
+
+        self.assertEqual([('2020-10-31', 60)], result)
+
+    def test_broken_rows_skipped(self):
+        with open(str(self.home_path / '202012.csv'), 'a') as file:
+            file.write('g;2020-12-02;9999;1000;dev;description;8\n')
+            file.write('h;2020-12-02;0800;1000;dev;description;x\n')
+
+        result = build_report('2020-12-01', '2020-12-31', 'tag')
+
+        self.assertEqual([('dev', 480)], result)
+
+    def test_empty_range(self):
+        self.assertEqual([], build_report('2021-01-01', '2021-12-31', 'tag'))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, build_report, '2020.10.01', '2020-12-31', 'tag')
+        self.assertRaises(ValueError, build_report, '2020-10-01', '2020-12-31', 'decade')
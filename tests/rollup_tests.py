@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import patch
+
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.helper.io import read_day_totals, write_task, write_tasks
+from wdc.helper.rollup import DayTotal, compute_day_totals, latest_positions, read_rollups, \
+    rebuild_rollups
+from wdc.helper.task_file import to_columns
+
+
+class ComputeDayTotalsFixture(unittest.TestCase):
+    def test_valid(self):
+        columns = to_columns([
+            ['a', '2020-10-25', '0800', '0900', 'dev', 'd', '1'],
+            ['b', '2020-10-25', '0930', '', 'dev', 'd', '2'],
+            ['b', '2020-10-25', '0930', '1000', 'dev', 'd', '3'],
+            ['c', '2020-10-25', '0700', '', 'meeting', 'd', '4'],
+            ['d', '2020-10-26', '2330', '0030', 'dev', 'd', '5']
+        ])
+
+        self.assertEqual([
+            DayTotal('2020-10-25', 'dev', 90, 2, 480, 600),
+            DayTotal('2020-10-25', 'meeting', 0, 1, 420, -1),
+            DayTotal('2020-10-26', 'dev', 60, 1, 1410, 30)
+        ], compute_day_totals(columns))
+
+    def test_broken_rows_ignored(self):
+        columns = to_columns([
+            ['a', '2020-10-25', '0800', '0900', 'dev', 'd', '1'],
+            ['b', '2020-10-25', '9999', '1000', 'dev', 'd', '2'],
+            ['c', '2020-10-25', '0800', '1000', 'dev', 'd', 'x']
+        ])
+
+        self.assertEqual([DayTotal('2020-10-25', 'dev', 60, 1, 480, 540)], compute_day_totals(columns))
+
+    def test_empty(self):
+        self.assertEqual([], compute_day_totals(to_columns([])))
+
+
+class LatestPositionsFixture(unittest.TestCase):
+    def test_increasing_timestamps(self):
+        self.assertEqual([2, 1], latest_positions(['a', 'b', 'a'], ['d', 'd', 'd'], [1, 2, 3]))
+
+    def test_unordered_timestamps(self):
+        self.assertEqual([0, 1], latest_positions(['a', 'b', 'a'], ['d', 'd', 'd'], [3, 2, 1]))
+
+    def test_equal_timestamps_first_wins(self):
+        self.assertEqual([0], latest_positions(['a', 'a'], ['d', 'd'], [1, 1]))
+
+    def test_same_id_on_different_dates(self):
+        self.assertEqual([0, 1], latest_positions(['a', 'a'], ['d1', 'd2'], [1, 2]))
+
+
+class RollupStoreFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        write_tasks([
+            create_task('a', '2020-10-25', '1', end='0900', tags='dev'),
+            create_task('b', '2020-10-26', '2', tags='dev')
+        ])
+
+    def test_built_on_first_read(self):
+        self.assertFalse((self.home_path / 'rollups' / '202010.rollup').exists())
+
+        self.assertEqual([
+            DayTotal('2020-10-25', 'dev', 60, 1, 480, 540),
+            DayTotal('2020-10-26', 'dev', 0, 1, 480, -1)
+        ], read_day_totals('202010'))
+        self.assertTrue((self.home_path / 'rollups' / '202010.rollup').exists())
+
+    def test_updated_on_write(self):
+        read_rollups(self.home_path, '202010.csv')
+
+        with patch('wdc.helper.rollup.rebuild_rollups') as mock_rebuild:
+            write_task(create_task('b', '2020-10-26', '3', end='1000', tags='dev'))
+            write_task(create_task('c', '2020-10-26', '4', start='1000', end='1100', tags='meeting'))
+
+            self.assertEqual([
+                DayTotal('2020-10-25', 'dev', 60, 1, 480, 540),
+                DayTotal('2020-10-26', 'dev', 120, 1, 480, 600),
+                DayTotal('2020-10-26', 'meeting', 60, 1, 600, 660)
+            ], read_rollups(self.home_path, '202010.csv'))
+            mock_rebuild.assert_not_called()
+
+    def test_rebuilt_after_large_append(self):
+        read_rollups(self.home_path, '202010.csv')
+
+        with patch('wdc.helper.rollup.rebuild_rollups', wraps=rebuild_rollups) as mock_rebuild:
+            write_tasks([create_task(f'c{i}', '2020-10-27', str(10 + i), end='0801', tags='dev') for i in range(10)])
+
+            mock_rebuild.assert_called_once()
+
+        self.assertEqual(DayTotal('2020-10-27', 'dev', 10, 10, 480, 481), read_day_totals('202010')[2])
+
+    def test_rebuilt_after_external_change(self):
+        read_day_totals('202010')
+
+        with open(str(self.home_path / '202010.csv'), 'a') as file:
+            file.write('c;2020-10-25;1000;1030;dev;description;5\n')
+
+        self.assertEqual(DayTotal('2020-10-25', 'dev', 90, 2, 480, 630), read_day_totals('202010')[0])
+
+    def test_missing_month(self):
+        self.assertEqual([], read_day_totals('202011'))
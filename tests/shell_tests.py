@@ -0,0 +1,139 @@
+import contextlib
+import io
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import Callable
+
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.helper.io import write_task
+from wdc.helper.shell import WdcShell
+from wdc.helper.storage import buffered_writes
+from wdc.runner import cli
+
+
+class WdcShellFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        write_task(create_task('abc123', '2020-09-30', '11', tags='home'))
+        write_task(create_task('abd456', '2020-10-01', '12', tags='work,meeting'))
+
+        self.shell = WdcShell(cli)
+
+    def run_lines(self, *lines: str) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            for line in lines:
+                self.shell.onecmd(line)
+
+        return output.getvalue()
+
+    def test_commands(self):
+        output = self.run_lines('start 0900 -d 2020-10-01 -m added', 'list -d 2020-10-01')
+
+        self.assertEqual(0, self.shell.exit_code)
+        self.assertIn('09:00', output)
+        self.assertIn('abd456', output)
+
+    def test_usage_error(self):
+        output = self.run_lines('start 0900 --unknown')
+
+        self.assertEqual(2, self.shell.exit_code)
+        self.assertIn('no such option', output)
+
+    def test_blocked_and_broken_lines(self):
+        self.assertIn('can not be run', self.run_lines('shell'))
+        self.assertIn('Could not read', self.run_lines('start "0900'))
+
+    def test_empty_line_does_not_repeat(self):
+        self.run_lines('start 0900 -d 2020-10-01')
+        self.run_lines('')
+
+        self.assertEqual(2, len((self.home_path / '202010.csv').read_text().splitlines()))
+
+    def test_writes_collected_until_read(self):
+        with buffered_writes():
+            self.run_lines('start 0900 -d 2020-10-01 -m first', 'start 1000 -d 2020-10-01 -m second')
+
+            self.assertEqual(1, len((self.home_path / '202010.csv').read_text().splitlines()))
+
+            output = self.run_lines('list -d 2020-10-01')
+
+            self.assertEqual(3, len((self.home_path / '202010.csv').read_text().splitlines()))
+            self.assertIn('10:00', output)
+
+    def test_complete_command_names(self):
+        names = self.shell.completenames('s')
+
+        self.assertIn('start', names)
+        self.assertNotIn('shell', names)
+        self.assertNotIn('serve', names)
+
+    def test_complete_task_ids(self):
+        self.assertEqual(['abc123', 'abd456'], self.shell.completedefault('ab', 'amend ab', 6, 8))
+        self.assertEqual(['abc123'], self.shell.completedefault('abc', 'info abc', 5, 8))
+        self.assertEqual([], self.shell.completedefault('ab', 'list ab', 5, 7))
+
+    def test_complete_tags(self):
+        self.assertEqual(['meeting'], self.shell.completedefault('m', 'start 0800 -t m', 14, 15))
+        self.assertEqual(['home', 'meeting', 'work'], self.shell.completedefault('', 'start 0800 --tag ', 17, 17))
+
+
+@unittest.skipUnless(hasattr(signal, 'SIGHUP'), 'Needs SIGHUP')
+class ShellProcessFixture(unittest.TestCase):
+    # Runs wdc shell without buffered standard streams, so that the prompts can be waited for
+    SHELL_COMMAND = [sys.executable, '-u', '-c', 'from wdc.runner import cli; cli(["shell"], obj={})']
+
+    def run_shell(self, leave: Callable[[subprocess.Popen], None]) -> str:
+        """
+        Starts a task in a new shell process, leaves the shell with the given function and returns the task file
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            environment = dict(os.environ, HOME=temp_dir, PYTHONPATH=os.getcwd())
+            process = subprocess.Popen(self.SHELL_COMMAND, env=environment, stdin=subprocess.PIPE,
+                                       stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            try:
+                process.stdin.write(b'start 0800 -d 2020-10-01 -m stored\n')
+                process.stdin.flush()
+
+                # The prompt is shown once before and once after the start
+                output = b''
+                while output.count(b'wdc> ') < 2:
+                    data = os.read(process.stdout.fileno(), 1024)
+                    self.assertNotEqual(b'', data, f'The shell ended early: {output}')
+                    output += data
+
+                # input() writes the prompt and starts reading in one call, a signal sent in between is only
+                # handled once the read returns. The shell is given the time to start waiting for the next line.
+                time.sleep(0.5)
+                leave(process)
+                process.wait(timeout=10)
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                process.stdin.close()
+                process.stdout.close()
+
+            task_file = Path(temp_dir) / '.wdc' / '202010.csv'
+
+            return task_file.read_text() if task_file.exists() else ''
+
+    def test_task_stored_on_eof(self):
+        self.assertIn('stored', self.run_shell(lambda process: process.stdin.close()))
+
+    def test_task_stored_when_terminated(self):
+        self.assertIn('stored', self.run_shell(lambda process: process.send_signal(signal.SIGTERM)))
+
+    def test_task_stored_when_terminal_closed(self):
+        self.assertIn('stored', self.run_shell(lambda process: process.send_signal(signal.SIGHUP)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import shutil
+from unittest.mock import patch
+
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.helper.io import month_cache, read_all_tasks, write_task
+from wdc.helper.snapshot import SNAPSHOT_DIR, load_snapshot, save_snapshot
+from wdc.helper.task_file import parse_rows
+
+
+class SnapshotFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.tasks = [
+            create_task('task1', '2020-10-01', '11'),
+            create_task('task2', '2020-10-01', '12'),
+            create_task('task1', '2020-10-01', '13'),
+            create_task('task1', '2020-10-02', '10')
+        ]
+
+    def test_round_trip(self):
+        save_snapshot(self.home_path, '202010.csv', (4, 1), 7, self.tasks)
+
+        result = load_snapshot(self.home_path, '202010.csv', (4, 1), 7)
+
+        self.assertEqual(self.tasks, result)
+        self.assertEqual(['11', '12', '13', '10'], [t.timestamp for t in result])
+
+    def test_empty(self):
+        save_snapshot(self.home_path, '202010.csv', (0, 1), 0, [])
+
+        self.assertEqual([], load_snapshot(self.home_path, '202010.csv', (0, 1), 0))
+
+    def test_outdated(self):
+        save_snapshot(self.home_path, '202010.csv', (4, 1), 7, self.tasks)
+
+        self.assertIsNone(load_snapshot(self.home_path, '202010.csv', (4, 2), 7))
+        self.assertIsNone(load_snapshot(self.home_path, '202010.csv', (4, 1), 8))
+
+    def test_missing_or_broken(self):
+        self.assertIsNone(load_snapshot(self.home_path, '202010.csv', (4, 1), 7))
+
+        (self.home_path / SNAPSHOT_DIR).mkdir()
+        with open(str(self.home_path / SNAPSHOT_DIR / '202010.snapshot'), 'wb') as file:
+            file.write(b'\x00broken')
+
+        self.assertIsNone(load_snapshot(self.home_path, '202010.csv', (4, 1), 7))
+
+
+class SnapshotReadFixture(HomeDirTestCase):
+    def setUp(self):
+        super().setUp()
+
+        write_task(create_task('task1', '2020-10-01', '11'))
+        write_task(create_task('task2', '2020-10-02', '12'))
+        month_cache().clear()
+
+    def test_closed_month_loaded_from_snapshot(self):
+        read_all_tasks('2020-10-01')
+        month_cache().clear()
+
+        with patch('wdc.helper.io.parse_rows') as mock_parser:
+            result = read_all_tasks('2020-10-01')
+
+            mock_parser.assert_not_called()
+
+        self.assertEqual(['task1', 'task2'], [t.id for t in result])
+
+    def test_deleted_cache_directory(self):
+        read_all_tasks('2020-10-01')
+        month_cache().clear()
+        shutil.rmtree(str(self.home_path / SNAPSHOT_DIR))
+
+        with patch('wdc.helper.io.parse_rows', wraps=parse_rows) as mock_parser:
+            result = read_all_tasks('2020-10-01')
+
+            mock_parser.assert_called()
+
+        self.assertEqual(['task1', 'task2'], [t.id for t in result])
+
+    def test_changed_file_parsed_again(self):
+        read_all_tasks('2020-10-01')
+        month_cache().clear()
+        write_task(create_task('task3', '2020-10-02', '13'))
+        month_cache().clear()
+
+        self.assertEqual(['task1', 'task2', 'task3'], [t.id for t in read_all_tasks('2020-10-01')])
+
+    def test_changed_row_with_same_signature_parsed_again(self):
+        read_all_tasks('2020-10-01')
+        month_cache().clear()
+
+        file_path = self.home_path / '202010.csv'
+        stat = os.stat(str(file_path))
+        file_path.write_bytes(file_path.read_bytes().replace(b'description', b'changed....'))
+        os.utime(str(file_path), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertEqual(['changed....'] * 2, [t.description for t in read_all_tasks('2020-10-01')])
+
+    @patch('wdc.helper.io.today')
+    def test_current_month_not_stored(self, mock_today):
+        mock_today.return_value = '2020-10-25'
+
+        read_all_tasks('2020-10-01')
+
+        self.assertFalse((self.home_path / SNAPSHOT_DIR / '202010.snapshot').exists())
@@ -0,0 +1,180 @@
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.helpers import HomeDirTestCase, create_task
+from wdc.controller.maintenance import migrate_tasks
+from wdc.controller.work_day import select_day_tasks
+from wdc.exceptions import StorageError, SettingsError
+from wdc.helper.sqlite_storage import SqliteTaskStorage
+from wdc.helper import storage
+from wdc.helper.storage import CsvTaskStorage, buffered_writes, get_storage, open_storage
+
+
+class StorageContract(object):
+    """
+    Behaviour shared by all storage backends, mixed into one fixture per backend
+    """
+
+    def create_storage(self, home_path: Path):
+        raise NotImplementedError()
+
+    def setUp(self):
+        super().setUp()
+
+        self.storage = self.create_storage(self.home_path)
+        self.storage.write_task(create_task('task1', '2020-10-01', '11'))
+        self.storage.write_tasks([
+            create_task('task2', '2020-10-02', '12'),
+            create_task('task1', '2020-10-01', '13', end='0900'),
+            create_task('task3', '2020-11-01', '14')
+        ])
+
+    def test_last_task(self):
+        self.assertEqual('13', self.storage.last_task('2020-10-30').timestamp)
+        self.assertRaises(FileNotFoundError, self.storage.last_task, '2020-12-01')
+
+    def test_read_all_tasks(self):
+        self.assertEqual(['11', '12', '13'], [t.timestamp for t in self.storage.read_all_tasks('2020-10-15')])
+
+    def test_read_day_tasks(self):
+        self.assertEqual(['11', '13'], [t.timestamp for t in self.storage.read_day_tasks('2020-10-01')])
+        self.assertEqual([], self.storage.read_day_tasks('2020-10-03'))
+
+    def test_find_tasks(self):
+        result = self.storage.find_tasks('task1')
+
+        self.assertEqual(['11', '13'], [t.timestamp for t in result])
+        self.assertEqual('0900', result[1].end)
+
+    def test_months(self):
+        self.assertEqual(['202010', '202011'], self.storage.months())
+        self.assertEqual(['task3'], [t.id for t in self.storage.iter_month('202011')])
+
+    def test_read_day_totals(self):
+        result = self.storage.read_day_totals('202010')
+
+        self.assertEqual(['2020-10-01', '2020-10-02'], [t.date for t in result])
+        self.assertEqual([60, 0], [t.minutes for t in result])
+
+    def test_month_signature(self):
+        signature = self.storage.month_signature('202010')
+
+        self.storage.write_task(create_task('task4', '2020-10-05', '15'))
+
+        self.assertNotEqual(signature, self.storage.month_signature('202010'))
+        self.assertEqual(self.storage.month_signature('202012'), self.storage.month_signature('202012'))
+
+    def test_compact_month(self):
+        self.assertEqual((3, 2), self.storage.compact_month('202010', 1))
+        self.assertEqual(['13'], [t.timestamp for t in self.storage.find_tasks('task1')])
+
+    def test_compact_keeps_listed_version(self):
+        self.storage.write_tasks([create_task('task5', '2020-10-03', '20', description='first'),
+                                  create_task('task5', '2020-10-03', '20', description='second')])
+
+        def listed():
+            day_tasks = [t for t in self.storage.read_all_tasks('2020-10-03') if t.date == '2020-10-03']
+            return [t.description for t in select_day_tasks(day_tasks, False)]
+
+        listed_before = listed()
+        self.storage.compact_month('202010', 1)
+
+        self.assertEqual(['first'], listed_before)
+        self.assertEqual(listed_before, listed())
+
+
+class CsvStorageFixture(StorageContract, HomeDirTestCase):
+    def create_storage(self, home_path: Path):
+        return CsvTaskStorage()
+
+
+class SqliteStorageFixture(StorageContract, HomeDirTestCase):
+    def create_storage(self, home_path: Path):
+        return SqliteTaskStorage(home_path / 'tasks.sqlite3')
+
+    def tearDown(self):
+        self.storage.close()
+        super().tearDown()
+
+
+class StorageSelectionFixture(HomeDirTestCase):
+    def write_settings(self, content: str):
+        with open(str(self.home_path / 'settings.toml'), 'w') as file:
+            file.write(content)
+
+    def test_csv_by_default(self):
+        self.assertIsInstance(get_storage(), CsvTaskStorage)
+
+    def test_sqlite_selected(self):
+        self.write_settings('[storage]\nbackend = "sqlite"\nsqlite_file = "my.db"\n')
+
+        storage = get_storage()
+
+        self.assertIsInstance(storage, SqliteTaskStorage)
+        self.assertTrue((self.home_path / 'my.db').exists())
+        storage.close()
+
+    def test_unknown_backend(self):
+        self.write_settings('[storage]\nbackend = "mongo"\n')
+
+        self.assertRaises(StorageError, get_storage)
+
+    def test_invalid_settings(self):
+        self.write_settings('[storage\n')
+
+        self.assertRaises(SettingsError, get_storage)
+
+    def test_migrate(self):
+        csv_storage = open_storage('csv')
+        csv_storage.write_tasks([
+            create_task('task1', '2020-10-01', '11'),
+            create_task('task1', '2020-10-01', '12', end='0900'),
+            create_task('task2', '2020-11-01', '13')
+        ])
+
+        self.assertEqual(3, migrate_tasks('csv', 'sqlite'))
+
+        sqlite_storage = open_storage('sqlite')
+        self.assertEqual(['202010', '202011'], sqlite_storage.months())
+        self.assertEqual(['11', '12'], [t.timestamp for t in sqlite_storage.find_tasks('task1')])
+
+        self.assertRaises(StorageError, migrate_tasks, 'csv', 'sqlite')
+        self.assertRaises(StorageError, migrate_tasks, 'csv', 'csv')
+        sqlite_storage.close()
+
+
+class BufferedWritesFixture(HomeDirTestCase):
+    def test_written_together(self):
+        with patch.object(CsvTaskStorage, 'write_tasks', autospec=True,
+                          side_effect=CsvTaskStorage.write_tasks) as mock_write:
+            with buffered_writes():
+                storage.write_task(create_task('task1', '2020-10-01', '11'))
+                self.assertEqual(1, storage.write_tasks([create_task('task2', '2020-10-01', '12')]))
+
+                self.assertFalse((self.home_path / '202010.csv').exists())
+
+        self.assertEqual(1, mock_write.call_count)
+        self.assertEqual(['task1', 'task2'], [task.id for task in storage.read_all_tasks('2020-10-01')])
+
+    def test_written_before_reads(self):
+        with buffered_writes():
+            storage.write_task(create_task('task1', '2020-10-01', '11'))
+
+            self.assertEqual(['task1'], [task.id for task in storage.read_all_tasks('2020-10-01')])
+
+            storage.write_task(create_task('task1', '2020-10-01', '12', end='0900'))
+            self.assertEqual('0900', storage.last_task('2020-10-01').end)
+
+    def test_nested(self):
+        with buffered_writes():
+            with buffered_writes():
+                storage.write_task(create_task('task1', '2020-10-01', '11'))
+
+            self.assertFalse((self.home_path / '202010.csv').exists())
+
+        self.assertTrue((self.home_path / '202010.csv').exists())
+
+    def test_not_buffered(self):
+        storage.write_task(create_task('task1', '2020-10-01', '11'))
+
+        self.assertTrue((self.home_path / '202010.csv').exists())
@@ -1,8 +1,12 @@
 import unittest
+from datetime import date
+
 from freezegun import freeze_time
 
 from wdc.exceptions import TimeFormatError, DateFormatError
-from wdc.time import WdcTime, is_time_valid, today, is_date_valid, timestamp, assert_time, assert_date
+from wdc.time import WdcTime, is_time_valid, today, is_date_valid, is_month_valid, timestamp, assert_time, \
+    assert_date, to_minute_of_day, from_minute_of_day, to_day_ordinal, \
+    months_in_range
 
 
 class WdcTimeFixture(unittest.TestCase):
@@ -100,6 +104,29 @@ class WdcTimeFixture(unittest.TestCase):
         self.assertTrue(small_time == small_time)
         self.assertFalse(small_time == big_time)
 
+    def test_compare_hours_and_minutes(self):
+        self.assertNotEqual(WdcTime('0210'), WdcTime('0120'))
+        self.assertTrue(WdcTime('0120') < WdcTime('0210'))
+        self.assertEqual([WdcTime('0120'), WdcTime('0210')], sorted([WdcTime('0210'), WdcTime('0120')]))
+
+    def test_hash(self):
+        self.assertEqual(hash(WdcTime('0800')), hash(WdcTime('0800')))
+        self.assertEqual(2, len({WdcTime('0210'), WdcTime('0120')}))
+
+    def test_from_minutes(self):
+        self.assertEqual('0930', str(WdcTime.from_minutes(570)))
+        self.assertEqual('0010', str(WdcTime.from_minutes(24 * 60 + 10)))
+        self.assertEqual(570, int(WdcTime.from_minutes(570)))
+
+    def test_from_strings(self):
+        self.assertEqual([480, 570], [t.minute_of_day for t in WdcTime.from_strings(['0800', '0930'])])
+        self.assertRaises(ValueError, WdcTime.from_strings, ['0800', '2360'])
+
+    def test_add_wraps_midnight(self):
+        sum_time = WdcTime('2300') + WdcTime('0230')
+
+        self.assertEqual('0130', str(sum_time))
+
 
 class IsTimeValidFixture(unittest.TestCase):
     def test_valid(self):
@@ -133,6 +160,19 @@ class IsDateValidFixture(unittest.TestCase):
         self.assertFalse(is_date_valid(''))
 
 
+class IsMonthValidFixture(unittest.TestCase):
+    def test_valid(self):
+        self.assertTrue(is_month_valid('202010'))
+        self.assertTrue(is_month_valid('198001'))
+
+    def test_invalid(self):
+        self.assertFalse(is_month_valid('2020-10'))
+        self.assertFalse(is_month_valid('202013'))
+        self.assertFalse(is_month_valid('2020101'))
+        self.assertFalse(is_month_valid(''))
+        self.assertFalse(is_month_valid(None))
+
+
 class TimestampFixture(unittest.TestCase):
     @freeze_time('2020-10-25 10:00:00')
     def test_valid(self):
@@ -162,3 +202,37 @@ class AssertDateFixture(unittest.TestCase):
         self.assertRaises(DateFormatError, assert_date, '2020.10.25')
         self.assertRaises(DateFormatError, assert_date, '2020.1.30')
         self.assertRaises(DateFormatError, assert_date, '2020.10.3')
+
+
+class MinuteOfDayFixture(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(0, to_minute_of_day('0000'))
+        self.assertEqual(570, to_minute_of_day('0930'))
+        self.assertEqual(1439, to_minute_of_day('2359'))
+        self.assertEqual(-1, to_minute_of_day(''))
+
+    def test_round_trip(self):
+        self.assertEqual('0930', from_minute_of_day(570))
+        self.assertEqual('', from_minute_of_day(-1))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, to_minute_of_day, 'ab00')
+
+
+class DayOrdinalFixture(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(date(2020, 10, 25).toordinal(), to_day_ordinal('2020-10-25'))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, to_day_ordinal, '2020.10.25')
+
+
+class MonthsInRangeFixture(unittest.TestCase):
+    def test_single_month(self):
+        self.assertEqual(['202010'], list(months_in_range('2020-10-01', '2020-10-25')))
+
+    def test_year_boundary(self):
+        self.assertEqual(['202011', '202012', '202101'], list(months_in_range('2020-11-30', '2021-01-01')))
+
+    def test_empty(self):
+        self.assertEqual([], list(months_in_range('2020-11-01', '2020-10-01')))
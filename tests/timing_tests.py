@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from wdc.helper import timing
+
+
+class TimingFixture(unittest.TestCase):
+    def tearDown(self):
+        timing.stop_timing()
+
+    @staticmethod
+    def clock(*values):
+        # Replaces the clock of the timing module by one returning the given values in order
+        return patch('wdc.helper.timing.time.perf_counter', side_effect=list(values))
+
+    def test_nothing_measured(self):
+        self.assertIs(timing.phase(timing.READ), timing.phase(timing.DECODE))
+
+        timing.record_read(b'row')
+
+        self.assertIsNone(timing.stop_timing())
+
+    def test_nested_phases(self):
+        with self.clock(0.0, 1.0, 2.0, 5.0, 7.0, 10.0):
+            timings = timing.start_timing('list')
+            with timing.phase(timing.READ):
+                with timing.phase(timing.DECODE):
+                    pass
+            timing.stop_timing()
+
+        self.assertEqual(3.0, timings.seconds[timing.DECODE])
+        # The decoding is not counted as read
+        self.assertEqual(3.0, timings.seconds[timing.READ])
+        self.assertEqual(4.0, timings.seconds[timing.OTHER])
+        self.assertEqual(10.0, timings.total)
+
+    def test_phase_left_by_exception(self):
+        timings = timing.start_timing()
+
+        with self.assertRaises(ValueError):
+            with timing.phase(timing.WRITE):
+                raise ValueError()
+
+        self.assertEqual([], timings._stack)
+        self.assertGreater(timings.seconds[timing.WRITE], 0.0)
+
+    def test_timed(self):
+        @timing.timed(timing.SORT)
+        def sort(values):
+            return sorted(values)
+
+        timings = timing.start_timing()
+
+        self.assertEqual([1, 2], sort([2, 1]))
+        self.assertGreater(timings.seconds[timing.SORT], 0.0)
+        self.assertEqual('sort', sort.__name__)
+
+    def test_bytes(self):
+        timings = timing.start_timing()
+
+        timing.record_read(b'abc')
+        timing.record_read(10)
+        timing.record_write('ä;')
+
+        self.assertEqual(13, timings.bytes_read)
+        self.assertEqual(3, timings.bytes_written)
+
+    def test_files_opened(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            timings = timing.start_timing()
+
+            with open(os.path.join(temp_dir, '202010.csv'), 'w'):
+                pass
+            with open(os.path.join(temp_dir, 'module.py'), 'w'):
+                pass
+
+            self.assertEqual(1, timings.files_opened)
+
+            timing.stop_timing()
+            with open(os.path.join(temp_dir, '202010.csv'), 'r'):
+                pass
+
+            self.assertEqual(1, timings.files_opened)
+
+    def test_import_taken_once(self):
+        with patch('wdc.helper.timing._import_seconds', 0.1):
+            self.assertEqual(0.1, timing.take_import_seconds())
+            self.assertEqual(0.0, timing.take_import_seconds())
+
+    def test_report(self):
+        timings = timing.start_timing('info', 0.5)
+        timing.record_read(100)
+        timing.stop_timing()
+
+        report = timings.as_dict()
+
+        self.assertEqual('info', report['command'])
+        self.assertEqual(list(timing.PHASES), list(report['seconds']))
+        self.assertEqual(0.5, report['seconds'][timing.IMPORT])
+        self.assertEqual(100, report['bytes_read'])
+        self.assertIn('read 100 bytes', timings.as_text())
@@ -1,7 +1,9 @@
 import unittest
 from unittest.mock import patch
 from freezegun import freeze_time
-from wdc.controller.work_day import start_work_task, list_tasks, WdcTaskInfo, get_task_info, amend_task, sort_by_time
+from tests.helpers import create_task
+from wdc.controller.work_day import start_work_task, list_tasks, WdcTaskInfo, get_task_info, amend_task, sort_by_time, \
+    list_tasks_in_range
 from wdc.classes import WdcTask
 
 
@@ -101,7 +103,7 @@ class ListWorkTasksFixture(unittest.TestCase):
     def test_invalid_date(self):
         self.assertRaises(ValueError, list_tasks, '9999-99-99', False)
 
-    @patch('wdc.controller.work_day.read_all_tasks')
+    @patch('wdc.controller.work_day.read_day_tasks')
     def test_return_tasks_for_given_day(self, mock_reader):
         mock_reader.return_value = [
             WdcTask(
@@ -129,7 +131,7 @@ class ListWorkTasksFixture(unittest.TestCase):
         self.assertEqual(1, len(results))
         self.assertEqual('task1', results[0].id)
 
-    @patch('wdc.controller.work_day.read_all_tasks')
+    @patch('wdc.controller.work_day.read_day_tasks')
     def test_task_are_sorted(self, mock_reader):
         mock_reader.return_value = [
             WdcTask(
@@ -158,7 +160,7 @@ class ListWorkTasksFixture(unittest.TestCase):
         self.assertEqual('task2', results[0].id)
         self.assertEqual('task1', results[1].id)
 
-    @patch('wdc.controller.work_day.read_all_tasks')
+    @patch('wdc.controller.work_day.read_day_tasks')
     def test_filter_duplicate_tasks(self, mock_reader):
         mock_reader.return_value = [
             WdcTask(
@@ -186,7 +188,7 @@ class ListWorkTasksFixture(unittest.TestCase):
         self.assertEqual(1, len(results))
         self.assertEqual('1000', results[0].end)
 
-    @patch('wdc.controller.work_day.read_all_tasks')
+    @patch('wdc.controller.work_day.read_day_tasks')
     def test_duplicates_on_beginning(self, mock_reader):
         mock_reader.return_value = [
             WdcTask(
@@ -227,7 +229,7 @@ class ListWorkTasksFixture(unittest.TestCase):
         self.assertEqual('task2', results[1].id)
         self.assertEqual('33', results[1].timestamp)
 
-    @patch('wdc.controller.work_day.read_all_tasks')
+    @patch('wdc.controller.work_day.read_day_tasks')
     def test_duplicates_on_end(self, mock_reader):
         mock_reader.return_value = [
             WdcTask(
@@ -457,3 +459,53 @@ class SortTasksByTimeFixture(unittest.TestCase):
         self.assertEqual('2', result[0].id)
         self.assertEqual('3', result[1].id)
         self.assertEqual('1', result[2].id)
+
+    def test_hours_before_minutes(self):
+        test_object = [
+            WdcTask(id='1', date='2020-10-25', start='0210', end='', tags='', description='', timestamp='1'),
+            WdcTask(id='2', date='2020-10-25', start='0120', end='', tags='', description='', timestamp='2')
+        ]
+
+        result = sort_by_time(test_object)
+
+        self.assertEqual(['2', '1'], [t.id for t in result])
+
+
+class ListTasksInRangeFixture(unittest.TestCase):
+    @patch('wdc.controller.work_day.iter_month')
+    def test_latest_versions_in_order(self, mock_reader):
+        months = {
+            '202010': [
+                create_task('a', '2020-10-30', '1', start='0900'),
+                create_task('b', '2020-10-31', '2', start='1000'),
+                create_task('c', '2020-10-31', '3'),
+                create_task('b', '2020-10-31', '4', start='1000'),
+                create_task('x', '2020-10-01', '5')
+            ],
+            '202011': [
+                create_task('d', '2020-11-01', '6'),
+                create_task('y', '2020-11-02', '7')
+            ]
+        }
+        mock_reader.side_effect = lambda month: iter(months[month])
+
+        result = list(list_tasks_in_range('2020-10-30', '2020-11-01', False))
+
+        self.assertEqual(['a', 'c', 'b', 'd'], [t.id for t in result])
+        self.assertEqual('4', result[2].timestamp)
+        self.assertEqual(['202010', '202011'], [c.args[0] for c in mock_reader.call_args_list])
+
+    @patch('wdc.controller.work_day.iter_month')
+    def test_show_all(self, mock_reader):
+        mock_reader.return_value = iter([
+            create_task('b', '2020-10-31', '2', start='1000'),
+            create_task('b', '2020-10-31', '1', start='1000')
+        ])
+
+        result = list(list_tasks_in_range('2020-10-01', '2020-10-31', True))
+
+        self.assertEqual(['1', '2'], [t.timestamp for t in result])
+
+    def test_invalid_range(self):
+        self.assertRaises(ValueError, list_tasks_in_range, '2020-10-31', '2020-10-01', False)
+        self.assertRaises(ValueError, list_tasks_in_range, '2020.10.01', '2020-10-31', False)
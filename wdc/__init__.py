@@ -0,0 +1,4 @@
+from time import perf_counter as _perf_counter
+
+# The moment the package started to load, the --timing option of the command line reports the import from here
+IMPORT_STARTED = _perf_counter()
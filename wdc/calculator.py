@@ -1,4 +1,12 @@
-from wdc.time import WdcTime
+from itertools import islice
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from wdc.time import WdcTime, MINUTES_OF_DAY, MINUTES_PER_DAY, from_minute_of_day
+
+BATCH_SIZE = 4096
+
+# The hhmm representation of every minute of the day, used to format many results without a call per result
+_TIMES = [from_minute_of_day(minute) for minute in range(MINUTES_PER_DAY)]
 
 
 def calc_workday_end(start_time: str, break_duration: int, workday_duration: str):
@@ -9,3 +17,81 @@ def calc_workday_end(start_time: str, break_duration: int, workday_duration: str
     result.add_minutes(break_duration)
 
     return result
+
+
+def calc_workday_ends(starts: Sequence[int], breaks: Sequence[int], durations: Sequence[int]) -> List[int]:
+    """
+    Calculates the end of many workdays at once
+
+    :param starts: The starts of the workdays in minutes since midnight
+    :param breaks: The break durations in minutes
+    :param durations: The workday durations in minutes
+    :return: The ends of the workdays in minutes since midnight
+    """
+    return [(start + pause + duration) % MINUTES_PER_DAY for start, pause, duration in zip(starts, breaks, durations)]
+
+
+def _parse_time(value: str, line_number: int) -> int:
+    minutes = MINUTES_OF_DAY.get(value, -1)
+
+    if minutes < 0:
+        raise ValueError(f'Line {line_number}: {value} is not a valid time')
+
+    return minutes
+
+
+def parse_batch_line(line: str, line_number: int, break_duration: int, workday_duration: int) -> Tuple[int, int, int]:
+    """
+    Parses a single line of batch input
+
+    A line holds the start time followed by the optional break duration in minutes and the optional workday
+    duration, separated by white space, commas or semicolons.
+
+    :param line: The line to parse
+    :param line_number: The number of the line, used in error messages
+    :param break_duration: The break duration used if the line does not hold one
+    :param workday_duration: The workday duration in minutes used if the line does not hold one
+    :return: The (start, break, duration) triple in minutes
+    """
+    fields = line.replace(';', ' ').replace(',', ' ').split()
+
+    if not 1 <= len(fields) <= 3:
+        raise ValueError(f'Line {line_number}: expected a start time, a break and a duration but got {line.strip()}')
+
+    start = _parse_time(fields[0], line_number)
+
+    if len(fields) > 1:
+        if not fields[1].isdigit():
+            raise ValueError(f'Line {line_number}: {fields[1]} is not a valid break duration')
+        break_duration = int(fields[1])
+
+    if len(fields) > 2:
+        workday_duration = _parse_time(fields[2], line_number)
+
+    return start, break_duration, workday_duration
+
+
+def calc_batch(lines: Iterable[str], break_duration: int = 30, workday_duration: str = '0745') -> Iterator[str]:
+    """
+    Calculates the workday end for every line of the input, see parse_batch_line for the line format
+
+    The input is consumed in chunks of BATCH_SIZE lines, so results are available before all input is read.
+    Empty lines are skipped. A ValueError naming the line is raised for the first invalid line.
+
+    :param lines: The input lines
+    :param break_duration: The default break duration in minutes
+    :param workday_duration: The default workday duration in the hhmm format
+    :return: An iterator over the workday ends in the hhmm format, one for every non empty line
+    """
+    default_duration = WdcTime(workday_duration).minute_of_day
+    numbered_lines = enumerate(lines, start=1)
+
+    chunk = list(islice(numbered_lines, BATCH_SIZE))
+    while chunk:
+        triples = [parse_batch_line(line, number, break_duration, default_duration)
+                   for number, line in chunk if line.strip()]
+
+        if triples:
+            yield from map(_TIMES.__getitem__, calc_workday_ends(*zip(*triples)))
+
+        chunk = list(islice(numbered_lines, BATCH_SIZE))
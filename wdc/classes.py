@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, NamedTuple
 
 from wdc.time import timestamp as ts
 
@@ -43,3 +43,23 @@ def to_array(task: WdcTask) -> List[str]:
         task.description,
         task.timestamp
     ]
+
+
+class DayTotal(NamedTuple):
+    """
+    The summary of the latest versions of all tasks of one day sharing the same tags
+
+    Attributes:
+        date -- The date of the tasks
+        tags -- The comma separated tags of the tasks
+        minutes -- The summed up duration of the finished tasks
+        tasks -- The number of tasks, finished or not
+        first_start -- The earliest start in minutes since midnight
+        last_end -- The latest end in minutes since midnight, -1 if none of the tasks has ended
+    """
+    date: str
+    tags: str
+    minutes: int
+    tasks: int
+    first_start: int
+    last_end: int
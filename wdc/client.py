@@ -0,0 +1,77 @@
+import json
+import os
+import socket
+import sys
+from typing import List, Optional, Tuple
+
+import wdc.settings as settings
+
+# The commands answered by a running daemon, all others are always run by the client itself
+DAEMON_COMMANDS = ('start', 'end', 'list', 'info', 'amend')
+ENCODING = 'utf-8'
+
+Response = Tuple[str, str, int]
+
+
+def socket_path() -> str:
+    return os.path.join(os.path.expanduser('~'), settings.HOME_DIR, settings.SOCKET_FILE)
+
+
+def send_command(args: List[str], path: str = None) -> Optional[Response]:
+    """
+    Lets a running daemon execute a command
+
+    :param args: The command line arguments, without the program name
+    :param path: The path of the daemon socket, the one in the wdc home directory if not given
+    :return: The standard output, standard error and exit code of the command or None if no daemon is listening
+    """
+    path = path or socket_path()
+
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+        return None
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(path)
+        except OSError:
+            # The socket file of a daemon that did not shut down cleanly
+            return None
+
+        connection.sendall(json.dumps({'args': args}).encode(ENCODING) + b'\n')
+
+        with connection.makefile('rb') as stream:
+            line = stream.readline()
+
+    if not line:
+        # The command might already have been executed, so it is not repeated without the daemon
+        raise ConnectionError(f'The daemon listening on {path} did not answer')
+
+    response = json.loads(line.decode(ENCODING))
+
+    return response['stdout'], response['stderr'], response['exit_code']
+
+
+def main() -> None:
+    """
+    The wdc entry point
+
+    Commands a daemon can answer are sent to it if one is running, everything else is run in this process.
+    Neither click nor the storage is imported when the daemon answers.
+    """
+    args = sys.argv[1:]
+
+    try:
+        response = send_command(args) if args and args[0] in DAEMON_COMMANDS else None
+    except (OSError, ValueError) as error:
+        sys.stderr.write(f'{error}{os.linesep}')
+        sys.exit(1)
+
+    if response is None:
+        from wdc.runner import cli
+        cli(obj={})
+        return
+
+    stdout, stderr, exit_code = response
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    sys.exit(exit_code)
@@ -0,0 +1,135 @@
+import calendar
+from typing import NamedTuple, Tuple
+
+import wdc.helper.io as task_io
+from wdc.helper.checkpoint import load_checkpoints, save_checkpoints
+from wdc.helper.storage import month_signature, months, read_day_totals, storage_id
+from wdc.time import WdcTime, is_date_valid, months_in_range, to_date_no_day, to_day_ordinal, today
+
+WORKDAYS_PER_WEEK = 5
+
+
+class WorkBalance(NamedTuple):
+    """
+    The comparison of the logged time to the expected time over a range of dates
+
+    Attributes:
+        date_from -- The first date of the range
+        date_to -- The last date of the range
+        workdays -- The number of workdays (Monday to Friday) in the range
+        expected -- The expected time in minutes
+        logged -- The logged time in minutes
+    """
+    date_from: str
+    date_to: str
+    workdays: int
+    expected: int
+    logged: int
+
+    @property
+    def balance(self) -> int:
+        return self.logged - self.expected
+
+
+def count_workdays(date_from: str, date_to: str) -> int:
+    """
+    Counts the days from Monday to Friday between two dates
+
+    :param date_from: The first date
+    :param date_to: The last date, inclusive
+    :return: The number of workdays
+    """
+    first = to_day_ordinal(date_from)
+    days = to_day_ordinal(date_to) - first + 1
+
+    if days <= 0:
+        return 0
+
+    weeks, rest = divmod(days, 7)
+    # The ordinal 1 is a Monday
+    first_weekday = (first - 1) % 7
+
+    return weeks * WORKDAYS_PER_WEEK + sum(1 for day in range(rest) if (first_weekday + day) % 7 < WORKDAYS_PER_WEEK)
+
+
+def _month_bounds(month: str) -> Tuple[str, str]:
+    year, month_number = int(month[0:4]), int(month[4:6])
+    last_day = calendar.monthrange(year, month_number)[1]
+
+    return f'{year:04d}-{month_number:02d}-01', f'{year:04d}-{month_number:02d}-{last_day:02d}'
+
+
+def _logged_minutes(month: str, date_from: str, date_to: str) -> int:
+    return sum(total.minutes for total in read_day_totals(month) if date_from <= total.date <= date_to)
+
+
+def first_date() -> str:
+    """
+    Returns the first day of the earliest month with stored tasks, an empty string if nothing is stored
+    """
+    stored_months = months()
+
+    return _month_bounds(stored_months[0])[0] if stored_months else ''
+
+
+def calculate_balance(date_from: str,
+                      date_to: str,
+                      workday_duration: str = '0745',
+                      break_duration: int = 30) -> WorkBalance:
+    """
+    Compares the logged time to the expected time of every workday between two dates
+
+    The logged minutes of every closed month are checkpointed together with the signature of its stored
+    tasks and the storage they are stored in. A month is only read again if its tasks have changed, so the
+    balance up to today usually only reads the current month.
+
+    :param date_from: The first date of the balance
+    :param date_to: The last date of the balance, inclusive
+    :param workday_duration: The expected duration of a workday in the hhmm format
+    :param break_duration: The duration of the break in minutes, added to the expected time of every workday
+    :return: The balance
+    """
+    if not is_date_valid(date_from):
+        raise ValueError(f'{date_from} is not a valid date format')
+    if not is_date_valid(date_to):
+        raise ValueError(f'{date_to} is not a valid date format')
+    if date_from > date_to:
+        raise ValueError(f'The range start {date_from} is after its end {date_to}')
+    if break_duration < 0:
+        raise ValueError(f'{break_duration} is not a valid break duration')
+
+    workdays = count_workdays(date_from, date_to)
+    expected = workdays * (WdcTime(workday_duration).minute_of_day + break_duration)
+
+    current_month = to_date_no_day(today())
+    storage = storage_id()
+    checkpoints = load_checkpoints(task_io.HOME_DIR_PATH, storage)
+    changed = False
+
+    logged = 0
+    for month in months_in_range(date_from, date_to):
+        month_from, month_to = _month_bounds(month)
+
+        # Only whole closed months are checkpointed, the others are always read
+        if month >= current_month or month_from < date_from or month_to > date_to:
+            logged += _logged_minutes(month, date_from, date_to)
+            continue
+
+        signature = month_signature(month)
+        checkpoint = checkpoints.get(month)
+
+        if signature is not None and checkpoint is not None and checkpoint[0] == signature:
+            logged += checkpoint[1]
+            continue
+
+        minutes = _logged_minutes(month, month_from, month_to)
+        logged += minutes
+
+        if signature is not None:
+            checkpoints[month] = (signature, minutes)
+            changed = True
+
+    if changed:
+        save_checkpoints(task_io.HOME_DIR_PATH, storage, checkpoints)
+
+    return WorkBalance(date_from, date_to, workdays, expected, logged)
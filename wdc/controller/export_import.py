@@ -1,16 +1,35 @@
+import calendar
+import csv
+import io
 import json
+import re
 from enum import Enum
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, TextIO, Tuple
 
-from wdc.classes import WdcTask, to_array
-from wdc.controller.work_day import list_tasks
-from wdc.helper.io import write_file
-from wdc.time import today, to_date_no_day, assert_date
+from wdc.classes import WdcTask, to_array, to_task
+import wdc.helper.io as task_io
+from wdc.controller.work_day import list_tasks, list_tasks_in_range
+from wdc.helper.pool import pool_map
+from wdc.helper.storage import get_storage
+from wdc.helper.task_file import gc_paused
+from wdc.helper.timing import RENDER, WRITE, phase, record_write, timed
+from wdc.time import today, to_date_no_day, assert_date, is_date_valid, is_time_valid, months_in_range
+
+# The number of characters read from the import file at once
+READ_SIZE = 1024 * 1024
+# The brackets of a list, the commas between the tasks and the white space around them
+_SEPARATORS = re.compile(r'[\s,\[\]]*')
+
+# Encoded tasks and their number
+Part = Tuple[str, int]
 
 
 class WdcTaskJsonEncoder(json.JSONEncoder):
     def default(self, o: WdcTask):
         return {
             'id': o.id,
+            'date': o.date,
             'timestamp': o.timestamp,
             'tags': o.tags,
             'start': o.start,
@@ -22,30 +41,397 @@ class WdcTaskJsonEncoder(json.JSONEncoder):
 class ExportType(Enum):
     JSON = 1
     CSV = 2
+    NDJSON = 3
+
+
+@timed(RENDER)
+def _encode_json(tasks: Iterable[WdcTask]) -> Part:
+    # Laid out the same way as json.dumps(tasks, indent=4) would, a task is a flat object so its fields can
+    # be put on their own lines by the item separator. Unlike indent the separator keeps the fast C encoder.
+    encoder = WdcTaskJsonEncoder(separators=(',\n        ', ': '))
+    items = [f'\n    {{\n        {encoder.encode(task)[1:-1]}\n    }}' for task in tasks]
+
+    return ','.join(items), len(items)
+
+
+@timed(RENDER)
+def _encode_ndjson(tasks: Iterable[WdcTask]) -> Part:
+    encoder = WdcTaskJsonEncoder(separators=(',', ':'))
+    lines = [f'{encoder.encode(task)}\n' for task in tasks]
+
+    return ''.join(lines), len(lines)
+
+
+@timed(RENDER)
+def _encode_csv(tasks: Iterable[WdcTask]) -> Part:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, dialect='wdc', lineterminator='\n')
+    count = 0
+
+    for task in tasks:
+        writer.writerow(to_array(task))
+        count += 1
+
+    return buffer.getvalue(), count
+
+
+_ENCODERS: Dict[ExportType, Callable[[Iterable[WdcTask]], Part]] = {
+    ExportType.JSON: _encode_json,
+    ExportType.CSV: _encode_csv,
+    ExportType.NDJSON: _encode_ndjson
+}
+
+# The text before, between and after the encoded parts of an export, and the text after it if it holds no tasks
+_FRAMES: Dict[ExportType, Tuple[str, str, str, str]] = {
+    ExportType.JSON: ('[', ',', '\n]', ']'),
+    ExportType.CSV: ('', '', '', ''),
+    ExportType.NDJSON: ('', '', '', '')
+}
+
+
+def _encode_range(date_from: str, date_to: str, export_all: bool, export_to: ExportType) -> Part:
+    """
+    Encodes the tasks of a range of dates as one part of an export
+
+    :param date_from: The first date of the range
+    :param date_to: The last date of the range, inclusive
+    :param export_all: If True all versions of the tasks are encoded, only the latest ones otherwise
+    :param export_to: The format of the export
+    :return: The encoded tasks and their number
+    """
+    return _ENCODERS[export_to](list_tasks_in_range(date_from, date_to, export_all))
+
+
+def _frame_parts(parts: Iterable[Part], export_to: ExportType) -> Iterator[Part]:
+    # The parts without tasks are left out, the frame pieces count no tasks
+    start, separator, end, empty_end = _FRAMES[export_to]
+    count = 0
+
+    yield start, 0
+    for text, part_count in parts:
+        if part_count == 0:
+            continue
+        if count:
+            yield separator, 0
+        yield text, part_count
+        count += part_count
+    yield end if count else empty_end, 0
+
+
+def _write_parts(parts: Iterable[Part], export_to: ExportType, output: TextIO) -> int:
+    count = 0
+
+    for text, part_count in _frame_parts(parts, export_to):
+        with phase(WRITE):
+            output.write(text)
+        record_write(text)
+        count += part_count
+
+    return count
+
+
+def _month_ranges(date_from: str, date_to: str) -> List[Tuple[str, str, str]]:
+    ranges = []
+    for month in months_in_range(date_from, date_to):
+        year, month_number = int(month[0:4]), int(month[4:6])
+        first = f'{year:04d}-{month_number:02d}-01'
+        last = f'{year:04d}-{month_number:02d}-{calendar.monthrange(year, month_number)[1]:02d}'
+        ranges.append((month, max(first, date_from), min(last, date_to)))
+
+    return ranges
+
+
+def _init_worker(home_dir: Path) -> None:
+    task_io.HOME_DIR_PATH = home_dir
+
+
+def _encode_months(ranges: List[Tuple[str, str, str]],
+                   export_all: bool,
+                   export_to: ExportType,
+                   jobs: int) -> Iterator[Part]:
+    # The parts are returned in the order of the months, no matter which worker finishes first
+    return pool_map(_encode_range,
+                    [(first, last, export_all, export_to) for _, first, last in ranges],
+                    jobs,
+                    _init_worker,
+                    (task_io.HOME_DIR_PATH,))
+
+
+def _write_split(ranges: List[Tuple[str, str, str]],
+                 parts: Iterable[Part],
+                 export_to: ExportType,
+                 file_path: str) -> int:
+    path = Path(file_path)
+    count = 0
+
+    for (month, _, _), part in zip(ranges, parts):
+        if part[1] > 0:
+            with open(str(path.with_name(f'{path.stem}_{month}{path.suffix}')), 'w') as file:
+                count += _write_parts([part], export_to, file)
+
+    return count
+
+
+def _export_parts(date: str,
+                  date_to: str,
+                  export_all: bool,
+                  export_to: ExportType,
+                  jobs: int) -> Tuple[List[Tuple[str, str, str]], Iterator[Part]]:
+    if date_to != '':
+        ranges = _month_ranges(date, date_to)
+        return ranges, _encode_months(ranges, export_all, export_to, jobs)
+
+    ranges = [(to_date_no_day(date), date, date)]
+    return ranges, iter([_ENCODERS[export_to](list_tasks(date, export_all))])
+
+
+def export_chunks(date: str = '',
+                  export_to: ExportType = ExportType.JSON,
+                  export_all: bool = False,
+                  date_to: str = '') -> Iterator[str]:
+    """
+    Encodes the tasks of a date or of a range of dates piece by piece
+
+    The dates are checked right away, the tasks are read and encoded one month at a time while the
+    pieces are consumed. Joined together the pieces are the same as the file written by export_tasks.
+
+    :param date: The date to export, the first date of the range if date_to is given (default is today)
+    :param export_to: The format of the export
+    :param export_all: If True all versions of the tasks are exported, only the latest ones otherwise
+    :param date_to: The optional last date of the range to export
+    :return: The pieces of the export, none of them empty
+    """
+    if date == '':
+        date = today()
+
+    assert_date(date)
+
+    if date_to != '':
+        assert_date(date_to)
+
+    _, parts = _export_parts(date, date_to, export_all, export_to, 1)
+
+    return (text for text, _ in _frame_parts(parts, export_to) if text)
 
 
 def export_tasks(date: str = '',
                  file_path: str = '',
                  export_to: ExportType = ExportType.JSON,
-                 export_all: bool = False) -> str:
+                 export_all: bool = False,
+                 date_to: str = '',
+                 output: Optional[TextIO] = None,
+                 jobs: int = 1,
+                 split: bool = False) -> int:
+    """
+    Writes the tasks of a date or of a range of dates to a file
+
+    A range is encoded month by month, so the memory use does not grow with the length of the range.
+    With more than one job the months are read and encoded by a pool of worker processes, the output
+    is the same as the one of a single job.
+
+    :param date: The date to export, the first date of the range if date_to is given (default is today)
+    :param file_path: The file to write to, named after the exported dates if not given
+    :param export_to: The format of the export
+    :param export_all: If True all versions of the tasks are exported, only the latest ones otherwise
+    :param date_to: The optional last date of the range to export
+    :param output: The optional stream to write to instead of the file
+    :param jobs: The number of worker processes encoding the months of a range
+    :param split: If True every month of a range with tasks is written to its own file, named after the
+        file path with the month appended
+    :return: The number of exported tasks
+    """
     if date == '':
         date = today()
 
     assert_date(date)
 
+    if date_to != '':
+        assert_date(date_to)
+
+    if jobs < 1:
+        raise ValueError(f'At least one job is needed, {jobs} given')
+
+    if split and output is not None:
+        raise ValueError('A split export can only be written to files')
+
+    ranges, parts = _export_parts(date, date_to, export_all, export_to, jobs)
+
+    if output is not None:
+        return _write_parts(parts, export_to, output)
+
+    if split:
+        return _write_split(ranges, parts, export_to, file_path or f'./export.{export_to.name}')
+
     if file_path == '':
-        file_path = f'./export_{to_date_no_day(date)}.{export_to.name}'
+        if date_to != '':
+            file_path = f'./export_{date}_{date_to}.{export_to.name}'
+        else:
+            file_path = f'./export_{to_date_no_day(date)}.{export_to.name}'
+
+    with open(file_path, 'w') as file:
+        return _write_parts(parts, export_to, file)
+
+
+class ImportSummary(NamedTuple):
+    """
+    The outcome of an import
+
+    Attributes:
+        read -- The number of tasks read from the import file
+        imported -- The number of tasks written to the storage
+        duplicates -- The number of tasks skipped because a task with the same id and timestamp is already stored
+        invalid -- The number of tasks skipped because of missing or malformed values
+    """
+    read: int
+    imported: int
+    duplicates: int
+    invalid: int
+
+
+def _json_to_task(item: dict, date: str) -> WdcTask:
+    # Exports of older versions hold the tasks of a single date without storing it, the given date is used for
+    # them. Without one such a task is invalid, the date it was logged on is not the date of the timestamp.
+    return WdcTask(
+        id=item['id'],
+        date=item.get('date', date),
+        start=item['start'],
+        end=item['end'],
+        tags=item['tags'],
+        description=item['message'],
+        timestamp=str(item['timestamp'])
+    )
+
+
+def _iter_json_tasks(stream: TextIO, date: str) -> Iterator[Optional[WdcTask]]:
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    end_of_file = False
+
+    while True:
+        position = _SEPARATORS.match(buffer, position).end()
+
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if end_of_file:
+                if buffer[position:].strip():
+                    raise ValueError(f'The import file is not a valid JSON export near: {buffer[position:][:40]}')
+                return
+
+            chunk = stream.read(READ_SIZE)
+            end_of_file = chunk == ''
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        try:
+            yield _json_to_task(item, date)
+        except (KeyError, TypeError, ValueError, OverflowError):
+            yield None
 
-    tasks = list_tasks(date, export_all)
 
-    task_dump = ''
+def _csv_to_task(fields: List[str]) -> Optional[WdcTask]:
+    if len(fields) == 7:
+        return WdcTask(*fields)
+    if len(fields) < 7:
+        return None
 
-    if export_to == ExportType.JSON:
-        task_dump = json.dumps(tasks, indent=4, cls=WdcTaskJsonEncoder)
-    elif export_to == ExportType.CSV:
+    # Older exports wrote the description as it is, so any surplus separators belong to it
+    return to_task(fields[0:5] + [';'.join(fields[5:-1]), fields[-1]])
+
+
+def _iter_csv_tasks(stream: TextIO) -> Iterator[Optional[WdcTask]]:
+    return (_csv_to_task(fields) for fields in csv.reader(stream, dialect='wdc') if fields)
+
+
+class _Importer(object):
+    """
+    Filters the read tasks down to the ones that are not stored yet and counts what was skipped
+    """
+
+    def __init__(self):
+        self.storage = get_storage()
+        self.read = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self._months = set(self.storage.months())
+        self._stored: Dict[str, Set[Tuple[str, str]]] = {}
+        # Exports repeat the same few dates and times, so every distinct value is only validated once
+        self._valid_dates: Dict[str, bool] = {}
+        self._valid_times: Dict[str, bool] = {}
+
+    @staticmethod
+    def _is_valid(value: str, validate: Callable[[str], bool], known: Dict[str, bool]) -> bool:
+        if not isinstance(value, str):
+            return False
+
+        valid = known.get(value)
+
+        if valid is None:
+            valid = known[value] = validate(value)
+
+        return valid
+
+    def _is_importable(self, task: Optional[WdcTask]) -> bool:
+        return (task is not None
+                and isinstance(task.id, str) and task.id != ''
+                and isinstance(task.tags, str) and isinstance(task.description, str)
+                and task.timestamp.isdigit()
+                and self._is_valid(task.date, is_date_valid, self._valid_dates)
+                and self._is_valid(task.start, is_time_valid, self._valid_times)
+                and (task.end == '' or self._is_valid(task.end, is_time_valid, self._valid_times)))
+
+    def _stored_keys(self, month: str) -> Set[Tuple[str, str]]:
+        keys = self._stored.get(month)
+
+        if keys is None:
+            # Loaded once per month when its first task is read, before anything is appended to it
+            columns = self.storage.read_month_columns(month) if month in self._months else ()
+            keys = self._stored[month] = set(zip(columns[0], columns[6])) if columns else set()
+
+        return keys
+
+    def new_tasks(self, tasks: Iterable[Optional[WdcTask]]) -> Iterator[WdcTask]:
         for task in tasks:
-            task_dump += ';'.join(to_array(task)) + '\n'
+            self.read += 1
+
+            if not self._is_importable(task):
+                self.invalid += 1
+                continue
+
+            keys = self._stored_keys(task.date[0:4] + task.date[5:7])
+            key = (task.id, task.timestamp)
+
+            if key in keys:
+                self.duplicates += 1
+                continue
+
+            keys.add(key)
+            yield task
+
+
+def import_tasks(stream: TextIO, import_from: ExportType = ExportType.JSON, date: str = '') -> ImportSummary:
+    """
+    Imports tasks from a file written by export_tasks
+
+    The file is read and written in a single pass without holding all of its content at once.
+    Tasks are appended to the months of their dates, every month is opened only once. A task is skipped
+    if a task with the same id and timestamp is already stored or was already imported, so importing
+    the same file twice does not duplicate anything.
+
+    :param stream: The open import file
+    :param import_from: The format of the file, JSON and NDJSON are read the same way
+    :param date: The date of the JSON tasks without one, written by versions that exported a single date
+    :return: The summary of the import
+    """
+    if date != '':
+        assert_date(date)
+
+    tasks = _iter_csv_tasks(stream) if import_from == ExportType.CSV else _iter_json_tasks(stream, date)
 
-    write_file(task_dump, file_path)
+    importer = _Importer()
+    with gc_paused():
+        imported = importer.storage.write_tasks(importer.new_tasks(tasks))
 
-    return task_dump
+    return ImportSummary(importer.read, imported, importer.duplicates, importer.invalid)
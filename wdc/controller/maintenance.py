@@ -0,0 +1,59 @@
+from typing import List, Tuple
+
+from wdc.exceptions import StorageError
+from wdc.helper.storage import get_storage, open_storage
+from wdc.time import is_month_valid
+
+
+def compact_tasks(month: str = '', keep: int = 1) -> List[Tuple[str, int, int]]:
+    """
+    Removes the outdated versions of tasks from the task storage
+
+    :param month: The optional month (YYYYMM) to compact, all months are compacted if not given
+    :param keep: The number of versions to keep of every task
+    :return: A list of (month, rows before, rows after) triples, one for every compacted month
+    """
+    if month != '' and not is_month_valid(month):
+        raise ValueError(f'{month} is not a valid month')
+
+    if keep < 1:
+        raise ValueError(f'At least one version has to be kept, {keep} given')
+
+    storage = get_storage()
+
+    months = storage.months()
+    if month != '':
+        months = [m for m in months if m == month]
+
+    results = []
+    for compacted_month in months:
+        before, after = storage.compact_month(compacted_month, keep)
+        results.append((compacted_month, before, after))
+
+    return results
+
+
+def migrate_tasks(source: str, target: str) -> int:
+    """
+    Copies all tasks from one storage backend to another
+
+    The tasks are copied month by month without loading more than a batch of them into memory.
+
+    :param source: The name of the backend to copy from
+    :param target: The name of the backend to copy to, it has to be empty
+    :return: The number of copied tasks
+    """
+    if source == target:
+        raise StorageError('The source and target storage have to be different')
+
+    source_storage = open_storage(source)
+    target_storage = open_storage(target)
+
+    if target_storage.months():
+        raise StorageError(f'The {target} storage already contains tasks')
+
+    count = 0
+    for month in source_storage.months():
+        count += target_storage.write_tasks(source_storage.iter_month(month))
+
+    return count
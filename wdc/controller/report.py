@@ -0,0 +1,76 @@
+from datetime import date
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from wdc.classes import DayTotal
+from wdc.helper.storage import read_day_totals
+from wdc.settings import GROUP_BY_TAG, GROUP_BY_DATE, GROUP_BY_WEEK, GROUP_BY_MONTH, GROUP_BY_YEAR, GROUPINGS
+from wdc.time import is_date_valid, months_in_range
+
+# Label of the tasks without any tags when grouping by tag
+NO_TAG = '-'
+
+ReportRow = Tuple[str, int]
+
+
+def _tag_labels(total: DayTotal) -> Sequence[str]:
+    return [tag for tag in total.tags.split(',') if tag] or [NO_TAG]
+
+
+def _date_labels(total: DayTotal) -> Sequence[str]:
+    return total.date,
+
+
+def _week_labels(total: DayTotal) -> Sequence[str]:
+    year, week, _ = date(int(total.date[0:4]), int(total.date[5:7]), int(total.date[8:10])).isocalendar()
+    return f'{year:04d}-W{week:02d}',
+
+
+def _month_labels(total: DayTotal) -> Sequence[str]:
+    return total.date[0:7],
+
+
+def _year_labels(total: DayTotal) -> Sequence[str]:
+    return total.date[0:4],
+
+
+_GROUPINGS: Dict[str, Callable[[DayTotal], Sequence[str]]] = {
+    GROUP_BY_TAG: _tag_labels,
+    GROUP_BY_DATE: _date_labels,
+    GROUP_BY_WEEK: _week_labels,
+    GROUP_BY_MONTH: _month_labels,
+    GROUP_BY_YEAR: _year_labels
+}
+
+
+def build_report(date_from: str, date_to: str, group_by: str = GROUP_BY_TAG) -> List[ReportRow]:
+    """
+    Sums up the logged time between two dates
+
+    Only the latest version of every task is counted, tasks without an end are skipped. When grouping
+    by tag a task counts towards each of its tags. The report is built from the per day totals of the
+    storage, so its cost grows with the number of days and not with the number of tasks.
+
+    :param date_from: The first date of the report
+    :param date_to: The last date of the report, inclusive
+    :param group_by: One of GROUPINGS
+    :return: (group label, minutes) pairs sorted by the label
+    """
+    if not is_date_valid(date_from):
+        raise ValueError(f'{date_from} is not a valid date format')
+    if not is_date_valid(date_to):
+        raise ValueError(f'{date_to} is not a valid date format')
+    if group_by not in _GROUPINGS:
+        raise ValueError(f'Unknown grouping {group_by}, has to be one of {", ".join(GROUPINGS)}')
+
+    labels_of = _GROUPINGS[group_by]
+    totals: Dict[str, int] = {}
+
+    for month in months_in_range(date_from, date_to):
+        for total in read_day_totals(month):
+            if total.minutes == 0 or not date_from <= total.date <= date_to:
+                continue
+
+            for label in labels_of(total):
+                totals[label] = totals.get(label, 0) + total.minutes
+
+    return sorted(totals.items())
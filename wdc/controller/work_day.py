@@ -1,15 +1,21 @@
-from wdc.helper.io import read_all_tasks, last_task, write_task, find_tasks, array_to_tags_string
+from dataclasses import replace
+
+from wdc.helper.io import array_to_tags_string
+from wdc.helper.storage import read_day_tasks, last_task, write_task, find_tasks, iter_month
 from wdc.classes import WdcTask
 from wdc.helper.hash import generate_hash
-from wdc.time import WdcTime, today, is_date_valid, is_time_valid, timestamp
+from wdc.helper.timing import DECODE, SORT, phase, timed
+from wdc.time import WdcTime, today, is_date_valid, is_time_valid, timestamp, to_minute_of_day, months_in_range
 
-from typing import List
+from typing import Dict, Iterator, List
 
 
 class WdcTaskInfo(object):
     def __init__(self, tasks: List[WdcTask]):
         self._raw_tasks = tasks
-        self._raw_tasks.sort(key=lambda t: int(t.timestamp), reverse=True)
+
+        with phase(SORT):
+            self._raw_tasks.sort(key=lambda t: int(t.timestamp), reverse=True)
 
     @property
     def current(self) -> WdcTask:
@@ -31,10 +37,10 @@ class WdcTaskInfo(object):
 
 
 def sort_by_time(tasks: List[WdcTask], descending: bool = False) -> List[WdcTask]:
-    return sorted(tasks, key=lambda t: hash(WdcTime(t.start)), reverse=descending)
+    return sorted(tasks, key=lambda t: to_minute_of_day(t.start), reverse=descending)
 
 
-def start_work_task(start_time: str, end_time: str, tags: List[str], description: str, date: str):
+def start_work_task(start_time: str, end_time: str, tags: List[str], description: str, date: str) -> WdcTask:
     start = WdcTime(start_time)
     end = WdcTime(end_time) if end_time else None
 
@@ -57,8 +63,10 @@ def start_work_task(start_time: str, end_time: str, tags: List[str], description
 
     write_task(task_data)
 
+    return task_data
+
 
-def end_last_task(date: str, time: str):
+def end_last_task(date: str, time: str) -> WdcTask:
     if not is_date_valid(date):
         raise ValueError(f'{date} is not a valid date format')
 
@@ -68,22 +76,33 @@ def end_last_task(date: str, time: str):
     if not is_time_valid(time):
         raise ValueError(f'{date} is not a valid date format')
 
-    task = last_task(date)
-
-    task.end = time
-    task.timestamp = timestamp()
+    task = replace(last_task(date), end=time, timestamp=timestamp())
 
     write_task(task)
 
+    return task
+
 
 def list_tasks(date: str, show_all: bool) -> List[WdcTask]:
     if not is_date_valid(date):
         raise ValueError(f'{date} is not a valid date format')
 
-    tasks = read_all_tasks(date)
+    tasks = read_day_tasks(date)
 
     tasks = list(filter(lambda t: t.date == date, tasks))
 
+    return select_day_tasks(tasks, show_all)
+
+
+@timed(SORT)
+def select_day_tasks(tasks: List[WdcTask], show_all: bool) -> List[WdcTask]:
+    """
+    Prepares the tasks of a single day for display
+
+    :param tasks: All stored tasks of the day
+    :param show_all: If True all versions are returned sorted by their timestamp
+    :return: The latest version of each task sorted by the start time, or all versions if show_all is set
+    """
     if show_all:
         return sorted(tasks, key=lambda t: int(t.timestamp))
 
@@ -101,6 +120,41 @@ def list_tasks(date: str, show_all: bool) -> List[WdcTask]:
         return sort_by_time(return_tasks.values())
 
 
+def list_tasks_in_range(date_from: str, date_to: str, show_all: bool) -> Iterator[WdcTask]:
+    """
+    Lazily lists the tasks of all days between two dates
+
+    Only the months overlapping the range are read, one month at a time, so the memory use does not
+    grow with the length of the range.
+
+    :param date_from: The first date of the range
+    :param date_to: The last date of the range, inclusive
+    :param show_all: If True all versions of the tasks are returned
+    :return: The tasks ordered by date and the same way as list_tasks within a day
+    """
+    if not is_date_valid(date_from):
+        raise ValueError(f'{date_from} is not a valid date format')
+    if not is_date_valid(date_to):
+        raise ValueError(f'{date_to} is not a valid date format')
+    if date_from > date_to:
+        raise ValueError(f'The range start {date_from} is after its end {date_to}')
+
+    return _iter_tasks_in_range(date_from, date_to, show_all)
+
+
+def _iter_tasks_in_range(date_from: str, date_to: str, show_all: bool) -> Iterator[WdcTask]:
+    for month in months_in_range(date_from, date_to):
+        days: Dict[str, List[WdcTask]] = {}
+        # The rows are streamed, reading them is counted as decoding as both happen at the same time
+        with phase(DECODE):
+            for task in iter_month(month):
+                if date_from <= task.date <= date_to:
+                    days.setdefault(task.date, []).append(task)
+
+        for date in sorted(days):
+            yield from select_day_tasks(days.pop(date), show_all)
+
+
 def get_task_info(task_id: str) -> WdcTaskInfo:
     if task_id == '':
         return None
@@ -112,7 +166,12 @@ def get_task_info(task_id: str) -> WdcTaskInfo:
     return WdcTaskInfo(tasks)
 
 
-def amend_task(task_id: str, tags: List[str] = [], start: str = '', end: str = '', message: str = '', date: str = ''):
+def amend_task(task_id: str,
+               tags: List[str] = [],
+               start: str = '',
+               end: str = '',
+               message: str = '',
+               date: str = '') -> WdcTask:
     if start != '' and not is_time_valid(start):
         raise ValueError(f'The start time {start} is not a valid time')
 
@@ -127,13 +186,19 @@ def amend_task(task_id: str, tags: List[str] = [], start: str = '', end: str = '
     if task_info is None:
         raise ValueError(f'The given task id {task_id} did not resolve to a task')
 
-    task = task_info.current
-
-    task.timestamp = timestamp()
-    task.tags = array_to_tags_string(tags) if tags else task.tags
-    task.start = start if is_time_valid(start) else task.start
-    task.end = end if is_time_valid(end) else task.end
-    task.description = message if message else task.description
-    task.date = date if is_date_valid(date) else task.date
+    current = task_info.current
+
+    # Tasks handed out by the storage can be shared with its caches, the amended version is a new object
+    task = replace(
+        current,
+        timestamp=timestamp(),
+        tags=array_to_tags_string(tags) if tags else current.tags,
+        start=start if is_time_valid(start) else current.start,
+        end=end if is_time_valid(end) else current.end,
+        description=message if message else current.description,
+        date=date if is_date_valid(date) else current.date
+    )
 
     write_task(task)
+
+    return task
@@ -28,3 +28,59 @@ class DateFormatError(WdcError):
         self.date = date
         self.message = f'The string {date} does not represent a valid date'
         super().__init__(self.message)
+
+
+class ConcurrentModificationError(WdcError):
+    """
+    Represents a task file that has been changed while it was being rewritten
+
+    Attributes:
+        path -- The path of the changed file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.message = f'The file {path} has been changed while it was rewritten'
+        super().__init__(self.message)
+
+
+class SettingsError(WdcError):
+    """
+    Represents an invalid settings file
+
+    Attributes:
+        path -- The path of the settings file
+        reason -- The description of the problem
+    """
+
+    def __init__(self, path: str, reason: str):
+        self.path = path
+        self.reason = reason
+        self.message = f'The settings file {path} is not valid: {reason}'
+        super().__init__(self.message)
+
+
+class StorageError(WdcError):
+    """
+    Represents a problem with the configured task storage
+
+    Attributes:
+        message -- The description of the problem
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+
+class DaemonError(WdcError):
+    """
+    Represents a problem with the wdc daemon or the connection to it
+
+    Attributes:
+        message -- The description of the problem
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from wdc.classes import WdcTask
+from wdc.helper.task_file import content_checksum
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+Signature = Tuple[int, int]
+
+
+class CachedMonth(object):
+    """
+    The parsed tasks of a task file up to the byte offset given by the size in the signature
+
+    The checksum covers the whole parsed content, it is None if the content does not end on a row boundary
+    and can therefore not be continued.
+    """
+    __slots__ = ('signature', 'checksum', 'tasks')
+
+    def __init__(self, signature: Signature, checksum: Optional[int], tasks: List[WdcTask]):
+        self.signature = signature
+        self.checksum = checksum
+        self.tasks = tasks
+
+
+class MonthCache(object):
+    """
+    Least recently used cache of parsed task files
+
+    Every entry is validated against the (size, mtime) signature of its file, so a changed file is never
+    served as it is. An outdated entry is kept so that the reader can continue parsing the file where
+    the entry ends. The memory bound is expressed as the total size of the cached files.
+    The cached tasks are shared between all readers and must not be modified.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Path, CachedMonth]' = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def entry(self, path: Path) -> Optional[CachedMonth]:
+        """
+        Returns the cache entry of a file without validating it
+        """
+        entry = self._entries.get(path)
+
+        if entry is not None:
+            self._entries.move_to_end(path)
+
+        return entry
+
+    def get(self, path: Path, signature: Optional[Signature]) -> Optional[List[WdcTask]]:
+        """
+        Returns the cached tasks of a file
+
+        :param path: The path of the task file
+        :param signature: The current signature of the file
+        :return: The cached tasks or None if the file is not cached or has changed since
+        """
+        entry = self.entry(path)
+
+        if entry is None or entry.signature != signature:
+            return None
+
+        return entry.tasks
+
+    def put(self, path: Path, signature: Signature, checksum: Optional[int], tasks: List[WdcTask]) -> None:
+        self.invalidate(path)
+
+        if signature[0] > self.max_bytes or self.max_entries < 1:
+            return
+
+        self._entries[path] = CachedMonth(signature, checksum, tasks)
+        self._bytes += signature[0]
+        self._evict()
+
+    def extend(self,
+               path: Path,
+               before: Optional[Signature],
+               after: Signature,
+               appended: Optional[bytes],
+               tasks: Iterable[WdcTask]) -> None:
+        """
+        Adds tasks appended to a file to its cache entry
+
+        If the cached entry does not match the state of the file before the append it is dropped.
+
+        :param path: The path of the task file
+        :param before: The signature of the file before the append
+        :param after: The signature of the file after the append
+        :param appended: The appended content, the checksum of the entry is continued with it. None if it is
+                         not known, the entry can then not be continued by a later read.
+        :param tasks: The appended tasks, only consumed if the file is cached
+        :return: Nothing
+        """
+        entry = self._entries.get(path)
+
+        if entry is None:
+            return
+
+        if entry.signature != before:
+            self.invalidate(path)
+            return
+
+        entry.tasks.extend(tasks)
+        entry.signature = after
+        entry.checksum = None if entry.checksum is None or appended is None \
+            else content_checksum(appended, entry.checksum)
+        self._bytes += after[0] - before[0]
+        self._evict()
+
+    def invalidate(self, path: Path) -> None:
+        entry = self._entries.pop(path, None)
+
+        if entry is not None:
+            self._bytes -= entry.signature[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.signature[0]
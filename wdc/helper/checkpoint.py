@@ -0,0 +1,58 @@
+import os
+from pathlib import Path
+from typing import Dict, Tuple
+
+from wdc.helper.snapshot import SNAPSHOT_DIR
+from wdc.helper.task_file import encode_row, parse_rows, read_file
+
+CHECKPOINT_FILE = 'balance.checkpoint'
+
+# Maps a month (YYYYMM) to the signature of its stored tasks and the minutes logged in it
+Checkpoints = Dict[str, Tuple[Tuple[int, ...], int]]
+
+
+def _checkpoint_path(home_dir: Path) -> Path:
+    return home_dir / SNAPSHOT_DIR / CHECKPOINT_FILE
+
+
+def load_checkpoints(home_dir: Path, storage: str) -> Checkpoints:
+    """
+    Loads the stored monthly balance checkpoints, a missing or broken file is treated as empty
+
+    The checkpoints are only valid for the storage they were saved for, the signatures of different
+    storages can be equal for different tasks.
+
+    :param home_dir: The wdc home directory
+    :param storage: The id of the storage the signatures are compared to, see storage.storage_id
+    :return: The checkpoints by month, empty if they were saved for another storage
+    """
+    try:
+        data, _ = read_file(_checkpoint_path(home_dir))
+        rows = parse_rows(data)
+        if not rows or rows[0] != [storage]:
+            return {}
+
+        return {row[0]: (tuple(int(part) for part in row[1].split(',')), int(row[2])) for row in rows[1:]}
+    except (OSError, IndexError, ValueError):
+        return {}
+
+
+def save_checkpoints(home_dir: Path, storage: str, checkpoints: Checkpoints) -> None:
+    """
+    Replaces the stored monthly balance checkpoints
+
+    :param home_dir: The wdc home directory
+    :param storage: The id of the storage the checkpoints were calculated from, see storage.storage_id
+    :param checkpoints: The checkpoints by month
+    :return: Nothing
+    """
+    path = _checkpoint_path(home_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(str(temp_path), 'wb') as file:
+        file.write(encode_row([storage]))
+        for month, (signature, minutes) in sorted(checkpoints.items()):
+            file.write(encode_row([month, ','.join(map(str, signature)), str(minutes)]))
+
+    os.replace(str(temp_path), str(path))
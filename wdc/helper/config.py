@@ -0,0 +1,65 @@
+from pathlib import Path
+from typing import Any, Dict
+
+import wdc.settings as settings
+from wdc.exceptions import SettingsError
+from wdc.helper.task_file import file_signature
+
+_loaded: Dict[Path, tuple] = {}
+
+
+def _parse(path: Path) -> Dict[str, Any]:
+    try:
+        import tomllib
+        with open(str(path), 'rb') as file:
+            return tomllib.load(file)
+    except ImportError:
+        import toml
+        return toml.load(str(path))
+
+
+def load_settings(home_dir: Path) -> Dict[str, Any]:
+    """
+    Loads the settings file from the wdc home directory
+
+    The parsed settings are kept in memory until the settings file changes.
+
+    :param home_dir: The wdc home directory
+    :return: The settings or an empty dictionary if there is no settings file
+    """
+    path = home_dir / settings.SETTINGS_FILE
+    signature = file_signature(path)
+
+    if signature is None:
+        return {}
+
+    if path in _loaded and _loaded[path][0] == signature:
+        return _loaded[path][1]
+
+    try:
+        loaded = _parse(path)
+    except Exception as error:
+        raise SettingsError(str(path), str(error))
+
+    _loaded[path] = (signature, loaded)
+
+    return loaded
+
+
+def get_setting(home_dir: Path, section: str, key: str, default: Any = None) -> Any:
+    """
+    Reads a single value from the settings file
+
+    :param home_dir: The wdc home directory
+    :param section: The name of the table in the settings file
+    :param key: The name of the value inside of the table
+    :param default: The value returned if the setting is not present
+    :return: The value of the setting
+    """
+    value = load_settings(home_dir).get(section, {}).get(key, default)
+
+    if default is not None and not isinstance(value, type(default)):
+        raise SettingsError(str(home_dir / settings.SETTINGS_FILE),
+                            f'{section}.{key} has to be a {type(default).__name__}')
+
+    return value
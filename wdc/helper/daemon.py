@@ -0,0 +1,138 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+from typing import List, Tuple
+
+import click
+
+from wdc.client import ENCODING, send_command
+from wdc.exceptions import DaemonError
+from wdc.helper.storage import read_all_tasks
+from wdc.time import today
+
+# The seconds a client may take to send its command or to read the answer before its connection is closed
+REQUEST_TIMEOUT = 5.0
+
+
+def invoke_command(cli: click.BaseCommand, args: List[str]) -> int:
+    """
+    Runs a command in this process the same way the wdc program would, errors are printed to standard error
+
+    :param cli: The click command group
+    :param args: The command line arguments, without the program name
+    :return: The exit code of the command
+    """
+    try:
+        exit_code = cli.main(args, prog_name='wdc', standalone_mode=False, obj={})
+    except click.ClickException as error:
+        error.show()
+        return error.exit_code
+    except click.Abort:
+        click.echo('Aborted!', err=True)
+        return 1
+    except Exception as error:
+        # A failing command must not stop the process running it
+        click.echo(f'{type(error).__name__}: {error}', err=True)
+        return 1
+
+    return exit_code if isinstance(exit_code, int) else 0
+
+
+def run_command(cli: click.BaseCommand, args: List[str]) -> Tuple[str, str, int]:
+    """
+    Runs a command in this process and captures its output
+
+    :param cli: The click command group
+    :param args: The command line arguments, without the program name
+    :return: The standard output, standard error and exit code of the command
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        exit_code = invoke_command(cli, args)
+
+    return stdout.getvalue(), stderr.getvalue(), exit_code
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    # Set on the connection by setup, a stalled client would otherwise block all other commands
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self):
+        try:
+            args = json.loads(self.rfile.readline().decode(ENCODING))['args']
+        except (ValueError, KeyError, TypeError):
+            return
+        except OSError:
+            # Timed out or reset, the connection is closed by finish
+            return
+
+        stdout, stderr, exit_code = run_command(self.server.cli, [str(arg) for arg in args])
+
+        response = {'stdout': stdout, 'stderr': stderr, 'exit_code': exit_code}
+        try:
+            self.wfile.write(json.dumps(response).encode(ENCODING) + b'\n')
+        except OSError:
+            return
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """
+    Answers the commands sent by wdc.client one after the other
+
+    As the commands run in this process the month cache, the indexes and the settings stay loaded between
+    them. Only one command runs at a time, so the daemon is the only writer for the commands it answers.
+    Commands run without the daemon are still seen, all cached data is checked against the task files.
+    """
+
+    def __init__(self, cli: click.BaseCommand, path: str):
+        self.cli = cli
+        super().__init__(path, _CommandHandler)
+
+
+def create_server(cli: click.BaseCommand, path: str) -> DaemonServer:
+    """
+    Creates the daemon listening on a unix socket
+
+    A socket file left behind by a daemon that did not shut down cleanly is replaced.
+
+    :param cli: The click command group running the commands
+    :param path: The path of the socket
+    :return: The daemon, not yet serving
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        raise DaemonError('The daemon needs unix socket support')
+
+    if send_command(['--version'], path) is not None:
+        raise DaemonError(f'A daemon is already listening on {path}')
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    server = DaemonServer(cli, path)
+    os.chmod(path, 0o600)
+
+    # Loads the current month, which most commands work on
+    read_all_tasks(today())
+
+    return server
+
+
+def serve(server: DaemonServer) -> None:
+    """
+    Answers commands until the process is interrupted, the socket is removed afterwards
+
+    :param server: The daemon created by create_server
+    :return: Nothing
+    """
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(server.server_address):
+            os.remove(server.server_address)
@@ -1,5 +1,6 @@
-import secrets
+import os
 
 
 def generate_hash(string: str) -> str:
-    return secrets.token_hex(4)
+    # The same random bytes secrets.token_hex uses, without loading secrets and hashlib on every start
+    return os.urandom(4).hex()
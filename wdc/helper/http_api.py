@@ -0,0 +1,514 @@
+import asyncio
+import ipaddress
+import json
+import os
+import sys
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from wdc.classes import WdcTask
+from wdc.controller.export_import import ExportType, WdcTaskJsonEncoder, export_chunks
+from wdc.controller.work_day import amend_task, end_last_task, get_task_info, list_tasks, list_tasks_in_range, \
+    start_work_task
+from wdc.exceptions import WdcError
+from wdc.helper.storage import month_signature
+from wdc.time import is_date_valid, months_in_range, to_date_no_day, today
+
+HOST = '127.0.0.1'
+# Names of the local machine accepted in the Host header besides loopback addresses
+LOOPBACK_NAMES = ('localhost', 'localhost.')
+# Requests changing tasks have to send JSON, which a web page can only do with the consent of the API
+JSON_CONTENT_TYPE = 'application/json'
+# The largest accepted request body in bytes, the bodies only hold the fields of a task
+MAX_BODY_SIZE = 64 * 1024
+MAX_CACHED_ANSWERS = 256
+
+_REASONS = {
+    200: 'OK',
+    201: 'Created',
+    400: 'Bad Request',
+    403: 'Forbidden',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    415: 'Unsupported Media Type',
+    500: 'Internal Server Error'
+}
+
+_FORMATS = {
+    'json': (ExportType.JSON, 'application/json'),
+    'ndjson': (ExportType.NDJSON, 'application/x-ndjson'),
+    'csv': (ExportType.CSV, 'text/csv')
+}
+
+_ENCODER = WdcTaskJsonEncoder(separators=(',', ':'))
+
+
+class Request(NamedTuple):
+    """
+    A parsed HTTP request
+
+    Attributes:
+        method -- The request method in upper case
+        path -- The decoded path segments
+        query -- The query parameters, the last value wins if a parameter is repeated
+        headers -- The headers with lower case names, the last value wins if a header is repeated
+        body -- The request body
+        keep_alive -- If True the connection stays open after the response
+        chunked -- If True the client understands chunked responses
+    """
+    method: str
+    path: Tuple[str, ...]
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+    keep_alive: bool
+    chunked: bool
+
+
+class Response(NamedTuple):
+    """
+    A response, either with a complete body or with a body streamed piece by piece
+
+    Attributes:
+        status -- The HTTP status code
+        body -- The complete body
+        content_type -- The media type of the body
+        pieces -- The streamed body, the body is ignored if given
+    """
+    status: int
+    body: bytes = b''
+    content_type: str = 'application/json'
+    pieces: Optional[Iterator[str]] = None
+
+
+class _RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        self.status = status
+        super().__init__(message)
+
+
+class ReadModel(object):
+    """
+    The encoded answers of read requests, shared by all connections
+
+    An answer is kept together with the signatures of the months it was read from and used for as long as
+    none of them has changed, no matter if the change was made through the API or by the command line.
+    Many clients polling the same range are therefore answered without reading or encoding the tasks again.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_ANSWERS):
+        self.max_entries = max_entries
+        self._answers: OrderedDict = OrderedDict()
+
+    def answer(self, key: tuple, months: Iterable[str], build: Callable[[], bytes]) -> bytes:
+        """
+        Returns the kept answer of a request or builds and keeps a new one
+
+        :param key: The identity of the request
+        :param months: The months the answer is read from
+        :param build: Builds the answer
+        :return: The answer
+        """
+        signatures = tuple(month_signature(month) for month in months)
+        kept = self._answers.get(key)
+
+        if kept is not None and kept[0] == signatures:
+            self._answers.move_to_end(key)
+            return kept[1]
+
+        answer = build()
+
+        if None not in signatures:
+            self._answers[key] = (signatures, answer)
+            self._answers.move_to_end(key)
+            while len(self._answers) > self.max_entries:
+                self._answers.popitem(last=False)
+
+        return answer
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value, cls=WdcTaskJsonEncoder, separators=(',', ':')).encode('utf-8')
+
+
+def _encode_tasks(tasks: Iterable[WdcTask]) -> bytes:
+    return f'[{",".join(map(_ENCODER.encode, tasks))}]'.encode('utf-8')
+
+
+def _flag(query: Dict[str, str], name: str) -> bool:
+    return query.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def _json_body(request: Request) -> dict:
+    if not request.body:
+        return {}
+
+    try:
+        body = json.loads(request.body.decode('utf-8'))
+    except ValueError as error:
+        raise _RequestError(400, f'The request body is not valid JSON: {error}')
+
+    if not isinstance(body, dict):
+        raise _RequestError(400, 'The request body has to be a JSON object')
+
+    return body
+
+
+def _body_tags(body: dict) -> List[str]:
+    tags = body.get('tags', [])
+
+    if isinstance(tags, str):
+        return [tag for tag in tags.split(',') if tag]
+    if not isinstance(tags, list):
+        raise _RequestError(400, 'The tags have to be a list or a comma separated string')
+
+    return [str(tag) for tag in tags]
+
+
+def _date_range(query: Dict[str, str]) -> Tuple[str, str]:
+    date_from = query.get('from', '')
+    date_to = query.get('to', '')
+
+    if date_from == '':
+        if date_to != '':
+            raise _RequestError(400, 'to can only be used together with from')
+        return '', ''
+
+    for date in (date_from, date_to):
+        if date != '' and not is_date_valid(date):
+            raise _RequestError(400, f'{date} is not a valid date')
+
+    date_to = date_to or today()
+    if date_from > date_to:
+        raise _RequestError(400, f'The range start {date_from} is after its end {date_to}')
+
+    return date_from, date_to
+
+
+def _get_tasks(request: Request, read_model: ReadModel, task_id: str) -> Response:
+    date_from, date_to = _date_range(request.query)
+    show_all = _flag(request.query, 'all')
+
+    if date_from != '':
+        return Response(200, read_model.answer(
+            ('tasks', date_from, date_to, show_all),
+            months_in_range(date_from, date_to),
+            lambda: _encode_tasks(list_tasks_in_range(date_from, date_to, show_all))))
+
+    date = request.query.get('date', '') or today()
+    if not is_date_valid(date):
+        raise _RequestError(400, f'{date} is not a valid date')
+
+    return Response(200, read_model.answer(
+        ('tasks', date, show_all),
+        [to_date_no_day(date)],
+        lambda: _encode_tasks(list_tasks(date, show_all))))
+
+
+def _get_task(request: Request, read_model: ReadModel, task_id: str) -> Response:
+    task_info = get_task_info(task_id)
+
+    if task_info is None:
+        raise _RequestError(404, f'Task with id {task_id} not found')
+
+    return Response(200, _encode({'current': task_info.current, 'history': task_info.history}))
+
+
+def _post_task(request: Request, read_model: ReadModel, task_id: str) -> Response:
+    body = _json_body(request)
+
+    if 'start' not in body:
+        raise _RequestError(400, 'The start of the task is missing')
+
+    task = start_work_task(str(body['start']),
+                           str(body.get('end', '')),
+                           _body_tags(body),
+                           str(body.get('message', '')),
+                           str(body.get('date', '')))
+
+    return Response(201, _encode(task))
+
+
+def _post_end(request: Request, read_model: ReadModel, task_id: str) -> Response:
+    body = _json_body(request)
+    date = str(body.get('date', '')) or today()
+
+    try:
+        task = end_last_task(date, str(body.get('end', '')))
+    except FileNotFoundError:
+        raise _RequestError(404, f'No task has been started in the month of {date}')
+
+    return Response(200, _encode(task))
+
+
+def _patch_task(request: Request, read_model: ReadModel, task_id: str) -> Response:
+    body = _json_body(request)
+
+    task = amend_task(task_id,
+                      _body_tags(body),
+                      str(body.get('start', '')),
+                      str(body.get('end', '')),
+                      str(body.get('message', '')),
+                      str(body.get('date', '')))
+
+    return Response(200, _encode(task))
+
+
+def _get_export(request: Request, read_model: ReadModel, task_id: str) -> Response:
+    export_format = request.query.get('format', 'json')
+    if export_format not in _FORMATS:
+        raise _RequestError(400, f'Unknown format {export_format}, has to be one of {", ".join(_FORMATS)}')
+
+    export_to, content_type = _FORMATS[export_format]
+    date_from, date_to = _date_range(request.query)
+    date = date_from or request.query.get('date', '')
+
+    return Response(200, content_type=content_type,
+                    pieces=export_chunks(date, export_to, _flag(request.query, 'all'), date_to))
+
+
+# Maps the method and the path, with * standing for a task id, to the handler of the request
+_ROUTES: Dict[Tuple[str, str], Callable[[Request, ReadModel, str], Response]] = {
+    ('GET', 'tasks'): _get_tasks,
+    ('POST', 'tasks'): _post_task,
+    ('POST', 'tasks/end'): _post_end,
+    ('GET', 'tasks/*'): _get_task,
+    ('PATCH', 'tasks/*'): _patch_task,
+    ('GET', 'export'): _get_export
+}
+
+
+def is_loopback_host(host: str) -> bool:
+    """
+    Checks if the value of a Host header names the local machine
+
+    :param host: The host with an optional port, IPv6 addresses in brackets
+    :return: True for localhost and loopback addresses
+    """
+    if host.startswith('['):
+        name = host[1:host.find(']')] if ']' in host else ''
+    else:
+        name = host.rsplit(':', 1)[0] if host.count(':') == 1 else host
+
+    if name.lower() in LOOPBACK_NAMES:
+        return True
+
+    try:
+        return ipaddress.ip_address(name).is_loopback
+    except ValueError:
+        return False
+
+
+def _check_sender(request: Request) -> None:
+    # Web pages can send requests to localhost as well. A page served from a rebound domain name sends its own
+    # name as the Host, a page of another origin sends its Origin.
+    host = request.headers.get('host', '')
+    if not is_loopback_host(host):
+        raise _RequestError(403, f'The host {host} is not this machine')
+
+    origin = request.headers.get('origin')
+    if origin is not None and origin.lower() not in (f'http://{host.lower()}', f'https://{host.lower()}'):
+        raise _RequestError(403, f'Requests from {origin} are not allowed')
+
+
+def _check_content_type(request: Request) -> None:
+    media_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+
+    if media_type != JSON_CONTENT_TYPE:
+        raise _RequestError(415, f'{request.method} requests have to send {JSON_CONTENT_TYPE}')
+
+
+def _route(path: Tuple[str, ...]) -> Tuple[str, str]:
+    if len(path) == 2 and path[0] == 'tasks' and path[1] != 'end':
+        return 'tasks/*', path[1]
+
+    return '/'.join(path), ''
+
+
+def respond(request: Request, read_model: ReadModel) -> Response:
+    """
+    Answers a request
+
+    The handlers call the controllers directly on the event loop, so only one request at a time reads
+    or writes the tasks and every change is seen by the requests after it. Requests not addressed to
+    localhost, sent by another origin or changing tasks without a JSON body are refused, so that web pages
+    opened in a browser can neither read nor change the tasks.
+
+    :param request: The request
+    :param read_model: The answers shared by all connections
+    :return: The response
+    """
+    route, task_id = _route(request.path)
+    handler = _ROUTES.get((request.method, route))
+
+    try:
+        _check_sender(request)
+
+        if handler is None:
+            if any(known == route for _, known in _ROUTES):
+                raise _RequestError(405, f'{request.method} is not allowed on /{route}')
+            raise _RequestError(404, f'/{"/".join(request.path)} does not exist')
+
+        if request.method in ('POST', 'PATCH'):
+            _check_content_type(request)
+
+        return handler(request, read_model, task_id)
+    except _RequestError as error:
+        return Response(error.status, _encode({'error': str(error)}))
+    except (WdcError, ValueError) as error:
+        return Response(400, _encode({'error': str(error)}))
+    except Exception as error:
+        print(f'{type(error).__name__}: {error}', file=sys.stderr)
+        return Response(500, _encode({'error': 'The request could not be answered'}))
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """
+    Reads the next request of a connection
+
+    :param reader: The stream of the connection
+    :return: The request or None if the client has closed the connection
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise _RequestError(400, 'Malformed request line')
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get('content-length', '0') or '0')
+    if length > MAX_BODY_SIZE:
+        raise _RequestError(413, f'The request body is larger than {MAX_BODY_SIZE} bytes')
+
+    body = await reader.readexactly(length) if length > 0 else b''
+    url = urlsplit(target)
+    connection = headers.get('connection', '').lower()
+    http_11 = version.upper() == 'HTTP/1.1'
+
+    return Request(method=method.upper(),
+                   path=tuple(unquote(segment) for segment in url.path.split('/') if segment),
+                   query=dict(parse_qsl(url.query)),
+                   headers=headers,
+                   body=body,
+                   keep_alive=connection == 'keep-alive' or (http_11 and connection != 'close'),
+                   chunked=http_11)
+
+
+def _head(status: int, content_type: str, headers: List[str]) -> bytes:
+    lines = [f'HTTP/1.1 {status} {_REASONS[status]}', f'Content-Type: {content_type}'] + headers
+
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def write_response(writer: asyncio.StreamWriter, request: Request, response: Response) -> bool:
+    """
+    Writes a response, streamed bodies are sent one piece at a time
+
+    :param writer: The stream of the connection
+    :param request: The answered request
+    :param response: The response
+    :return: True if the connection can be used for the next request
+    """
+    if response.pieces is None:
+        connection = 'keep-alive' if request.keep_alive else 'close'
+        writer.write(_head(response.status, response.content_type,
+                           [f'Content-Length: {len(response.body)}', f'Connection: {connection}']) + response.body)
+        await writer.drain()
+        return request.keep_alive
+
+    # Without chunked encoding the end of the body is marked by closing the connection
+    headers = ['Transfer-Encoding: chunked'] if request.chunked else ['Connection: close']
+    writer.write(_head(response.status, response.content_type, headers))
+
+    try:
+        for piece in response.pieces:
+            data = piece.encode('utf-8')
+            writer.write(f'{len(data):x}\r\n'.encode('latin-1') + data + b'\r\n' if request.chunked else data)
+            # Lets the other connections be served while the client reads
+            await writer.drain()
+    except (WdcError, OSError, ValueError) as error:
+        # The status has already been sent, closing the connection without ending the body marks the failure
+        print(f'{type(error).__name__}: {error}', file=sys.stderr)
+        return False
+
+    if request.chunked:
+        writer.write(b'0\r\n\r\n')
+    await writer.drain()
+
+    return request.chunked and request.keep_alive
+
+
+async def _serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, read_model: ReadModel):
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except (_RequestError, ValueError) as error:
+                status = error.status if isinstance(error, _RequestError) else 400
+                request = Request('', (), {}, {}, b'', False, False)
+                await write_response(writer, request, Response(status, _encode({'error': str(error)})))
+                break
+
+            if request is None:
+                break
+
+            if not await write_response(writer, request, respond(request, read_model)):
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_api(port: int = 0, socket_path: str = '') -> asyncio.AbstractServer:
+    """
+    Starts answering requests on localhost or on a unix socket
+
+    :param port: The port on localhost, a free one is picked if 0
+    :param socket_path: The path of the unix socket, used instead of the port if given
+    :return: The started server
+    """
+    handler = partial(_serve_connection, read_model=ReadModel())
+
+    if socket_path:
+        server = await asyncio.start_unix_server(handler, path=socket_path)
+        os.chmod(socket_path, 0o600)
+        return server
+
+    return await asyncio.start_server(handler, host=HOST, port=port)
+
+
+def run_api(port: int, socket_path: str = '', on_ready: Callable[[], None] = None) -> None:
+    """
+    Answers requests until the process is interrupted
+
+    :param port: The port on localhost
+    :param socket_path: The path of the unix socket, used instead of the port if given
+    :param on_ready: Called once the server is listening
+    :return: Nothing
+    """
+    async def serve():
+        server = await start_api(port, socket_path)
+        if on_ready is not None:
+            on_ready()
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    finally:
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
@@ -0,0 +1,360 @@
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from wdc.helper.pool import pool_map
+from wdc.helper.task_file import file_signature, is_task_row, iter_rows
+from wdc.helper.timing import INDEX, record_read, record_write, timed
+
+INDEX_DIR = 'index'
+ID_INDEX_DIR = 'ids'
+DAY_INDEX_DIR = 'days'
+MANIFEST_FILE = 'manifest'
+
+Signature = Tuple[int, int]
+Location = Tuple[str, int]
+Range = Tuple[int, int]
+
+
+def task_files(home_dir: Path) -> List[str]:
+    """
+    Lists the names of all monthly task files in the given home directory
+
+    :param home_dir: The wdc home directory
+    :return: The sorted names of all task files
+    """
+    if not home_dir.exists():
+        return []
+
+    return sorted(f for f in os.listdir(str(home_dir)) if f.endswith('.csv') and os.path.isfile(home_dir / f))
+
+
+def _id_index_path(home_dir: Path) -> Path:
+    return home_dir / INDEX_DIR / ID_INDEX_DIR
+
+
+def _shard_name(task_id: str) -> str:
+    return f'{zlib.crc32(task_id.encode()) & 0xff:02x}.idx'
+
+
+def _read_manifest(index_path: Path) -> Optional[Dict[str, Signature]]:
+    manifest_path = index_path / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+
+    manifest = {}
+    with open(str(manifest_path), 'r') as file:
+        for line in file:
+            name, size, mtime = line.rstrip('\n').split(';')
+            manifest[name] = (int(size), int(mtime))
+        record_read(file.buffer.tell())
+
+    return manifest
+
+
+def _write_manifest(index_path: Path, manifest: Dict[str, Signature]) -> None:
+    temp_path = index_path / f'{MANIFEST_FILE}.tmp'
+    with open(str(temp_path), 'w') as file:
+        for name, (size, mtime) in sorted(manifest.items()):
+            file.write(f'{name};{size};{mtime}\n')
+
+    os.replace(str(temp_path), str(index_path / MANIFEST_FILE))
+
+
+def _current_signatures(home_dir: Path) -> Dict[str, Signature]:
+    return {name: file_signature(home_dir / name) for name in task_files(home_dir)}
+
+
+def _file_shards(home_dir: Path, name: str) -> Tuple[Optional[Signature], Dict[str, List[str]]]:
+    signature = file_signature(home_dir / name)
+
+    shards: Dict[str, List[str]] = {}
+    for offset, row in iter_rows(home_dir / name):
+        if is_task_row(row):
+            shards.setdefault(_shard_name(row[0]), []).append(f'{row[0]};{name};{offset}\n')
+
+    return signature, shards
+
+
+@timed(INDEX)
+def rebuild_id_index(home_dir: Path, workers: int = 1) -> None:
+    """
+    Rebuilds the task id index by scanning all task files in the home directory
+
+    :param home_dir: The wdc home directory
+    :param workers: The number of processes scanning the task files
+    :return: Nothing
+    """
+    index_path = _id_index_path(home_dir)
+    if index_path.exists():
+        import shutil
+
+        shutil.rmtree(str(index_path))
+    index_path.mkdir(parents=True)
+
+    names = task_files(home_dir)
+
+    manifest = {}
+    shards: Dict[str, List[str]] = {}
+    # The entries of every shard are kept in the order of the task files
+    for name, (signature, file_shards) in zip(names, pool_map(_file_shards, [(home_dir, n) for n in names], workers)):
+        manifest[name] = signature
+        for shard, lines in file_shards.items():
+            shards.setdefault(shard, []).extend(lines)
+
+    for shard, lines in shards.items():
+        with open(str(index_path / shard), 'w') as file:
+            file.writelines(lines)
+            record_write(file.tell())
+
+    # The manifest is written last, an interrupted rebuild is therefore treated as a missing index
+    _write_manifest(index_path, manifest)
+
+
+@timed(INDEX)
+def reindex_file(home_dir: Path, file_name: str) -> None:
+    """
+    Replaces the entries of a single task file in the task id index
+
+    Used after a task file has been rewritten, the entries of all other task files are kept as they are.
+    If the index does not exist nothing is done.
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the rewritten task file
+    :return: Nothing
+    """
+    index_path = _id_index_path(home_dir)
+    manifest = _read_manifest(index_path)
+
+    if manifest is None:
+        return
+
+    shards: Dict[str, List[str]] = {}
+    for shard_path in index_path.glob('*.idx'):
+        with open(str(shard_path), 'r') as file:
+            shards[shard_path.name] = [line for line in file if line.rstrip('\n').rsplit(';', 2)[1] != file_name]
+
+    for offset, row in iter_rows(home_dir / file_name):
+        if is_task_row(row):
+            shards.setdefault(_shard_name(row[0]), []).append(f'{row[0]};{file_name};{offset}\n')
+
+    for shard, lines in shards.items():
+        with open(str(index_path / shard), 'w') as file:
+            file.writelines(lines)
+            record_write(file.tell())
+
+    manifest[file_name] = file_signature(home_dir / file_name)
+    _write_manifest(index_path, manifest)
+
+
+def _ensure_id_index(home_dir: Path, workers: int) -> None:
+    if _read_manifest(_id_index_path(home_dir)) != _current_signatures(home_dir):
+        rebuild_id_index(home_dir, workers)
+
+
+@timed(INDEX)
+def lookup_task(home_dir: Path, task_id: str, workers: int = 1) -> List[Location]:
+    """
+    Finds the locations of all versions of a task
+
+    The index is rebuilt if it is missing or any of the task files has changed since it was last updated.
+
+    :param home_dir: The wdc home directory
+    :param task_id: The id of the searched task
+    :param workers: The number of processes scanning the task files if the index has to be rebuilt
+    :return: A list of (file name, byte offset) pairs, one for every version of the task
+    """
+    if not home_dir.exists():
+        return []
+
+    _ensure_id_index(home_dir, workers)
+
+    shard_path = _id_index_path(home_dir) / _shard_name(task_id)
+    if not shard_path.exists():
+        return []
+
+    locations = []
+    with open(str(shard_path), 'r') as file:
+        for line in file:
+            entry_id, name, offset = line.rstrip('\n').rsplit(';', 2)
+            if entry_id == task_id:
+                locations.append((name, int(offset)))
+        record_read(file.buffer.tell())
+
+    return locations
+
+
+@timed(INDEX)
+def record_append(home_dir: Path,
+                  file_name: str,
+                  entries: List[Tuple[str, int]],
+                  before: Optional[Signature],
+                  after: Signature) -> None:
+    """
+    Updates the task id index after rows have been appended to a task file
+
+    If the index does not exist or was already out of date before the append nothing is done, the index
+    is then rebuilt on the next lookup.
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the task file the rows were appended to
+    :param entries: A list of (task id, byte offset) pairs, one for every appended row
+    :param before: The signature of the task file before the append
+    :param after: The signature of the task file after the append
+    :return: Nothing
+    """
+    index_path = _id_index_path(home_dir)
+    manifest = _read_manifest(index_path)
+
+    if manifest is None or manifest.get(file_name) != before:
+        return
+
+    shards: Dict[str, List[str]] = {}
+    for task_id, offset in entries:
+        shards.setdefault(_shard_name(task_id), []).append(f'{task_id};{file_name};{offset}\n')
+
+    for shard, lines in shards.items():
+        with open(str(index_path / shard), 'a') as file:
+            file.writelines(lines)
+
+    manifest[file_name] = after
+    _write_manifest(index_path, manifest)
+
+
+def _day_index_path(home_dir: Path, file_name: str) -> Path:
+    return home_dir / INDEX_DIR / DAY_INDEX_DIR / f'{Path(file_name).stem}.idx'
+
+
+def _signature_header(signature: Signature) -> str:
+    # Fixed width so that the header can be overwritten in place when a range is appended
+    return f'{signature[0]:020d};{signature[1]:020d}\n'
+
+
+@timed(INDEX)
+def rebuild_day_index(home_dir: Path, file_name: str) -> None:
+    """
+    Rebuilds the day index of a single task file
+
+    The day index of a task file maps every date to the byte ranges of the file holding the rows of that date.
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the task file
+    :return: Nothing
+    """
+    file_path = home_dir / file_name
+    index_path = _day_index_path(home_dir, file_name)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+
+    signature = file_signature(file_path)
+    rows = list(iter_rows(file_path))
+    # A row ends where the next one starts, the last one at the end of the file
+    ends = [offset for offset, _ in rows[1:]] + [signature[0]]
+
+    ranges: List[List] = []
+    for (start, row), end in zip(rows, ends):
+        # Rows that are not tasks are left out, the ranges next to them end and start at their boundaries
+        if not is_task_row(row):
+            continue
+
+        date = row[1]
+        if ranges and ranges[-1][0] == date and ranges[-1][2] == start:
+            ranges[-1][2] = end
+        else:
+            ranges.append([date, start, end])
+
+    temp_path = index_path.with_suffix('.tmp')
+    with open(str(temp_path), 'w') as file:
+        file.write(_signature_header(signature))
+        file.writelines(f'{date};{start};{end}\n' for date, start, end in ranges)
+        record_write(file.tell())
+
+    os.replace(str(temp_path), str(index_path))
+
+
+def day_ranges(home_dir: Path, file_name: str, date: str) -> List[Range]:
+    """
+    Returns the byte ranges of a task file that hold the rows of the given date
+
+    The day index of the file is rebuilt if it is missing or if the task file has been changed since.
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the task file
+    :param date: The date of the searched rows
+    :return: A list of (start, end) byte offset pairs
+    """
+    return days_ranges(home_dir, file_name, {date}).get(date, [])
+
+
+@timed(INDEX)
+def days_ranges(home_dir: Path, file_name: str, dates: Set[str]) -> Dict[str, List[Range]]:
+    """
+    Returns the byte ranges of a task file that hold the rows of each of the given dates, see day_ranges
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the task file
+    :param dates: The dates of the searched rows
+    :return: The (start, end) byte offset pairs of every date with rows, dates without rows are left out
+    """
+    index_path = _day_index_path(home_dir, file_name)
+
+    if not index_path.exists() or _read_header(index_path) != file_signature(home_dir / file_name):
+        rebuild_day_index(home_dir, file_name)
+
+    found: Dict[str, List[Range]] = {}
+    with open(str(index_path), 'r') as file:
+        file.readline()
+        for line in file:
+            entry_date, start, end = line.rstrip('\n').split(';')
+            if entry_date not in dates:
+                continue
+            ranges = found.setdefault(entry_date, [])
+            if ranges and ranges[-1][1] == int(start):
+                ranges[-1] = (ranges[-1][0], int(end))
+            else:
+                ranges.append((int(start), int(end)))
+        record_read(file.buffer.tell())
+
+    return found
+
+
+def _read_header(index_path: Path) -> Optional[Signature]:
+    with open(str(index_path), 'r') as file:
+        header = file.readline().rstrip('\n').split(';')
+
+    if len(header) != 2:
+        return None
+
+    return int(header[0]), int(header[1])
+
+
+@timed(INDEX)
+def record_day_append(home_dir: Path,
+                      file_name: str,
+                      entries: List[Tuple[str, int, int]],
+                      before: Optional[Signature],
+                      after: Signature) -> None:
+    """
+    Updates the day index of a task file after rows have been appended to it
+
+    If the day index does not exist or was already out of date before the append nothing is done, the
+    index is then rebuilt on the next read.
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the task file the rows were appended to
+    :param entries: A list of (date, start, end) triples, one for every appended row
+    :param before: The signature of the task file before the append
+    :param after: The signature of the task file after the append
+    :return: Nothing
+    """
+    index_path = _day_index_path(home_dir, file_name)
+
+    if not index_path.exists() or _read_header(index_path) != before:
+        return
+
+    with open(str(index_path), 'r+') as file:
+        file.seek(0, os.SEEK_END)
+        file.writelines(f'{date};{start};{end}\n' for date, start, end in entries)
+        # Written last, an interrupted update leaves an index that is detected as out of date
+        file.seek(0)
+        file.write(_signature_header(after))
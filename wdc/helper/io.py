@@ -1,15 +1,125 @@
-import csv
-from os import listdir
-from os.path import isfile, join
+import os
+from copy import copy
+from os import SEEK_END
 
 import wdc.settings as settings
-from wdc.classes import WdcTask, to_array, to_task
-from wdc.time import is_date_valid, to_date_no_day
+from wdc.classes import DayTotal, WdcTask, to_array, to_task
+from wdc.exceptions import ConcurrentModificationError
+from wdc.helper import index
+from wdc.helper.cache import MonthCache, DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES
+from wdc.helper.config import get_setting
+from wdc.helper.pool import pool_map
+from wdc.helper.timing import DECODE, INDEX, SORT, WRITE, phase, record_write
+from wdc.helper.task_file import ENCODING, Columns, content_checksum, encode_row, file_signature, is_task_row, \
+    parse_rows, read_columns, read_file, read_last_row, read_ranges, read_row_at, read_rows, stream_rows, to_columns
+from wdc.time import is_date_valid, to_date_no_day, today
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 HOME_DIR_PATH = Path.joinpath(Path.home(), settings.HOME_DIR)
 
+_month_cache: MonthCache = None
+
+
+def month_cache() -> MonthCache:
+    """
+    Returns the in memory cache of parsed task files, configured by the [cache] table of the settings
+    """
+    global _month_cache
+
+    if _month_cache is None:
+        _month_cache = MonthCache(
+            max_entries=get_setting(HOME_DIR_PATH, 'cache', 'max_entries', DEFAULT_MAX_ENTRIES),
+            max_bytes=get_setting(HOME_DIR_PATH, 'cache', 'max_bytes', DEFAULT_MAX_BYTES))
+
+    return _month_cache
+
+
+def _parse_appended(file_path: Path, signature: Tuple[int, int], data: bytes) -> Optional[List[WdcTask]]:
+    """
+    Continues parsing a task file at the offset where its outdated cache entry ends
+
+    Only possible if the file has grown and the checksum of the already parsed part still matches,
+    which is not the case after a compaction or any other change of the already parsed rows.
+    """
+    cache = month_cache()
+    entry = cache.entry(file_path)
+
+    if entry is None or entry.checksum is None or len(data) < entry.signature[0] or not data.endswith(b'\n'):
+        return None
+
+    # The whole parsed part is checked, a changed row in the middle of the file leaves its size as it is
+    parsed = memoryview(data)[:entry.signature[0]]
+    if content_checksum(parsed) != entry.checksum:
+        return None
+
+    appended = data[entry.signature[0]:]
+
+    with phase(DECODE):
+        tasks = list(map(lambda x: to_task(x), parse_rows(appended)))
+
+    cache.extend(file_path, entry.signature, signature, appended, tasks)
+
+    return entry.tasks
+
+
+def _parse_task_file(file_path: Path, signature: Tuple[int, int], data: bytes, checksum: int) -> List[WdcTask]:
+    # Snapshots are only needed when a file is parsed, not by the commands that just append to a task file
+    from wdc.helper.snapshot import load_snapshot, save_snapshot
+
+    tasks = load_snapshot(HOME_DIR_PATH, file_path.name, signature, checksum)
+
+    if tasks is not None:
+        return tasks
+
+    with phase(DECODE):
+        tasks = list(map(lambda x: to_task(x), parse_rows(data)))
+
+    # Only closed months are stored, the current month changes too often for a snapshot to pay off
+    if file_path.stem < to_date_no_day(today()) and get_setting(HOME_DIR_PATH, 'cache', 'snapshots', True):
+        save_snapshot(HOME_DIR_PATH, file_path.name, signature, checksum, tasks)
+
+    return tasks
+
+
+def read_task_file(file_path: Path) -> List[WdcTask]:
+    """
+    Reads all tasks of a task file
+
+    Unchanged files are served from the month cache. If the file has only been appended to since it was
+    cached only the appended part is parsed. Files that are not cached are loaded from their snapshot
+    if there is a valid one.
+
+    :param file_path: The path to the task file
+    :return: All tasks of the file in the order they were written
+    """
+    signature = file_signature(file_path)
+
+    if signature is None:
+        return []
+
+    cache = month_cache()
+    tasks = cache.get(file_path, signature)
+
+    if tasks is None:
+        data, signature = read_file(file_path)
+        tasks = _parse_appended(file_path, signature, data)
+
+        if tasks is None:
+            checksum = content_checksum(data)
+            tasks = _parse_task_file(file_path, signature, data, checksum)
+            cache.put(file_path, signature, checksum if data.endswith(b'\n') else None, tasks)
+
+    return list(tasks)
+
+
+def _cached_tasks(file_path: Path) -> Optional[List[WdcTask]]:
+    # Reading a file that is already in the cache costs at most the parsing of the appended rows
+    if month_cache().entry(file_path) is None:
+        return None
+
+    return read_task_file(file_path)
+
 
 def array_to_tags_string(tags: List[str]) -> str:
     tags.sort()
@@ -23,13 +133,138 @@ def task_file_path(date: str):
     return Path.joinpath(HOME_DIR_PATH, f'{to_date_no_day(date)}.csv')
 
 
+def task_file_names() -> List[str]:
+    return index.task_files(HOME_DIR_PATH)
+
+
+def task_months() -> List[str]:
+    return [name[:-len('.csv')] for name in task_file_names()]
+
+
+def iter_month_tasks(month: str) -> Iterator[WdcTask]:
+    """
+    Lazily reads all task rows of a month in the order they were written
+
+    :param month: The month in the YYYYMM format
+    :return: An iterator over all tasks of the month
+    """
+    file_path = Path.joinpath(HOME_DIR_PATH, f'{month}.csv')
+
+    if not file_path.exists():
+        return
+
+    for row in stream_rows(file_path):
+        yield to_task(row)
+
+
+def read_month_columns(month: str) -> Columns:
+    """
+    Reads all task rows of a month column wise, see task_file.read_columns
+
+    :param month: The month in the YYYYMM format
+    :return: The columns of the rows in the order they were written, empty columns if the month has no file
+    """
+    file_path = Path.joinpath(HOME_DIR_PATH, f'{month}.csv')
+
+    if not file_path.exists():
+        return to_columns([])
+
+    return read_columns(file_path)
+
+
+def read_day_totals(month: str) -> List[DayTotal]:
+    """
+    Returns the per day totals of a month from the rollups of its task file
+
+    :param month: The month in the YYYYMM format
+    :return: The totals sorted by date and tags, empty if the month has no file
+    """
+    from wdc.helper import rollup
+
+    file_name = f'{month}.csv'
+
+    if not Path.joinpath(HOME_DIR_PATH, file_name).exists():
+        return []
+
+    return rollup.read_rollups(HOME_DIR_PATH, file_name)
+
+
 def write_task(task: WdcTask):
+    write_tasks([task])
+
+
+def write_tasks(tasks: Iterable[WdcTask]) -> int:
+    """
+    Appends tasks to the task files of their dates
+
+    Every task file is opened only once, the rows are written in the order they are given.
+
+    :param tasks: The tasks to be written
+    :return: The number of written tasks
+    """
+    from wdc.helper import rollup
+
     HOME_DIR_PATH.mkdir(parents=True, exist_ok=True)
 
-    with open(str(task_file_path(task.date)), 'a', newline='') as file:
-        csv_writer = csv.writer(file, delimiter=';', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+    with phase(WRITE):
+        open_files = _append_tasks(tasks)
+
+    with phase(INDEX):
+        for file_name, (_, before, after, entries, _, written) in open_files.items():
+            file_path = Path.joinpath(HOME_DIR_PATH, file_name)
+            index.record_append(HOME_DIR_PATH, file_name, [(e[0].id, e[1]) for e in entries], before, after)
+            day_entries = [(e[0].date, e[1], e[2]) for e in entries]
+            index.record_day_append(HOME_DIR_PATH, file_name, day_entries, before, after)
+            rollup.record_rollup_append(HOME_DIR_PATH, file_name, [e[0].date for e in entries], before, after)
+            # Copies are cached so that later changes of the written objects do not leak into the cache, they are
+            # only made if the file is cached
+            month_cache().extend(file_path, before, after, b''.join(written), (copy(e[0]) for e in entries))
+
+    return sum(len(open_file[3]) for open_file in open_files.values())
+
+
+def _append_tasks(tasks: Iterable[WdcTask]) -> dict:
+    """
+    Appends the rows of the tasks to their task files
+
+    :return: Maps the name of every written file to its closed file, the signatures before and after the writing,
+             the written (task, start offset, end offset) entries, the end offset and the written rows
+    """
+    open_files = {}
+    # Finding the task file of a date parses it, so the open file is looked up once per date
+    date_files = {}
+    try:
+        for task in tasks:
+            open_file = date_files.get(task.date)
+            if open_file is None:
+                file_path = task_file_path(task.date)
+                open_file = open_files.get(file_path.name)
+
+                if open_file is None:
+                    existed = file_path.exists()
+                    file = open(str(file_path), 'ab')
+                    # The signatures are taken from the open file so that they describe exactly what was written
+                    before = (file.seek(0, SEEK_END), os.fstat(file.fileno()).st_mtime_ns) if existed else None
+                    # The write position is tracked instead of asking the file for it after every row
+                    open_file = open_files[file_path.name] = [file, before, None, [], file.seek(0, SEEK_END), []]
+
+                date_files[task.date] = open_file
+
+            row = encode_row(to_array(task))
+            offset = open_file[4]
+            open_file[0].write(row)
+            open_file[4] = offset + len(row)
+            open_file[3].append((task, offset, offset + len(row)))
+            open_file[5].append(row)
+    finally:
+        for open_file in open_files.values():
+            file = open_file[0]
+            file.flush()
+            open_file[2] = (file.tell(), os.fstat(file.fileno()).st_mtime_ns)
+            file.close()
+            record_write(sum(end - start for _, start, end in open_file[3]))
 
-        csv_writer.writerow(to_array(task))
+    return open_files
 
 
 def last_task(date: str) -> WdcTask:
@@ -41,9 +276,17 @@ def last_task(date: str) -> WdcTask:
     if not file_path.exists():
         raise FileNotFoundError(str(file_path))
 
-    with open(str(file_path), 'r') as file:
-        row = list(csv.reader(file, delimiter=';'))[-1]
-        return to_task(row)
+    cached = _cached_tasks(file_path)
+    if cached:
+        return cached[-1]
+
+    row = read_last_row(file_path, is_task_row)
+
+    # The end of the file could not be decoded, fall back to reading the whole file
+    if row is None:
+        row = read_rows(file_path)[-1]
+
+    return to_task(row)
 
 
 def read_all_tasks(date: str) -> List[WdcTask]:
@@ -52,29 +295,154 @@ def read_all_tasks(date: str) -> List[WdcTask]:
 
     file_path = task_file_path(date)
 
+    return read_task_file(file_path)
+
+
+def read_day_tasks(date: str) -> List[WdcTask]:
+    """
+    Reads the tasks of a single day using the day index of the task file
+
+    Only the parts of the task file holding rows of the given date are read.
+
+    :param date: The date of the tasks
+    :return: All task rows of the given date in the order they were written
+    """
+    if not is_date_valid(date):
+        raise ValueError(f'{date} is not a valid date')
+
+    file_path = task_file_path(date)
+
     if not file_path.exists():
         return []
 
-    with open(str(file_path), 'r') as file:
-        return list(map(lambda x: to_task(x), list(csv.reader(file, delimiter=';'))))
+    cached = _cached_tasks(file_path)
+    if cached is not None:
+        return [task for task in cached if task.date == date]
+
+    ranges = index.day_ranges(HOME_DIR_PATH, file_path.name, date)
+    rows = read_ranges(file_path, ranges)
+
+    with phase(DECODE):
+        return list(map(lambda x: to_task(x), rows))
+
+
+# Task files smaller than this in total are scanned in this process whatever the number of workers. Starting the
+# worker processes takes about 0.45 s while the scan reads about 650 MiB/s, most files are skipped unparsed. Two
+# workers at best halve the scan, so they only pay off once it takes twice the start up time.
+PARALLEL_SCAN_BYTES = 512 * 2 ** 20
+
+
+def scan_workers() -> int:
+    """
+    Returns the number of processes scanning the task files, configured by scan_workers in the [index] table
+    """
+    return get_setting(HOME_DIR_PATH, 'index', 'scan_workers', 1)
+
+
+def _scan_file(file_path: Path, task_id: str) -> List[List[str]]:
+    data, _ = read_file(file_path)
+
+    # Most files do not hold the task at all, they are skipped without being parsed
+    if task_id.encode(ENCODING) not in data:
+        return []
+
+    return [row for row in parse_rows(data) if row[0] == task_id and is_task_row(row)]
+
+
+def scan_tasks(task_id: str, workers: Optional[int] = None) -> List[WdcTask]:
+    """
+    Finds all versions of a task by reading every task file
+
+    :param task_id: The id of the searched task
+    :param workers: The number of processes reading the task files, scan_workers() if not given. The files are
+                    read in this process if they are smaller than PARALLEL_SCAN_BYTES in total.
+    :return: All versions of the task sorted by their timestamp
+    """
+    if workers is None:
+        workers = scan_workers()
+
+    arguments = [(Path.joinpath(HOME_DIR_PATH, file), task_id) for file in index.task_files(HOME_DIR_PATH)]
+
+    if workers > 1 and sum(os.path.getsize(file_path) for file_path, _ in arguments) < PARALLEL_SCAN_BYTES:
+        workers = 1
+    ret_val = [to_task(row) for rows in pool_map(_scan_file, arguments, workers) for row in rows]
+
+    with phase(SORT):
+        return sorted(ret_val, key=lambda t: int(t.timestamp))
 
 
 def find_tasks(task_id: str) -> List[WdcTask]:
+    """
+    Finds all versions of a task using the task id index
 
-    all_files = [f for f in listdir(HOME_DIR_PATH) if isfile(join(HOME_DIR_PATH, f))]
-    work_day_files = list(filter(lambda f: f.endswith('csv'), all_files))
+    :param task_id: The id of the searched task
+    :return: All versions of the task sorted by their timestamp
+    """
+    workers = scan_workers()
 
     ret_val = []
-    for file in work_day_files:
-        with open(Path.joinpath(HOME_DIR_PATH, file), 'r') as openFile:
-            tasks = list(map(lambda x: to_task(x), list(csv.reader(openFile, delimiter=';'))))
-            for task in tasks:
-                if task.id == task_id:
-                    ret_val.append(task)
+    for file, offset in index.lookup_task(HOME_DIR_PATH, task_id, workers):
+        row = read_row_at(Path.joinpath(HOME_DIR_PATH, file), offset)
+
+        # The index does not match the file content, start over with a fresh index
+        if row is None or row[0] != task_id:
+            index.rebuild_id_index(HOME_DIR_PATH, workers)
+            return scan_tasks(task_id, workers)
+
+        ret_val.append(to_task(row))
+
+    with phase(SORT):
+        return sorted(ret_val, key=lambda t: int(t.timestamp))
+
+
+def compact_task_file(file_name: str, keep: int = 1) -> Tuple[int, int]:
+    """
+    Rewrites a task file keeping only the latest versions of every task
+
+    Versions are grouped by task id and date, the same way list_tasks deduplicates them, so listing a day
+    returns the same tasks before and after the compaction. Only the history shown by the info command
+    gets shorter. Rows that are not complete tasks are kept as they are. The remaining rows keep their order
+    and the file is replaced atomically.
+
+    :param file_name: The name of the task file in the home directory
+    :param keep: The number of versions to keep for every task and date
+    :return: The number of rows before and after the compaction
+    """
+    if keep < 1:
+        raise ValueError(f'At least one version has to be kept, {keep} given')
+
+    file_path = Path.joinpath(HOME_DIR_PATH, file_name)
+    signature = file_signature(file_path)
+    rows = read_rows(file_path)
+
+    versions = {}
+    kept = set()
+    for position, row in enumerate(rows):
+        if is_task_row(row):
+            versions.setdefault((row[0], row[1]), []).append((int(row[6]), position))
+        else:
+            kept.add(position)
+
+    for group in versions.values():
+        # The earliest version wins on equal timestamps, like in list_tasks
+        kept.update(position for _, position in sorted(group, key=lambda v: (v[0], -v[1]))[-keep:])
+
+    temp_path = file_path.with_name(f'{file_name}.tmp')
+    with phase(WRITE), open(str(temp_path), 'wb') as file:
+        for position, row in enumerate(rows):
+            if position in kept:
+                file.write(encode_row(row))
+        file.flush()
+        os.fsync(file.fileno())
+        record_write(file.tell())
+
+    if file_signature(file_path) != signature:
+        temp_path.unlink()
+        raise ConcurrentModificationError(str(file_path))
 
-    return sorted(ret_val, key=lambda t: int(t.timestamp))
+    os.replace(str(temp_path), str(file_path))
 
+    index.reindex_file(HOME_DIR_PATH, file_name)
+    index.rebuild_day_index(HOME_DIR_PATH, file_name)
 
-def write_file(content: str, path: str):
-    with open(path, 'w') as openFile:
-        openFile.write(content)
+    return len(rows), len(kept)
@@ -0,0 +1,35 @@
+from typing import Any, Callable, Iterator, Sequence, Tuple
+
+
+def pool_map(function: Callable[..., Any],
+             arguments: Sequence[Tuple],
+             workers: int,
+             initializer: Callable[..., None] = None,
+             initargs: Tuple = ()) -> Iterator[Any]:
+    """
+    Calls a function once for every tuple of arguments, in worker processes if more than one worker is requested
+
+    The workers are spawned and not forked, so they do not inherit open files or storage connections. Anything
+    they need from the calling process, like a patched home directory, has to be handed over with the
+    initializer. The function has to be defined at module level so that the workers can import it.
+
+    :param function: The function to call
+    :param arguments: The arguments of every call
+    :param workers: The maximal number of worker processes, the calls are made in this process if it is 1 or less
+    :param initializer: The optional function called with the initargs in every worker before the first call
+    :param initargs: The arguments of the initializer
+    :return: The results in the order of the arguments
+    """
+    if workers <= 1 or len(arguments) <= 1:
+        yield from (function(*call_arguments) for call_arguments in arguments)
+        return
+
+    # Imported here as they take longer to load than most commands take to run
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(arguments)),
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=initializer,
+                             initargs=initargs) as executor:
+        yield from executor.map(function, *zip(*arguments))
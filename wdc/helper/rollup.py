@@ -0,0 +1,199 @@
+import os
+from operator import lt
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from wdc.classes import DayTotal
+from wdc.helper import index
+from wdc.helper.task_file import Columns, encode_row, file_signature, gc_paused, parse_rows, read_file, \
+    read_ranges, to_columns
+from wdc.helper.timing import INDEX, SORT, phase, record_write, timed
+from wdc.time import MINUTES_OF_DAY, MINUTES_PER_DAY, is_date_valid, is_time_valid
+
+ROLLUP_DIR = 'rollups'
+ROLLUP_SUFFIX = '.rollup'
+
+Signature = Tuple[int, int]
+
+
+def latest_positions(ids: Sequence[str], dates: Sequence[str], timestamps: List[int]) -> List[int]:
+    """
+    Finds the latest version of every task and date, following the same rules as list_tasks
+
+    :param ids: The task id column
+    :param dates: The date column
+    :param timestamps: The timestamp column
+    :return: The positions of the latest versions
+    """
+    with phase(SORT):
+        return _latest_positions(ids, dates, timestamps)
+
+
+def _latest_positions(ids: Sequence[str], dates: Sequence[str], timestamps: List[int]) -> List[int]:
+    keys = zip(ids, dates)
+
+    if all(map(lt, timestamps, timestamps[1:])):
+        # Rows are appended with the current time, so usually the last version of a task is its latest one
+        return list(dict(zip(keys, range(len(timestamps)))).values())
+
+    latest: Dict[Tuple[str, str], int] = {}
+    for position, key in enumerate(keys):
+        current = latest.get(key)
+        if current is None or timestamps[current] < timestamps[position]:
+            latest[key] = position
+
+    return list(latest.values())
+
+
+def _valid_columns(columns: Columns) -> Columns:
+    rows = [row for row in zip(*columns)
+            if len(row[0]) > 0 and is_date_valid(row[1]) and row[6].isdigit()
+            and is_time_valid(row[2]) and (row[3] == '' or is_time_valid(row[3]))]
+
+    return to_columns(rows)
+
+
+def _day_totals(columns: Columns) -> List[DayTotal]:
+    ids, dates, starts, ends, tags = columns[0:5]
+    positions = latest_positions(ids, dates, list(map(int, columns[6])))
+
+    totals: Dict[Tuple[str, str], List[int]] = {}
+    for position in positions:
+        start = MINUTES_OF_DAY[starts[position]]
+        end = MINUTES_OF_DAY[ends[position]]
+        total = totals.get((dates[position], tags[position]))
+
+        if total is None:
+            total = totals[(dates[position], tags[position])] = [0, 0, start, -1]
+
+        total[1] += 1
+        total[2] = min(total[2], start)
+        if end >= 0:
+            total[0] += (end - start) % MINUTES_PER_DAY
+            total[3] = max(total[3], end)
+
+    return [DayTotal(date, group_tags, *total) for (date, group_tags), total in sorted(totals.items())]
+
+
+def compute_day_totals(columns: Columns) -> List[DayTotal]:
+    """
+    Summarizes task rows into per day and tags totals
+
+    Rows with broken values are ignored.
+
+    :param columns: The task rows column wise, see task_file.to_columns
+    :return: The totals sorted by date and tags
+    """
+    try:
+        return _day_totals(columns)
+    except (KeyError, ValueError):
+        return _day_totals(_valid_columns(columns))
+
+
+def _rollup_path(home_dir: Path, file_name: str) -> Path:
+    return home_dir / ROLLUP_DIR / f'{Path(file_name).stem}{ROLLUP_SUFFIX}'
+
+
+def _write_rollups(home_dir: Path, file_name: str, signature: Signature, totals: Iterable[DayTotal]) -> None:
+    path = _rollup_path(home_dir, file_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(str(temp_path), 'wb') as file:
+        file.write(encode_row([str(signature[0]), str(signature[1])]))
+        for total in totals:
+            file.write(encode_row([str(value) for value in total]))
+        record_write(file.tell())
+
+    os.replace(str(temp_path), str(path))
+
+
+def _read_rollups(home_dir: Path, file_name: str) -> Tuple[Optional[Signature], List[DayTotal]]:
+    try:
+        data, _ = read_file(_rollup_path(home_dir, file_name))
+        rows = parse_rows(data)
+        signature = (int(rows[0][0]), int(rows[0][1]))
+        totals = [DayTotal(row[0], row[1], int(row[2]), int(row[3]), int(row[4]), int(row[5])) for row in rows[1:]]
+    except (OSError, IndexError, ValueError):
+        return None, []
+
+    return signature, totals
+
+
+def rebuild_rollups(home_dir: Path, file_name: str) -> List[DayTotal]:
+    """
+    Recomputes the day totals of a task file from all of its rows
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the task file
+    :return: The day totals of the file
+    """
+    with gc_paused():
+        data, signature = read_file(home_dir / file_name)
+        totals = compute_day_totals(to_columns(parse_rows(data)))
+
+    _write_rollups(home_dir, file_name, signature, totals)
+
+    return totals
+
+
+@timed(INDEX)
+def read_rollups(home_dir: Path, file_name: str) -> List[DayTotal]:
+    """
+    Returns the day totals of a task file
+
+    The totals are rebuilt if they are missing or if the task file has been changed without updating them.
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the task file
+    :return: The day totals sorted by date and tags
+    """
+    signature, totals = _read_rollups(home_dir, file_name)
+
+    if signature is None or signature != file_signature(home_dir / file_name):
+        return rebuild_rollups(home_dir, file_name)
+
+    return totals
+
+
+@timed(INDEX)
+def record_rollup_append(home_dir: Path,
+                         file_name: str,
+                         dates: Iterable[str],
+                         before: Optional[Signature],
+                         after: Signature) -> None:
+    """
+    Updates the day totals of a task file after rows have been appended to it
+
+    Only the given days are recomputed, their rows are found with the day index. If the appended rows make
+    up most of the file all of it is summarized again. If the totals do not exist or were already out of
+    date before the append nothing is done, they are then rebuilt on the next read.
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the task file the rows were appended to
+    :param dates: The dates of the appended rows
+    :param before: The signature of the task file before the append
+    :param after: The signature of the task file after the append
+    :return: Nothing
+    """
+    signature, totals = _read_rollups(home_dir, file_name)
+
+    if signature is None or signature != before:
+        return
+
+    if before[0] <= after[0] - before[0]:
+        # Most of the file has just been appended, reading all of it is cheaper than reading it day by day
+        rebuild_rollups(home_dir, file_name)
+        return
+
+    dates = set(dates)
+    file_path = home_dir / file_name
+
+    rows = []
+    for date, ranges in sorted(index.days_ranges(home_dir, file_name, dates).items()):
+        rows.extend(read_ranges(file_path, ranges))
+
+    totals = [total for total in totals if total.date not in dates] + compute_day_totals(to_columns(rows))
+    totals.sort(key=lambda t: (t.date, t.tags))
+
+    _write_rollups(home_dir, file_name, after, totals)
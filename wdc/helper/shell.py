@@ -0,0 +1,98 @@
+import cmd
+import shlex
+from typing import Iterator, List
+
+import click
+
+from wdc.classes import WdcTask
+from wdc.helper import storage
+from wdc.helper.daemon import invoke_command
+
+# Commands that can not be run inside the shell
+BLOCKED_COMMANDS = ('shell', 'serve', 'api')
+# The number of the latest stored months the completions are taken from
+COMPLETION_MONTHS = 2
+
+_TAG_OPTIONS = ('-t', '--tag')
+_ID_COMMANDS = ('info', 'amend')
+
+
+class WdcShell(cmd.Cmd):
+    """
+    Runs wdc commands one line at a time in this process
+
+    Every line is run by the click commands the same way as on the command line, the month cache and the
+    indexes stay loaded between the lines. The tasks written by the lines are collected and stored together
+    when a command reads tasks and when the shell is left. The ids of info and amend and the values of the tag
+    options are completed from the cached tasks of the latest months.
+
+    Attributes:
+        cli -- The click command group running the commands
+        exit_code -- The exit code of the last command
+    """
+    intro = 'wdc shell, help lists the commands, exit or Ctrl+D leaves'
+    prompt = 'wdc> '
+
+    def __init__(self, cli: click.MultiCommand, **kwargs):
+        super().__init__(**kwargs)
+        self.cli = cli
+        self.exit_code = 0
+
+    def emptyline(self) -> bool:
+        # Repeating the last command, the default of cmd, would start the same task twice
+        return False
+
+    def default(self, line: str) -> bool:
+        try:
+            args = shlex.split(line)
+        except ValueError as error:
+            click.echo(f'Could not read the command: {error}', err=True)
+            self.exit_code = 2
+            return False
+
+        if args[0] in BLOCKED_COMMANDS:
+            click.echo(f'{args[0]} can not be run inside the shell', err=True)
+            self.exit_code = 2
+            return False
+
+        self.exit_code = invoke_command(self.cli, args)
+        return False
+
+    def do_help(self, arg: str) -> bool:
+        invoke_command(self.cli, [arg, '--help'] if arg else ['--help'])
+        return False
+
+    def do_exit(self, arg: str) -> bool:
+        return True
+
+    def do_EOF(self, arg: str) -> bool:
+        click.echo()
+        return True
+
+    def _recent_tasks(self) -> Iterator[WdcTask]:
+        # Read through the month cache, completing a word must not read the task files again on every Tab
+        for month in storage.months()[-COMPLETION_MONTHS:]:
+            yield from storage.read_all_tasks(f'{month[0:4]}-{month[4:6]}-01')
+
+    def task_ids(self) -> List[str]:
+        return sorted({task.id for task in self._recent_tasks()})
+
+    def tags(self) -> List[str]:
+        return sorted({tag for task in self._recent_tasks() for tag in task.tags.split(',') if tag})
+
+    def completenames(self, text: str, *ignored) -> List[str]:
+        names = self.cli.list_commands(click.Context(self.cli)) + ['exit', 'help']
+
+        return [name for name in names if name.startswith(text) and name not in BLOCKED_COMMANDS]
+
+    def completedefault(self, text: str, line: str, begidx: int, endidx: int) -> List[str]:
+        words = line[:begidx].split()
+
+        if words[-1] in _TAG_OPTIONS:
+            candidates = self.tags()
+        elif words[0] in _ID_COMMANDS and len(words) == 1:
+            candidates = self.task_ids()
+        else:
+            return []
+
+        return [candidate for candidate in candidates if candidate.startswith(text)]
@@ -0,0 +1,79 @@
+import marshal
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from wdc.classes import WdcTask
+from wdc.helper.task_file import gc_paused
+from wdc.helper.timing import DECODE, READ, WRITE, phase, record_read, record_write
+
+SNAPSHOT_DIR = 'cache'
+SNAPSHOT_SUFFIX = '.snapshot'
+# Increased whenever the layout of the snapshot changes, snapshots with a different version are ignored
+FORMAT_VERSION = 2
+
+Signature = Tuple[int, int]
+
+
+def _snapshot_path(home_dir: Path, file_name: str) -> Path:
+    return home_dir / SNAPSHOT_DIR / f'{Path(file_name).stem}{SNAPSHOT_SUFFIX}'
+
+
+def save_snapshot(home_dir: Path, file_name: str, signature: Signature, checksum: int, tasks: List[WdcTask]) -> None:
+    """
+    Stores the parsed tasks of a task file in the snapshot cache
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the task file
+    :param signature: The signature of the parsed content
+    :param checksum: The content_checksum of the parsed content
+    :param tasks: The tasks parsed from the content
+    :return: Nothing
+    """
+    path = _snapshot_path(home_dir, file_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    columns = tuple(zip(*[(t.id, t.date, t.start, t.end, t.tags, t.description, t.timestamp) for t in tasks]))
+    payload = (FORMAT_VERSION, signature[0], signature[1], checksum, columns)
+
+    content = marshal.dumps(payload)
+
+    temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with phase(WRITE), open(str(temp_path), 'wb') as file:
+        file.write(content)
+
+    record_write(content)
+
+    os.replace(str(temp_path), str(path))
+
+
+def load_snapshot(home_dir: Path, file_name: str, signature: Signature, checksum: int) -> Optional[List[WdcTask]]:
+    """
+    Loads the parsed tasks of a task file from the snapshot cache
+
+    A snapshot is only used if the size, modification time and checksum of the task file match the ones it
+    was created from. The checksum is the one the month cache keeps for the file anyway, so checking it does
+    not cost another pass over the content. Missing, outdated or broken snapshots are ignored.
+
+    :param home_dir: The wdc home directory
+    :param file_name: The name of the task file
+    :param signature: The signature of the content of the task file
+    :param checksum: The content_checksum of the content of the task file
+    :return: The tasks of the snapshot or None if there is no valid snapshot
+    """
+    try:
+        with gc_paused():
+            with phase(READ), open(str(_snapshot_path(home_dir, file_name)), 'rb') as file:
+                # Loading from the file object would read it in many small pieces
+                content = file.read()
+
+            record_read(content)
+
+            with phase(DECODE):
+                version, size, mtime, stored_checksum, columns = marshal.loads(content)
+                if version != FORMAT_VERSION or (size, mtime) != signature or stored_checksum != checksum:
+                    return None
+
+                return list(map(WdcTask, *columns)) if columns else []
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
@@ -0,0 +1,159 @@
+import sqlite3
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from wdc.classes import WdcTask
+from wdc.helper.storage import TaskStorage
+from wdc.time import is_date_valid
+
+BATCH_SIZE = 10000
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS tasks (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        start_time TEXT NOT NULL,
+        end_time TEXT NOT NULL,
+        tags TEXT NOT NULL,
+        description TEXT NOT NULL,
+        timestamp INTEGER NOT NULL
+    )''',
+    'CREATE INDEX IF NOT EXISTS tasks_id ON tasks (id)',
+    'CREATE INDEX IF NOT EXISTS tasks_date ON tasks (date)',
+    'CREATE INDEX IF NOT EXISTS tasks_timestamp ON tasks (timestamp)'
+]
+
+COLUMNS = 'id, date, start_time, end_time, tags, description, timestamp'
+
+
+def _month_range(month: str) -> Tuple[str, str]:
+    # Dates are stored as YYYY-MM-DD, every date of a month sorts between these two strings
+    return f'{month[0:4]}-{month[4:6]}-00', f'{month[0:4]}-{month[4:6]}-99'
+
+
+def _date_month(date: str) -> str:
+    if not is_date_valid(date):
+        raise ValueError(f'{date} is not a valid date')
+
+    return date[0:4] + date[5:7]
+
+
+def _to_task(row: tuple) -> WdcTask:
+    return WdcTask(
+        id=row[0],
+        date=row[1],
+        start=row[2],
+        end=row[3],
+        tags=row[4],
+        description=row[5],
+        timestamp=str(row[6])
+    )
+
+
+def _to_row(task: WdcTask) -> tuple:
+    return task.id, task.date, task.start, task.end, task.tags, task.description, int(task.timestamp)
+
+
+class SqliteTaskStorage(TaskStorage):
+    """
+    Stores the tasks in a single sqlite database with indexes on the task id, date and timestamp
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path))
+
+        with self._connection:
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+
+    def write_task(self, task: WdcTask) -> None:
+        with self._connection:
+            self._connection.execute(f'INSERT INTO tasks ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)', _to_row(task))
+
+    def write_tasks(self, tasks: Iterable[WdcTask]) -> int:
+        count = 0
+        rows = map(_to_row, tasks)
+
+        batch = list(islice(rows, BATCH_SIZE))
+        while batch:
+            with self._connection:
+                self._connection.executemany(f'INSERT INTO tasks ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)', batch)
+            count += len(batch)
+            batch = list(islice(rows, BATCH_SIZE))
+
+        return count
+
+    def last_task(self, date: str) -> WdcTask:
+        month = _date_month(date)
+        row = self._connection.execute(
+            f'SELECT {COLUMNS} FROM tasks WHERE date BETWEEN ? AND ? ORDER BY seq DESC LIMIT 1',
+            _month_range(month)).fetchone()
+
+        if row is None:
+            raise FileNotFoundError(f'No tasks stored for {month}')
+
+        return _to_task(row)
+
+    def read_all_tasks(self, date: str) -> List[WdcTask]:
+        return list(self.iter_month(_date_month(date)))
+
+    def read_day_tasks(self, date: str) -> List[WdcTask]:
+        if not is_date_valid(date):
+            raise ValueError(f'{date} is not a valid date')
+
+        cursor = self._connection.execute(f'SELECT {COLUMNS} FROM tasks WHERE date = ? ORDER BY seq', (date,))
+
+        return list(map(_to_task, cursor))
+
+    def find_tasks(self, task_id: str) -> List[WdcTask]:
+        cursor = self._connection.execute(
+            f'SELECT {COLUMNS} FROM tasks WHERE id = ? ORDER BY timestamp, seq', (task_id,))
+
+        return list(map(_to_task, cursor))
+
+    def months(self) -> List[str]:
+        cursor = self._connection.execute(
+            'SELECT DISTINCT substr(date, 1, 4) || substr(date, 6, 2) FROM tasks ORDER BY 1')
+
+        return [row[0] for row in cursor]
+
+    def iter_month(self, month: str) -> Iterator[WdcTask]:
+        cursor = self._connection.execute(
+            f'SELECT {COLUMNS} FROM tasks WHERE date BETWEEN ? AND ? ORDER BY seq', _month_range(month))
+
+        return map(_to_task, cursor)
+
+    def month_signature(self, month: str) -> Optional[Tuple[int, ...]]:
+        # Changes are stored as new rows and compaction removes rows, either changes the count or the last seq
+        count, last = self._connection.execute(
+            'SELECT count(*), coalesce(max(seq), 0) FROM tasks WHERE date BETWEEN ? AND ?',
+            _month_range(month)).fetchone()
+
+        return count, last
+
+    def compact_month(self, month: str, keep: int) -> Tuple[int, int]:
+        if keep < 1:
+            raise ValueError(f'At least one version has to be kept, {keep} given')
+
+        month_range = _month_range(month)
+        count_query = 'SELECT count(*) FROM tasks WHERE date BETWEEN ? AND ?'
+
+        with self._connection:
+            before = self._connection.execute(count_query, month_range).fetchone()[0]
+            # The earliest version wins on equal timestamps, like in list_tasks
+            self._connection.execute(
+                '''DELETE FROM tasks WHERE seq IN (
+                    SELECT seq FROM (
+                        SELECT seq, row_number() OVER (PARTITION BY id, date ORDER BY timestamp DESC, seq ASC) AS n
+                        FROM tasks WHERE date BETWEEN ? AND ?
+                    ) WHERE n > ?
+                )''', month_range + (keep,))
+            after = self._connection.execute(count_query, month_range).fetchone()[0]
+
+        return before, after
+
+    def close(self) -> None:
+        self._connection.close()
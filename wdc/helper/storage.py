@@ -0,0 +1,319 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import wdc.helper.io as task_io
+from wdc.classes import DayTotal, WdcTask, to_array
+from wdc.exceptions import StorageError
+from wdc.helper.config import get_setting
+from wdc.helper.task_file import Columns, file_signature, to_columns
+
+CSV_BACKEND = 'csv'
+SQLITE_BACKEND = 'sqlite'
+BACKENDS = [CSV_BACKEND, SQLITE_BACKEND]
+
+DEFAULT_SQLITE_FILE = 'tasks.sqlite3'
+
+
+class TaskStorage(ABC):
+    """
+    The interface through which the controllers access the stored tasks
+
+    Tasks are never updated in place, every change of a task is stored as a new version of it with a
+    newer timestamp. Tasks are grouped into months (YYYYMM) by their date.
+    """
+
+    @abstractmethod
+    def write_task(self, task: WdcTask) -> None:
+        pass
+
+    def write_tasks(self, tasks: Iterable[WdcTask]) -> int:
+        """
+        Stores many tasks at once
+
+        :param tasks: The tasks to store, can be a generator
+        :return: The number of stored tasks
+        """
+        count = 0
+        for task in tasks:
+            self.write_task(task)
+            count += 1
+
+        return count
+
+    @abstractmethod
+    def last_task(self, date: str) -> WdcTask:
+        """
+        Returns the last stored task of the month of the given date
+
+        Raises a FileNotFoundError if nothing is stored for the month.
+        """
+        pass
+
+    @abstractmethod
+    def read_all_tasks(self, date: str) -> List[WdcTask]:
+        """
+        Returns all stored tasks of the month of the given date in the order they were stored
+        """
+        pass
+
+    @abstractmethod
+    def read_day_tasks(self, date: str) -> List[WdcTask]:
+        """
+        Returns all stored tasks of the given date in the order they were stored
+        """
+        pass
+
+    @abstractmethod
+    def find_tasks(self, task_id: str) -> List[WdcTask]:
+        """
+        Returns all versions of a task sorted by their timestamp
+        """
+        pass
+
+    @abstractmethod
+    def months(self) -> List[str]:
+        """
+        Returns the sorted list of months (YYYYMM) for which tasks are stored
+        """
+        pass
+
+    @abstractmethod
+    def iter_month(self, month: str) -> Iterator[WdcTask]:
+        """
+        Lazily returns all tasks of a month in the order they were stored
+        """
+        pass
+
+    def read_month_columns(self, month: str) -> Columns:
+        """
+        Returns all tasks of a month column wise, one sequence per field in the order of the fields of a task row
+        """
+        return to_columns(list(map(to_array, self.iter_month(month))))
+
+    def read_day_totals(self, month: str) -> List[DayTotal]:
+        """
+        Returns the totals of the latest task versions of a month per day and tags, sorted by date and tags
+        """
+        from wdc.helper.rollup import compute_day_totals
+
+        return compute_day_totals(self.read_month_columns(month))
+
+    def month_signature(self, month: str) -> Optional[Tuple[int, ...]]:
+        """
+        Returns a value that changes whenever the stored tasks of a month change
+
+        Used to detect if results derived from a month are outdated, None if the storage can not tell.
+        """
+        return None
+
+    @abstractmethod
+    def compact_month(self, month: str, keep: int) -> Tuple[int, int]:
+        """
+        Removes all but the latest versions of each task and date in the given month
+
+        :return: The number of stored tasks before and after the compaction
+        """
+        pass
+
+
+class CsvTaskStorage(TaskStorage):
+    """
+    Stores the tasks in monthly csv files inside of the wdc home directory
+    """
+
+    def write_task(self, task: WdcTask) -> None:
+        task_io.write_task(task)
+
+    def write_tasks(self, tasks: Iterable[WdcTask]) -> int:
+        return task_io.write_tasks(tasks)
+
+    def last_task(self, date: str) -> WdcTask:
+        return task_io.last_task(date)
+
+    def read_all_tasks(self, date: str) -> List[WdcTask]:
+        return task_io.read_all_tasks(date)
+
+    def read_day_tasks(self, date: str) -> List[WdcTask]:
+        return task_io.read_day_tasks(date)
+
+    def find_tasks(self, task_id: str) -> List[WdcTask]:
+        return task_io.find_tasks(task_id)
+
+    def months(self) -> List[str]:
+        return task_io.task_months()
+
+    def iter_month(self, month: str) -> Iterator[WdcTask]:
+        return task_io.iter_month_tasks(month)
+
+    def read_month_columns(self, month: str) -> Columns:
+        return task_io.read_month_columns(month)
+
+    def read_day_totals(self, month: str) -> List[DayTotal]:
+        return task_io.read_day_totals(month)
+
+    def month_signature(self, month: str) -> Optional[Tuple[int, ...]]:
+        return file_signature(task_io.HOME_DIR_PATH / f'{month}.csv') or (0, 0)
+
+    def compact_month(self, month: str, keep: int) -> Tuple[int, int]:
+        return task_io.compact_task_file(f'{month}.csv', keep)
+
+
+_opened: Dict[tuple, TaskStorage] = {}
+
+
+def _location(backend: str) -> Path:
+    home_dir = task_io.HOME_DIR_PATH
+
+    if backend == CSV_BACKEND:
+        return home_dir
+    if backend == SQLITE_BACKEND:
+        return home_dir / get_setting(home_dir, 'storage', 'sqlite_file', DEFAULT_SQLITE_FILE)
+
+    raise StorageError(f'Unknown storage backend {backend}, has to be one of {", ".join(BACKENDS)}')
+
+
+def open_storage(backend: str) -> TaskStorage:
+    """
+    Creates the storage for the given backend name
+
+    :param backend: One of the names in BACKENDS
+    :return: The storage instance, the same instance is returned for the same backend and location
+    """
+    key = (backend, _location(backend))
+
+    if key not in _opened:
+        if backend == SQLITE_BACKEND:
+            from wdc.helper.sqlite_storage import SqliteTaskStorage
+
+            _opened[key] = SqliteTaskStorage(key[1])
+        else:
+            _opened[key] = CsvTaskStorage()
+
+    return _opened[key]
+
+
+# The tasks written while writes are buffered, None if tasks are written right away
+_buffered: Optional[List[WdcTask]] = None
+
+
+def _selected_backend() -> str:
+    return get_setting(task_io.HOME_DIR_PATH, 'storage', 'backend', CSV_BACKEND)
+
+
+def _selected_storage() -> TaskStorage:
+    return open_storage(_selected_backend())
+
+
+def storage_id() -> str:
+    """
+    Identifies the selected storage by its backend and the place it stores the tasks in
+
+    The month signatures of different storages can not be compared, anything derived from them has to be
+    kept apart by this id.
+    """
+    backend = _selected_backend()
+
+    return f'{backend}:{_location(backend)}'
+
+
+def get_storage() -> TaskStorage:
+    """
+    Returns the storage selected in the settings file, the csv storage is used by default
+
+    Buffered tasks are written first, so whatever the storage is used for sees them.
+    """
+    flush_writes()
+
+    return _selected_storage()
+
+
+def flush_writes() -> int:
+    """
+    Writes the buffered tasks
+
+    :return: The number of written tasks
+    """
+    global _buffered
+
+    if not _buffered:
+        return 0
+
+    tasks, _buffered = _buffered, []
+
+    return _selected_storage().write_tasks(tasks)
+
+
+@contextmanager
+def buffered_writes() -> Iterator[None]:
+    """
+    Collects the tasks written with write_task and write_tasks and writes them together
+
+    The collected tasks are written as soon as the storage is used for anything else and when the block
+    ends. Tasks written one after the other, like the starts of a back filled week, are then appended with
+    one update of the task file and its indexes instead of one per task.
+    """
+    global _buffered
+
+    if _buffered is not None:
+        yield
+        return
+
+    _buffered = []
+    try:
+        yield
+    finally:
+        try:
+            flush_writes()
+        finally:
+            _buffered = None
+
+
+def write_task(task: WdcTask) -> None:
+    if _buffered is not None:
+        _buffered.append(task)
+        return
+
+    get_storage().write_task(task)
+
+
+def write_tasks(tasks: Iterable[WdcTask]) -> int:
+    if _buffered is not None:
+        count = len(_buffered)
+        _buffered.extend(tasks)
+        return len(_buffered) - count
+
+    return get_storage().write_tasks(tasks)
+
+
+def last_task(date: str) -> WdcTask:
+    return get_storage().last_task(date)
+
+
+def read_all_tasks(date: str) -> List[WdcTask]:
+    return get_storage().read_all_tasks(date)
+
+
+def read_day_tasks(date: str) -> List[WdcTask]:
+    return get_storage().read_day_tasks(date)
+
+
+def find_tasks(task_id: str) -> List[WdcTask]:
+    return get_storage().find_tasks(task_id)
+
+
+def months() -> List[str]:
+    return get_storage().months()
+
+
+def iter_month(month: str) -> Iterator[WdcTask]:
+    return get_storage().iter_month(month)
+
+
+def read_day_totals(month: str) -> List[DayTotal]:
+    return get_storage().read_day_totals(month)
+
+
+def month_signature(month: str) -> Optional[Tuple[int, ...]]:
+    return get_storage().month_signature(month)
@@ -0,0 +1,284 @@
+import csv
+import gc
+import io
+import os
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from wdc.helper.timing import DECODE, READ, phase, record_read
+from wdc.time import is_date_valid
+
+ENCODING = 'utf-8'
+TAIL_BLOCK_SIZE = 4096
+TAIL_MAX_SIZE = 1024 * 1024
+ROW_LENGTH = 7
+
+# The fields of all rows of a file, one sequence per field in the order of the fields in a row
+Columns = Tuple[Sequence[str], ...]
+
+# The same dialect is used for reading and writing so that quoted fields (descriptions containing
+# the delimiter or line breaks) survive a round trip
+csv.register_dialect('wdc', delimiter=';', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+
+
+@contextmanager
+def gc_paused():
+    """
+    Disables the cyclic garbage collector for the duration of the block
+
+    Used when a lot of objects are created at once, the collector would only slow it down.
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Returns the (size, modification time in ns) pair of the given file
+
+    :param path: The path to the file
+    :return: The signature of the file or None if the file does not exist
+    """
+    try:
+        stat = os.stat(str(path))
+    except FileNotFoundError:
+        return None
+
+    return stat.st_size, stat.st_mtime_ns
+
+
+def read_file(path: Path) -> Tuple[bytes, Tuple[int, int]]:
+    """
+    Reads the whole content of a task file
+
+    The returned signature describes exactly the returned content even if the file is appended to while
+    it is read, the size is the length of the content and the modification time is taken afterwards.
+
+    :param path: The path to the task file
+    :return: The content and the (size, modification time in ns) signature of it
+    """
+    with phase(READ), open(str(path), 'rb') as file:
+        data = file.read()
+        mtime = os.fstat(file.fileno()).st_mtime_ns
+
+    record_read(data)
+
+    return data, (len(data), mtime)
+
+
+def parse_rows(data: bytes) -> List[List[str]]:
+    with phase(DECODE):
+        return [row for row in csv.reader(io.StringIO(data.decode(ENCODING), newline=''), dialect='wdc') if row]
+
+
+def content_checksum(data: bytes, checksum: int = 0) -> int:
+    """
+    Calculates the checksum of the given content
+
+    The checksum of a file can be continued with the content appended to it, content_checksum(appended,
+    content_checksum(content)) is the checksum of the whole file.
+
+    :param data: The content
+    :param checksum: The checksum of the content preceding data
+    :return: The checksum
+    """
+    return zlib.crc32(data, checksum)
+
+
+def encode_row(row: List[str]) -> bytes:
+    line = ';'.join(row)
+
+    # Rows without anything to quote are written as the csv writer would write them, without its per row setup
+    if len(row) > 1 and line.count(';') == len(row) - 1 and '|' not in line and '\n' not in line and '\r' not in line:
+        return f'{line}\r\n'.encode(ENCODING)
+
+    buffer = io.StringIO()
+    csv.writer(buffer, dialect='wdc').writerow(row)
+
+    return buffer.getvalue().encode(ENCODING)
+
+
+def is_task_row(row: List[str]) -> bool:
+    """
+    Tells if a row of a task file is a complete task, broken or manually edited rows are not
+    """
+    return len(row) == ROW_LENGTH and row[0] != '' and is_date_valid(row[1]) and row[6].isdigit()
+
+
+def iter_rows(path: Path, start: int = 0, end: int = None) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Iterates over the rows of a task file together with the byte offset at which each row starts
+
+    :param path: The path to the task file
+    :param start: The byte offset at which the reading starts, has to be the start of a row
+    :param end: The optional byte offset at which the reading stops, has to be the end of a row
+    :return: An iterator of (offset, row) pairs
+    """
+    with open(str(path), 'rb') as file:
+        file.seek(start)
+        position = [start]
+
+        def lines():
+            for line in file:
+                if end is not None and position[0] >= end:
+                    return
+                position[0] += len(line)
+                yield line.decode(ENCODING)
+
+        offset = start
+        try:
+            for row in csv.reader(lines(), dialect='wdc'):
+                if row:
+                    yield offset, row
+                offset = position[0]
+        finally:
+            # Counted once at the end, the lines are read and decoded while the consumer runs
+            record_read(position[0] - start)
+
+
+def stream_rows(path: Path) -> Iterator[List[str]]:
+    """
+    Lazily reads the rows of a task file without keeping track of the offsets
+
+    :param path: The path to the task file
+    :return: An iterator of all non empty rows of the file
+    """
+    with open(str(path), 'r', encoding=ENCODING, newline='') as file:
+        try:
+            for row in csv.reader(file, dialect='wdc'):
+                if row:
+                    yield row
+        finally:
+            record_read(file.buffer.tell())
+
+
+def read_rows(path: Path) -> List[List[str]]:
+    """
+    Reads all rows of a task file without keeping track of the offsets
+
+    :param path: The path to the task file
+    :return: All non empty rows of the file
+    """
+    with phase(READ):
+        return list(stream_rows(path))
+
+
+def to_columns(rows: List[List[str]]) -> Columns:
+    """
+    Transposes complete task rows into columns, rows with a different number of fields are dropped
+    """
+    rows = [row for row in rows if len(row) == ROW_LENGTH]
+
+    return tuple(zip(*rows)) if rows else ((),) * ROW_LENGTH
+
+
+def read_columns(path: Path) -> Columns:
+    """
+    Reads all complete task rows of a file column wise
+
+    :param path: The path to the task file
+    :return: One tuple per field, see to_columns
+    """
+    with gc_paused():
+        data, _ = read_file(path)
+        return to_columns(parse_rows(data))
+
+
+def read_row_at(path: Path, offset: int) -> Optional[List[str]]:
+    """
+    Reads the single row starting at the given byte offset
+
+    :param path: The path to the task file
+    :param offset: The byte offset of the row start
+    :return: The row or None if there is no row at the given offset
+    """
+    with phase(READ):
+        for _, row in iter_rows(path, offset):
+            return row
+
+    return None
+
+
+def read_ranges(path: Path, ranges: List[Tuple[int, int]]) -> List[List[str]]:
+    """
+    Reads all rows inside of the given byte ranges of a task file
+
+    :param path: The path to the task file
+    :param ranges: A list of (start, end) byte offset pairs, each has to start and end on a row boundary
+    :return: All non empty rows inside of the ranges
+    """
+    rows = []
+    with phase(READ), open(str(path), 'rb') as file:
+        for start, end in ranges:
+            file.seek(start)
+            data = file.read(end - start)
+            record_read(data)
+            rows.extend(parse_rows(data))
+
+    return rows
+
+
+def _parse_single_row(data: bytes) -> Optional[List[str]]:
+    try:
+        rows = parse_rows(data)
+    except (csv.Error, UnicodeDecodeError):
+        return None
+
+    return rows[0] if len(rows) == 1 else None
+
+
+def read_last_row(path: Path, is_valid: Callable[[List[str]], bool]) -> Optional[List[str]]:
+    """
+    Reads the last row of a task file by reading the file backwards from its end
+
+    Starting at the end of the file every line start is tried as the start of the last row. The first
+    candidate that decodes into exactly one valid row is returned. This way rows containing line breaks
+    inside of quoted fields are found as well.
+
+    :param path: The path to the task file
+    :param is_valid: Callback determining if a decoded row is a complete task row
+    :return: The last row or None if no valid row could be found near the end of the file
+    """
+    with phase(READ), open(str(path), 'rb') as file:
+        return _find_last_row(file, is_valid)
+
+
+def _find_last_row(file: BinaryIO, is_valid: Callable[[List[str]], bool]) -> Optional[List[str]]:
+    block_start = file.seek(0, os.SEEK_END)
+    buffer = b''
+    # Position in the buffer up to which the line starts have already been tried
+    checked = None
+
+    while block_start > 0 and len(buffer) < TAIL_MAX_SIZE:
+        read_size = min(TAIL_BLOCK_SIZE, block_start)
+        block_start -= read_size
+        file.seek(block_start)
+        buffer = file.read(read_size) + buffer
+        record_read(read_size)
+
+        if checked is None:
+            checked = len(buffer.rstrip(b'\r\n'))
+        else:
+            checked += read_size
+
+        candidate = buffer.rfind(b'\n', 0, checked)
+        while candidate != -1:
+            row = _parse_single_row(buffer[candidate + 1:])
+            if row is not None and is_valid(row):
+                return row
+            checked = candidate
+            candidate = buffer.rfind(b'\n', 0, checked)
+
+        if block_start == 0:
+            row = _parse_single_row(buffer)
+            if row is not None and is_valid(row):
+                return row
+
+    return None
@@ -0,0 +1,246 @@
+import sys
+import time
+from functools import wraps
+from os import fsencode
+from typing import Callable, Dict, List, Optional, Union
+
+import wdc
+
+IMPORT = 'import'
+PARSE = 'parse'
+READ = 'read'
+DECODE = 'decode'
+SORT = 'dedup/sort'
+INDEX = 'index'
+RENDER = 'render'
+WRITE = 'write'
+OTHER = 'other'
+# In the order the phases usually happen in a command, other is the time not spent in any of them
+PHASES = (IMPORT, PARSE, READ, DECODE, SORT, INDEX, RENDER, WRITE, OTHER)
+
+# Opened files with these endings are modules loaded by the import system, they are not counted
+_MODULE_SUFFIXES = (b'.py', b'.pyc', b'.so', b'.pyd', b'.pth')
+
+Data = Union[bytes, str, int]
+
+
+class Timings(object):
+    """
+    Where the time of one command was spent and how much it read and wrote
+
+    The time of a phase does not include the time of the phases nested in it, so the times of all phases
+    add up to the total.
+
+    Attributes:
+        command -- The name of the measured command
+        seconds -- The time spent in every phase
+        bytes_read -- The number of bytes read from the task files and the files derived from them
+        bytes_written -- The number of bytes written to them and to exports
+        files_opened -- The number of files opened, without the modules loaded on the way
+    """
+    __slots__ = ('command', 'seconds', 'bytes_read', 'bytes_written', 'files_opened', '_started', '_stack')
+
+    def __init__(self, command: str = '', import_seconds: float = 0.0):
+        self.command = command
+        self.seconds: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.seconds[IMPORT] = import_seconds
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.files_opened = 0
+        self._started = time.perf_counter()
+        self._stack: List[_Phase] = []
+
+    @property
+    def total(self) -> float:
+        return sum(self.seconds.values())
+
+    def finish(self) -> None:
+        """
+        Attributes the time since the start that was not spent in any phase to other
+        """
+        elapsed = time.perf_counter() - self._started
+        measured = sum(seconds for phase, seconds in self.seconds.items() if phase not in (IMPORT, OTHER))
+        self.seconds[OTHER] = max(elapsed - measured, 0.0)
+
+    def as_dict(self) -> dict:
+        return {
+            'command': self.command,
+            'seconds': dict(self.seconds),
+            'total_seconds': self.total,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'files_opened': self.files_opened
+        }
+
+    def as_text(self) -> str:
+        total = self.total
+        lines = [f'{self.command or "wdc"} took {total * 1000:.1f} ms']
+
+        for phase, seconds in self.seconds.items():
+            share = seconds / total * 100 if total > 0 else 0.0
+            lines.append(f'  {phase:<11}{seconds * 1000:>10.2f} ms{share:>7.1f} %')
+
+        lines.append(f'  read {self.bytes_read} bytes, wrote {self.bytes_written} bytes, '
+                     f'opened {self.files_opened} files')
+
+        return '\n'.join(lines)
+
+
+class _Phase(object):
+    __slots__ = ('_timings', '_name', '_started', '_nested')
+
+    def __init__(self, timings: Timings, name: str):
+        self._timings = timings
+        self._name = name
+        self._nested = 0.0
+
+    def __enter__(self):
+        self._timings._stack.append(self)
+        self._started = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self._started
+        stack = self._timings._stack
+        stack.pop()
+        self._timings.seconds[self._name] += elapsed - self._nested
+
+        if stack:
+            stack[-1]._nested += elapsed
+
+        return False
+
+
+class _NoPhase(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+_active: Optional[Timings] = None
+# The time it took to import the command line, until the first command takes it
+_import_seconds: Optional[float] = None
+_audit_hook_added = False
+
+
+def phase(name: str):
+    """
+    Returns a context manager measuring the time spent in the block as the given phase
+
+    Costs a single check if nothing is measured. Generators must not be wrapped, the phase would also
+    measure the consumer of their values.
+
+    :param name: One of PHASES
+    :return: The context manager
+    """
+    if _active is None:
+        return _NO_PHASE
+
+    return _Phase(_active, name)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator measuring every call of a function as the given phase, see phase
+    """
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        def measured(*args, **kwargs):
+            with phase(name):
+                return function(*args, **kwargs)
+
+        return measured
+
+    return decorator
+
+
+def _size(data: Data) -> int:
+    if isinstance(data, int):
+        return data
+
+    return len(data.encode('utf-8')) if isinstance(data, str) else len(data)
+
+
+def record_read(data: Data) -> None:
+    """
+    Counts read bytes, given as the read content or its length
+    """
+    if _active is not None:
+        _active.bytes_read += _size(data)
+
+
+def record_write(data: Data) -> None:
+    """
+    Counts written bytes, given as the written content or its length, text is counted encoded as UTF-8
+    """
+    if _active is not None:
+        _active.bytes_written += _size(data)
+
+
+def _count_opens(event: str, args: tuple) -> None:
+    if event != 'open' or _active is None or not isinstance(args[0], (str, bytes)):
+        return
+
+    if not fsencode(args[0]).endswith(_MODULE_SUFFIXES):
+        _active.files_opened += 1
+
+
+def mark_imported() -> None:
+    """
+    Notes that the command line has been imported, the import started with the wdc package
+    """
+    global _import_seconds
+
+    _import_seconds = time.perf_counter() - wdc.IMPORT_STARTED
+
+
+def take_import_seconds() -> float:
+    """
+    Returns the time it took to import the command line to the first command run in a process
+
+    The commands run later on by wdc shell or wdc serve did not have to wait for the import and get 0.
+    """
+    global _import_seconds
+
+    seconds, _import_seconds = _import_seconds or 0.0, 0.0
+
+    return seconds
+
+
+def start_timing(command: str = '', import_seconds: float = 0.0) -> Timings:
+    """
+    Starts measuring a command, the measured values are collected until stop_timing is called
+
+    :param command: The name of the command
+    :param import_seconds: The time the command waited for the import, see take_import_seconds
+    :return: The timings of the command, updated while it runs
+    """
+    global _active, _audit_hook_added
+
+    if not _audit_hook_added:
+        # Audit hooks can not be removed again, it does nothing while no command is measured
+        sys.addaudithook(_count_opens)
+        _audit_hook_added = True
+
+    _active = Timings(command, import_seconds)
+
+    return _active
+
+
+def stop_timing() -> Optional[Timings]:
+    """
+    Stops measuring the current command
+
+    :return: The finished timings or None if nothing was measured
+    """
+    global _active
+
+    timings, _active = _active, None
+    if timings is not None:
+        timings.finish()
+
+    return timings
@@ -1,17 +1,20 @@
 import os
-from typing import List
+import sys
+from itertools import islice
+from typing import Iterable, List, Optional
 
 import click
 
-import termtables as tt
-from colored import fg, bg, attr
-
+# Only the modules needed by start and end are imported here, the other commands import their controllers and
+# the output libraries when they are called. Shell hooks run start on every context switch, so it has to start fast.
 from wdc.classes import WdcTask
-from wdc.controller.export_import import export_tasks, ExportType
+from wdc.helper import timing
+from wdc.helper.storage import BACKENDS
 from wdc.exceptions import WdcError
-from wdc.time import is_time_valid, is_date_valid, today, WdcTime
-from wdc.calculator import calc_workday_end
-from wdc.controller.work_day import start_work_task, list_tasks, end_last_task, WdcTaskInfo, get_task_info, amend_task
+from wdc.settings import API_PORT, GROUPINGS, GROUP_BY_TAG
+from wdc.time import is_time_valid, is_date_valid, is_month_valid, today, WdcTime
+from wdc.controller.work_day import start_work_task, list_tasks, list_tasks_in_range, end_last_task, WdcTaskInfo, \
+    get_task_info, amend_task
 
 
 def validate_break_duration_callback(ctx, param, value):
@@ -39,6 +42,56 @@ def validate_date_callback(ctx, param, value):
         return today()
 
 
+def validate_range_date_callback(ctx, param, value):
+    if value == '' or is_date_valid(value):
+        return value
+    else:
+        raise click.BadParameter(f'{value} is not a valid date')
+
+
+def resolve_range(date_from: str, date_to: str) -> str:
+    """
+    Completes the end of a date range given on the command line
+
+    :param date_from: The value of the --from option
+    :param date_to: The value of the --to option
+    :return: The end of the range, today if only the start is given and an empty string if no range is given
+    """
+    if date_from == '':
+        if date_to != '':
+            raise click.UsageError('--to can only be used together with --from')
+        return ''
+
+    date_to = date_to if date_to != '' else today()
+    if date_from > date_to:
+        raise click.UsageError(f'The range start {date_from} is after its end {date_to}')
+
+    return date_to
+
+
+def validate_month_callback(ctx, param, value):
+    if not param.required and value == '':
+        return value
+    if is_month_valid(value):
+        return value
+    else:
+        raise click.BadParameter(f'{value} is not a valid month')
+
+
+def validate_keep_callback(ctx, param, value):
+    if value < 1:
+        raise click.BadParameter(f'At least one version has to be kept, {value} given')
+    else:
+        return value
+
+
+def validate_jobs_callback(ctx, param, value):
+    if value < 1:
+        raise click.BadParameter(f'At least one job is needed, {value} given')
+    else:
+        return value
+
+
 def validate_taskid_callback(ctx, param, value):
     if not param.required and value == '':
         return value
@@ -49,20 +102,39 @@ def validate_taskid_callback(ctx, param, value):
 
 
 def task_to_printout(task: WdcTask) -> List[str]:
-    start = WdcTime(task.start)
-    if task.end != '':
-        end = WdcTime(task.end)
+    return _task_row(task, WdcTime(task.start), WdcTime(task.end) if task.end != '' else None)
+
+
+def tasks_to_printout(tasks: Iterable[WdcTask]) -> List[List[str]]:
+    """
+    Formats many tasks like task_to_printout, the start and end times of all of them are parsed at once
 
+    :param tasks: The tasks to format
+    :return: One row per task
+    """
+    tasks = list(tasks)
+    starts = WdcTime.from_strings(task.start for task in tasks)
+    ends = iter(WdcTime.from_strings(task.end for task in tasks if task.end != ''))
+
+    return [_task_row(task, start, next(ends) if task.end != '' else None) for task, start in zip(tasks, starts)]
+
+
+def _task_row(task: WdcTask, start: WdcTime, end: Optional[WdcTime]) -> List[str]:
     return [
         task.id,
         task.date,
         f'{start.hours}:{start.minutes}',
-        f'{end.hours}:{end.minutes}' if task.end != '' else task.end,
+        f'{end.hours}:{end.minutes}' if end is not None else task.end,
         task.tags,
         (task.description[:10] + '..') if task.description != '' else task.description
     ]
 
 
+def minutes_to_printout(minutes: int, signed: bool = False) -> str:
+    sign = '-' if minutes < 0 else '+' if signed else ''
+    return f'{sign}{abs(minutes) // 60}:{abs(minutes) % 60:02d}'
+
+
 def task_to_history_print(task: WdcTask) -> List[str]:
     temp_list = task_to_printout(task)
     temp_list.pop(0)
@@ -73,18 +145,28 @@ def task_to_history_print(task: WdcTask) -> List[str]:
     return temp_list
 
 
+TIMING_FORMATS = ['text', 'json']
+
+
+@timing.timed(timing.RENDER)
+def print_highlighted(text: str, background: int, bold: bool = False) -> None:
+    from colored import fg, bg, attr
+
+    print(f'{os.linesep}{fg(0)}{bg(background)}{attr(1) if bold else ""}{text} {attr(0)}{os.linesep}')
+
+
 def print_warning(text):
     if not text:
         return
 
-    print(f'{os.linesep}{fg(0)}{bg(214)}\u26a0 {text} {attr(0)}{os.linesep}')
+    print_highlighted(f'\u26a0 {text}', 214)
 
 
 def print_error(text):
     if not text:
         return
 
-    print(f'{os.linesep}{fg(0)}{bg(202)}!! {text} {attr(0)}{os.linesep}')
+    print_highlighted(f'!! {text}', 202)
 
 
 def print_info(text: str) -> None:
@@ -97,12 +179,27 @@ def print_info(text: str) -> None:
     if not text:
         return
 
-    print(f'{os.linesep}{fg(0)}{bg(164)}info: {text} {attr(0)}{os.linesep}')
+    print_highlighted(f'info: {text}', 164)
+
+
+@timing.timed(timing.RENDER)
+def print_table(rows: List[List], header: List[str], style: str = 'thin_thick') -> None:
+    """
+    Prints the rows as a table
+
+    :param rows: The rows of the table
+    :param header: The titles of the columns
+    :param style: The name of the termtables style
+    :return: Nothing
+    """
+    import termtables as tt
 
+    tt.print(rows, header=header, style=getattr(tt.styles, style))
 
+
+@timing.timed(timing.RENDER)
 def print_task_info(task_info: WdcTaskInfo):
-    def print_section_header(text): return print(
-        f'{os.linesep}{fg(0)}{bg(111)}{attr(1)}:: {text} {attr(0)}{os.linesep}')
+    def print_section_header(text): return print_highlighted(f':: {text}', 111, bold=True)
 
     def print_task_attribute(attribute, value): return print(f'{attribute} :\t{value}')
 
@@ -120,11 +217,10 @@ def print_task_info(task_info: WdcTaskInfo):
     if not task_info.history:
         print_info('No history found')
     else:
-
-        tt.print(
+        print_table(
             list(map(lambda i: task_to_history_print(i), task_info.history)),
             header=['Timestamp', 'Date', 'Start', 'End', 'Tags', 'Description'],
-            style=tt.styles.rounded_double
+            style='rounded_double'
         )
 
 
@@ -132,20 +228,131 @@ def handle_error(error: WdcError) -> None:
     print_error(error)
 
 
-@click.group()
+class TimedCommand(click.Command):
+    """
+    A command measuring the parsing of its arguments as the parse phase of --timing
+    """
+
+    def parse_args(self, ctx, args):
+        with timing.phase(timing.PARSE):
+            return super().parse_args(ctx, args)
+
+
+class TimedGroup(click.Group):
+    """
+    A group whose commands are TimedCommand unless another class is given
+    """
+
+    def command(self, *args, **kwargs):
+        kwargs.setdefault('cls', TimedCommand)
+        return super().command(*args, **kwargs)
+
+
+def start_profile(ctx, profile_file: str, profile_top: int) -> None:
+    """
+    Profiles the command until its context is closed
+
+    :param ctx: The cli app context
+    :param profile_file: The optional file the statistics are written to
+    :param profile_top: The number of functions with the highest cumulative time printed to stderr, none if 0
+    :return: Nothing
+    """
+    # Imported here as only profiled commands need them
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+
+    def stop_profile():
+        profiler.disable()
+
+        if profile_file:
+            profiler.dump_stats(profile_file)
+        if profile_top:
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(profile_top)
+            click.echo(summary.getvalue(), err=True)
+
+    ctx.call_on_close(stop_profile)
+    profiler.enable()
+
+
+def print_timings(timing_format: str) -> None:
+    """
+    Stops measuring the command and prints where its time was spent to stderr
+
+    :param timing_format: One of TIMING_FORMATS
+    :return: Nothing
+    """
+    timings = timing.stop_timing()
+
+    if timings is None:
+        return
+
+    if timing_format == 'json':
+        import json
+
+        click.echo(json.dumps(timings.as_dict()), err=True)
+    else:
+        click.echo(timings.as_text(), err=True)
+
+
+@click.group(cls=TimedGroup)
 @click.option('--debug/--no-debug', default=False)
+@click.option(
+    '--profile',
+    'profile_file',
+    default='',
+    type=click.Path(dir_okay=False),
+    help='Profile the command and write the statistics to this file, to be read with pstats')
+@click.option(
+    '--profile-top',
+    default=0,
+    type=click.IntRange(0, None),
+    help='Profile the command and print the given number of functions with the highest cumulative time to stderr')
+@click.option(
+    '--timing',
+    'timing_format',
+    default=None,
+    type=click.Choice(TIMING_FORMATS),
+    help='Print the time spent importing, parsing, reading, decoding, sorting, rendering and writing, and the '
+         'bytes read and written and files opened by the command to stderr')
 @click.version_option(version='0.1')
 @click.pass_context
-def cli(ctx, debug):
+def cli(ctx, debug, profile_file, profile_top, timing_format):
+    """
+    The wdc command line
+
+    :param ctx: The cli app context
+    :param debug: Flag to denote debugging, stored in the context object
+    :param profile_file: The optional file to which the profile of the command is written
+    :param profile_top: The number of the most expensive functions printed after the command, none if 0
+    :param timing_format: The optional format in which the timing of the command is printed
+    :return: Nothing
+    """
     ctx.ensure_object(dict)
 
     ctx.obj['DEBUG'] = debug
 
+    # Taken by every command so that only the first one run in a process is charged with the import
+    import_seconds = timing.take_import_seconds()
+
+    if timing_format is not None:
+        timing.start_timing(ctx.invoked_subcommand or '', import_seconds)
+        ctx.call_on_close(lambda: print_timings(timing_format))
+
+    if profile_file or profile_top:
+        start_profile(ctx, profile_file, profile_top)
+
 
 @cli.command()
 @click.pass_context
 @click.argument(
     'workday_start',
+    default='',
+    required=False,
+    metavar='WORKDAY_START',
     type=str,
     callback=validate_time_callback)
 @click.option(
@@ -165,7 +372,32 @@ def cli(ctx, debug):
     callback=validate_time_callback,
     required=True,
     help='The optional duration of the standard workday given in hhmm format')
-def calc(ctx, workday_start, break_duration, workday_duration):
+@click.option(
+    '--batch',
+    default=None,
+    type=click.File('r'),
+    help='Read one start time, optionally followed by a break and a workday duration, per line from a file, '
+         '- for stdin')
+def calc(ctx, workday_start, break_duration, workday_duration, batch):
+    from wdc.calculator import calc_workday_end, calc_batch, BATCH_SIZE
+
+    if batch is not None:
+        if workday_start != '':
+            raise click.UsageError('WORKDAY_START can not be combined with --batch')
+
+        results = calc_batch(batch, break_duration, workday_duration)
+        try:
+            # Echo flushes the output, so the results are written in chunks
+            for chunk in iter(lambda: list(islice(results, BATCH_SIZE)), []):
+                click.echo('\n'.join(chunk))
+        except ValueError as error:
+            print_error(str(error))
+            ctx.exit(1)
+        return
+
+    if workday_start == '':
+        raise click.UsageError('Missing argument WORKDAY_START')
+
     wd_end = calc_workday_end(workday_start, break_duration, workday_duration)
 
     print(wd_end)
@@ -231,21 +463,38 @@ def start(ctx, task_start, end, tag, message, date):
     default=False,
     help='Show duplicates of time entries'
 )
-def list_all(ctx, date, all):
-    tasks = list_tasks(date, all)
+@click.option(
+    '--from',
+    'date_from',
+    default='',
+    callback=validate_range_date_callback,
+    type=str,
+    help='The first date of a range of dates for which the tasks should be shown')
+@click.option(
+    '--to',
+    'date_to',
+    default='',
+    callback=validate_range_date_callback,
+    type=str,
+    help='The last date of the range, today if not given')
+def list_all(ctx, date, all, date_from, date_to):
+    date_to = resolve_range(date_from, date_to)
 
-    tasks_to_print = []
-    for task in tasks:
-        tasks_to_print.append(task_to_printout(task))
+    if date_to != '':
+        tasks = list_tasks_in_range(date_from, date_to, all)
+    else:
+        tasks = list_tasks(date, all)
+
+    with timing.phase(timing.RENDER):
+        tasks_to_print = tasks_to_printout(tasks)
 
-    if not tasks:
+    if not tasks_to_print:
         print_warning('No tasks found')
         ctx.exit()
 
-    tt.print(
+    print_table(
         tasks_to_print,
-        header=['Id', 'Date', 'Start', 'End', 'Tags', 'Description'],
-        style=tt.styles.thin_thick
+        header=['Id', 'Date', 'Start', 'End', 'Tags', 'Description']
     )
 
 
@@ -359,13 +608,20 @@ def amend(ctx, task_id, start, end, tag, message, date):
     type=bool,
     is_flag=True,
     help='Determines if the export should be formatted as csv')
+@click.option(
+    '--ndjson',
+    default=False,
+    show_default=True,
+    type=bool,
+    is_flag=True,
+    help='Determines if the export should be formatted as newline delimited json, one task per line')
 @click.option(
     '--pipe',
     default=False,
     show_default=True,
     type=bool,
     is_flag=True,
-    help='Determines that the content of the exported file should be outputted to stout')
+    help='Determines that the export should be written to stdout instead of a file')
 @click.option(
     '-r',
     '--raw',
@@ -374,7 +630,36 @@ def amend(ctx, task_id, start, end, tag, message, date):
     is_flag=True,
     help='Determines of all existing tasks should be returned or only the latest version of each'
 )
-def export(ctx, date, output, csv, pipe, raw):
+@click.option(
+    '--from',
+    'date_from',
+    default='',
+    callback=validate_range_date_callback,
+    type=str,
+    help='The first date of a range of dates for which the tasks should be exported')
+@click.option(
+    '--to',
+    'date_to',
+    default='',
+    callback=validate_range_date_callback,
+    type=str,
+    help='The last date of the range, today if not given')
+@click.option(
+    '-j',
+    '--jobs',
+    default=1,
+    show_default=True,
+    callback=validate_jobs_callback,
+    type=int,
+    help='The number of processes reading and encoding the months of a range')
+@click.option(
+    '--split',
+    default=False,
+    show_default=True,
+    type=bool,
+    is_flag=True,
+    help='Write every month to its own file, named after the output file with the month appended')
+def export(ctx, date, output, csv, ndjson, pipe, raw, date_from, date_to, jobs, split):
     """
     The Export command implementation
 
@@ -382,27 +667,388 @@ def export(ctx, date, output, csv, pipe, raw):
     :param date: The optional date to be exported (default is today)
     :param output: The optional output file to which the tasks are to be exported
     :param csv: Flag to denote that the export format should be CSV
-    :param pipe: A flag denoting that the export file content should be printed onto the stout stream
+    :param ndjson: Flag to denote that the export format should be newline delimited JSON
+    :param pipe: A flag denoting that the export should be written to the stdout stream instead of a file
     :param raw: If False then export only the latest version of each task. All if True
+    :param date_from: The optional first date of a range to be exported, replaces the date
+    :param date_to: The optional last date of the range to be exported (default is today)
+    :param jobs: The number of processes encoding the months of the range
+    :param split: A flag denoting that every month should be written to its own file
     :return: Nothing
     """
+    from wdc.controller.export_import import export_tasks, ExportType
+
+    if split and pipe:
+        raise click.UsageError('--split can not be combined with --pipe')
+
+    date_to = resolve_range(date_from, date_to)
+    if date_to != '':
+        date = date_from
+
     selected_export_type = ExportType.JSON
     if csv:
         selected_export_type = ExportType.CSV
+    elif ndjson:
+        selected_export_type = ExportType.NDJSON
+
+    try:
+        export_tasks(date=date,
+                     file_path=output,
+                     export_to=selected_export_type,
+                     export_all=raw,
+                     date_to=date_to,
+                     output=sys.stdout if pipe else None,
+                     jobs=jobs,
+                     split=split)
+    except WdcError as error:
+        handle_error(error)
+
+    if pipe and selected_export_type == ExportType.JSON:
+        # The json list does not end with a line break
+        print()
+
+
+@cli.command('import')
+@click.pass_context
+@click.argument(
+    'file',
+    type=click.File('r'))
+@click.option(
+    '--csv',
+    default=False,
+    show_default=True,
+    type=bool,
+    is_flag=True,
+    help='Determines if the imported file is formatted as csv, implied by a .csv file extension')
+@click.option(
+    '-d',
+    '--date',
+    default='',
+    callback=validate_range_date_callback,
+    type=str,
+    help='The date of the tasks of a JSON file exported by an older version, which did not store the dates')
+def import_file(ctx, file, csv, date):
+    """
+    Imports the tasks of a file written by the export command, - reads from stdin
+
+    :param ctx: The cli app context
+    :param file: The file to import
+    :param csv: Flag to denote that the file is formatted as CSV
+    :param date: The date of the JSON tasks without one
+    :return: Nothing
+    """
+    from wdc.controller.export_import import import_tasks, ExportType
+
+    # Standard input has no usable name
+    if str(getattr(file, 'name', '')).lower().endswith('.csv'):
+        csv = True
+
+    try:
+        summary = import_tasks(file, ExportType.CSV if csv else ExportType.JSON, date)
+    except (WdcError, ValueError) as error:
+        handle_error(error)
+        ctx.exit(1)
+
+    print_info(f'{summary.imported} of {summary.read} tasks imported')
+
+    if summary.duplicates:
+        print_warning(f'{summary.duplicates} tasks were already stored')
+    if summary.invalid:
+        print_warning(f'{summary.invalid} invalid tasks were skipped')
+
+
+@cli.command()
+@click.pass_context
+@click.option(
+    '-m',
+    '--month',
+    default='',
+    show_default=True,
+    callback=validate_month_callback,
+    type=str,
+    help='The month (YYYYMM) to compact, all months are compacted if not given')
+@click.option(
+    '-k',
+    '--keep',
+    default=1,
+    show_default=True,
+    callback=validate_keep_callback,
+    type=int,
+    help='The number of versions of each task that are kept')
+def compact(ctx, month, keep):
+    """
+    Removes outdated versions of tasks from the task files
 
-    result = ''
+    :param ctx: The cli app context
+    :param month: The optional month to compact
+    :param keep: The number of versions of each task to keep
+    :return: Nothing
+    """
+    from wdc.controller.maintenance import compact_tasks
 
     try:
-        result = export_tasks(date=date,
-                              file_path=output,
-                              export_to=selected_export_type,
-                              export_all=raw)
+        results = compact_tasks(month, keep)
     except WdcError as error:
         handle_error(error)
+        ctx.exit(1)
+
+    if not results:
+        print_warning('No tasks found')
+        ctx.exit()
+
+    for compacted_month, before, after in results:
+        print_info(f'{compacted_month}: {before} rows compacted to {after}')
+
+
+@cli.command()
+@click.pass_context
+@click.argument(
+    'source',
+    type=click.Choice(BACKENDS))
+@click.argument(
+    'target',
+    type=click.Choice(BACKENDS))
+def migrate(ctx, source, target):
+    """
+    Copies all tasks from the SOURCE storage backend into the empty TARGET storage backend
+
+    :param ctx: The cli app context
+    :param source: The name of the backend to copy from
+    :param target: The name of the backend to copy to
+    :return: Nothing
+    """
+    from wdc.controller.maintenance import migrate_tasks
+
+    try:
+        count = migrate_tasks(source, target)
+    except WdcError as error:
+        handle_error(error)
+        ctx.exit(1)
+
+    print_info(f'{count} tasks copied from {source} to {target}')
+
+
+@cli.command()
+@click.pass_context
+@click.option(
+    '-g',
+    '--group-by',
+    default=GROUP_BY_TAG,
+    show_default=True,
+    type=click.Choice(GROUPINGS),
+    help='How the logged time is grouped')
+@click.option(
+    '--from',
+    'date_from',
+    default='',
+    callback=validate_range_date_callback,
+    type=str,
+    help='The first date of the report, the first day of the current month if not given')
+@click.option(
+    '--to',
+    'date_to',
+    default='',
+    callback=validate_range_date_callback,
+    type=str,
+    help='The last date of the report, today if not given')
+def report(ctx, group_by, date_from, date_to):
+    """
+    Sums up the logged time of finished tasks by tag, date, week or month
+
+    :param ctx: The cli app context
+    :param group_by: The name of the grouping
+    :param date_from: The optional first date of the report
+    :param date_to: The optional last date of the report
+    :return: Nothing
+    """
+    from wdc.controller.report import build_report
+
+    if date_from == '':
+        date_from = today()[0:8] + '01'
+    date_to = resolve_range(date_from, date_to)
+
+    rows = build_report(date_from, date_to, group_by)
+
+    if not rows:
+        print_warning('No tasks found')
+        ctx.exit()
+
+    print_table(
+        [[label, minutes_to_printout(minutes)] for label, minutes in rows],
+        header=[group_by.capitalize(), 'Duration']
+    )
+
+
+@cli.command()
+@click.pass_context
+@click.option(
+    '--from',
+    'date_from',
+    default='',
+    callback=validate_range_date_callback,
+    type=str,
+    help='The first date of the balance, the first day with stored tasks if not given')
+@click.option(
+    '--to',
+    'date_to',
+    default='',
+    callback=validate_range_date_callback,
+    type=str,
+    help='The last date of the balance, today if not given')
+@click.option(
+    '-b',
+    '--break_duration',
+    default=30,
+    show_default=True,
+    callback=validate_break_duration_callback,
+    type=int,
+    help='The duration of the daily break in minutes, expected on top of the workday duration')
+@click.option(
+    '-d',
+    '--workday_duration',
+    default='0745',
+    show_default=True,
+    type=str,
+    callback=validate_time_callback,
+    help='The expected duration of a workday given in hhmm format')
+def balance(ctx, date_from, date_to, break_duration, workday_duration):
+    """
+    Compares the logged time to the expected time of every workday from Monday to Friday
+
+    :param ctx: The cli app context
+    :param date_from: The optional first date of the balance
+    :param date_to: The optional last date of the balance
+    :param break_duration: The duration of the daily break in minutes
+    :param workday_duration: The expected duration of a workday
+    :return: Nothing
+    """
+    from wdc.controller.balance import calculate_balance, first_date
+
+    if date_from == '':
+        date_from = first_date()
+
+        if date_from == '':
+            print_warning('No tasks found')
+            ctx.exit()
+
+    date_to = resolve_range(date_from, date_to)
+
+    result = calculate_balance(date_from, date_to, workday_duration, break_duration)
+
+    print_table(
+        [[result.date_from,
+          result.date_to,
+          result.workdays,
+          minutes_to_printout(result.expected),
+          minutes_to_printout(result.logged),
+          minutes_to_printout(result.balance, signed=True)]],
+        header=['From', 'To', 'Workdays', 'Expected', 'Logged', 'Balance']
+    )
+
+
+@cli.command()
+@click.pass_context
+def shell(ctx):
+    """
+    Runs commands one line at a time without starting wdc again, written tasks are stored before they are read
+    and when the shell is left
+
+    :param ctx: The cli app context
+    :return: Nothing
+    """
+    import signal
+    from wdc.helper.shell import WdcShell
+    from wdc.helper.storage import buffered_writes
+
+    wdc_shell = WdcShell(cli)
+
+    # Closing the terminal or stopping the shell with kill leaves it like exit, so the collected tasks are stored
+    for signal_name in ('SIGTERM', 'SIGHUP'):
+        if hasattr(signal, signal_name):
+            signal.signal(getattr(signal, signal_name), lambda signum, frame: sys.exit(0))
+
+    with buffered_writes():
+        while True:
+            try:
+                wdc_shell.cmdloop()
+                break
+            except KeyboardInterrupt:
+                # Ctrl+C drops the current line, like in other shells
+                print()
+                wdc_shell.intro = None
+
+
+@cli.command()
+@click.pass_context
+def serve(ctx):
+    """
+    Keeps the tasks loaded and answers start, end, list, info and amend until stopped
+
+    :param ctx: The cli app context
+    :return: Nothing
+    """
+    import signal
+    import wdc.helper.io as task_io
+    import wdc.settings as settings
+    from wdc.helper.daemon import create_server, serve as serve_commands
+
+    socket_path = str(task_io.HOME_DIR_PATH / settings.SOCKET_FILE)
+
+    try:
+        server = create_server(cli, socket_path)
+    except WdcError as error:
+        handle_error(error)
+        ctx.exit(1)
+
+    # Stopping the daemon with kill removes its socket the same way as Ctrl+C does
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print_info(f'Listening on {socket_path}, stop with Ctrl+C')
+
+    try:
+        serve_commands(server)
+    except KeyboardInterrupt:
+        print_info('Daemon stopped')
+
+
+@cli.command()
+@click.pass_context
+@click.option(
+    '-p',
+    '--port',
+    default=API_PORT,
+    show_default=True,
+    type=click.IntRange(0, 65535),
+    help='The port on localhost to listen on')
+@click.option(
+    '--socket',
+    'socket_path',
+    default='',
+    type=click.Path(dir_okay=False),
+    help='Listen on this unix socket instead of the port')
+def api(ctx, port, socket_path):
+    """
+    Answers HTTP requests for the tasks on localhost until stopped
+
+    :param ctx: The cli app context
+    :param port: The port on localhost
+    :param socket_path: The optional unix socket to listen on instead of the port
+    :return: Nothing
+    """
+    from wdc.helper.http_api import HOST, run_api
+
+    address = socket_path or f'http://{HOST}:{port}'
+
+    try:
+        run_api(port, socket_path, lambda: print_info(f'Listening on {address}, stop with Ctrl+C'))
+    except OSError as error:
+        print_error(f'Could not listen on {address}: {error}')
+        ctx.exit(1)
+    except KeyboardInterrupt:
+        print_info('API stopped')
 
-    if pipe:
-        print(result)
 
+# The import of the command line is over, the first command reports its duration with --timing
+timing.mark_imported()
 
 if __name__ == '__main__':
     cli(obj={})
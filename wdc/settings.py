@@ -1,2 +1,12 @@
 HOME_DIR = '.wdc'
 SETTINGS_FILE = 'settings.toml'
+SOCKET_FILE = 'wdc.sock'
+API_PORT = 8421
+
+# The groupings of the report command, kept here so that the command line is built without loading the report
+GROUP_BY_TAG = 'tag'
+GROUP_BY_DATE = 'date'
+GROUP_BY_WEEK = 'week'
+GROUP_BY_MONTH = 'month'
+GROUP_BY_YEAR = 'year'
+GROUPINGS = [GROUP_BY_TAG, GROUP_BY_DATE, GROUP_BY_WEEK, GROUP_BY_MONTH, GROUP_BY_YEAR]
@@ -1,9 +1,13 @@
 import re
 from datetime import datetime
+from functools import lru_cache, total_ordering
 from time import time
+from typing import Dict, Iterable, Iterator, List
 
 from wdc.exceptions import TimeFormatError, DateFormatError
 
+MINUTES_PER_DAY = 24 * 60
+
 
 def assert_time(time_str: str) -> None:
     if not is_time_valid(time_str):
@@ -27,6 +31,28 @@ def is_date_valid(date_str: str) -> bool:
     return re.match(r"(19|20)\d\d-(0[1-9]|1[012])-(0[1-9]|[12][0-9]|3[01])", date_str) is not None
 
 
+def is_month_valid(month_str: str) -> bool:
+    if month_str is None:
+        return False
+    return re.match(r"(19|20)\d\d(0[1-9]|1[012])$", month_str) is not None
+
+
+def months_in_range(date_from: str, date_to: str) -> Iterator[str]:
+    """
+    Lists the months (YYYYMM) overlapping the given date range
+
+    :param date_from: The first date of the range in the YYYY-MM-DD format
+    :param date_to: The last date of the range in the YYYY-MM-DD format
+    :return: The months in ascending order, nothing if the range is empty
+    """
+    year, month = int(date_from[0:4]), int(date_from[5:7])
+    last = (int(date_to[0:4]), int(date_to[5:7]))
+
+    while (year, month) <= last:
+        yield f'{year:04d}{month:02d}'
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
 def today() -> str:
     now = datetime.now()
     return now.strftime('%Y-%m-%d')
@@ -44,78 +70,143 @@ def timestamp() -> str:
     return str(int(time() * 1000))
 
 
+# The minute of the day of every valid time in the hhmm format and of the empty end time of open tasks,
+# bulk conversions can look the values up without a function call per value
+MINUTES_OF_DAY: Dict[str, int] = {f'{m // 60:02d}{m % 60:02d}': m for m in range(MINUTES_PER_DAY)}
+MINUTES_OF_DAY[''] = -1
+
+# Parsed dates are remembered, there are only a few thousand dates in any history
+_day_ordinals: Dict[str, int] = {}
+
+
+@lru_cache(maxsize=4096)
+def _parse_time(time: str) -> int:
+    if not is_time_valid(time):
+        raise ValueError("{0} must be between 0 and 2359".format(time))
+
+    return to_minute_of_day(time)
+
+
+def to_minute_of_day(time_str: str) -> int:
+    """
+    Converts a time in the hhmm format into the number of minutes since midnight
+
+    :param time_str: The time in the hhmm format
+    :return: The minute of the day or -1 for an empty string
+    """
+    minutes = MINUTES_OF_DAY.get(time_str)
+
+    if minutes is None:
+        minutes = int(time_str[0:2]) * 60 + int(time_str[2:4])
+
+    return minutes
+
+
+def from_minute_of_day(minutes: int) -> str:
+    return f'{minutes // 60:02d}{minutes % 60:02d}' if minutes >= 0 else ''
+
+
+def to_day_ordinal(date_str: str) -> int:
+    """
+    Converts a date in the YYYY-MM-DD format into its proleptic Gregorian ordinal
+
+    :param date_str: The date in the YYYY-MM-DD format
+    :return: The ordinal of the date, 1st of January of year 1 is 1
+    """
+    ordinal = _day_ordinals.get(date_str)
+
+    if ordinal is None:
+        ordinal = datetime.strptime(date_str, '%Y-%m-%d').toordinal()
+        _day_ordinals[date_str] = ordinal
+
+    return ordinal
+
+
+@total_ordering
 class WdcTime(object):
+    """
+    A time of the day stored as the number of minutes since midnight
+
+    Arithmetic wraps around midnight, there is no hour 24.
+    """
+    __slots__ = ('_minute_of_day',)
 
     def __init__(self, time):
-        if is_time_valid(time):
-            self.__rawTime = time
-        else:
-            raise ValueError("{0} must be between 0 and 2359".format(time))
+        self._minute_of_day = _parse_time(time)
+
+    @classmethod
+    def from_minutes(cls, minutes: int) -> 'WdcTime':
+        """
+        Creates a time from a number of minutes since midnight, the number is wrapped into a single day
+        """
+        time = cls.__new__(cls)
+        time._minute_of_day = minutes % MINUTES_PER_DAY
+        return time
+
+    @classmethod
+    def from_strings(cls, times: Iterable[str]) -> List['WdcTime']:
+        """
+        Creates a time for every given string in the hhmm format
+
+        :param times: The times in the hhmm format
+        :return: The times in the same order, a ValueError is raised for the first invalid one
+        """
+        # Parsed times are already within a day, so the objects are filled without going through __init__
+        new = cls.__new__
+        result = []
+        for minutes in map(_parse_time, times):
+            time = new(cls)
+            time._minute_of_day = minutes
+            result.append(time)
+
+        return result
 
     @staticmethod
     def now():
         now = datetime.now()
-        return WdcTime(f'{now.hour:02d}{now.minute:02d}')
+        return WdcTime.from_minutes(now.hour * 60 + now.minute)
+
+    @property
+    def minute_of_day(self) -> int:
+        return self._minute_of_day
 
     @property
     def minutes(self):
-        return self.__rawTime[2:4]
+        return f'{self._minute_of_day % 60:02d}'
 
     @property
     def hours(self):
-        return self.__rawTime[0:2]
+        return f'{self._minute_of_day // 60:02d}'
 
     def __add__(self, addend):
-        addend_minutes = int(addend.minutes)
-        addend_hours = int(addend.hours)
-
-        sum = WdcTime(self.__rawTime)
-        sum.add_minutes(addend_minutes)
-        sum.add_hours(addend_hours)
-
-        return sum
+        return WdcTime.from_minutes(self._minute_of_day + addend.minute_of_day)
 
     def add_hours(self, hours: int):
-        time_hours = int(self.hours)
-        new_hours = (time_hours + hours) % 24
-
-        # There is no hour 24 this is automatically converted to 00
-        if new_hours == "24":
-            new_hours = "00"
-        self.__rawTime = f"{new_hours:02d}{self.minutes}"
+        self._minute_of_day = (self._minute_of_day + hours * 60) % MINUTES_PER_DAY
         return self
 
     def add_minutes(self, minutes: int):
-        self_minutes = int(self.minutes)
-
-        new_minutes = (self_minutes + minutes) % 60
-        if new_minutes == "60":
-            new_minutes = "00"
-
-        self.__rawTime = f"{self.hours}{new_minutes:02d}"
-
-        # Carry the hour if the sum of minutes is more than 60
-        if (self_minutes + minutes) // 60 != 0:
-            self.add_hours((self_minutes + minutes) // 60)
+        self._minute_of_day = (self._minute_of_day + minutes) % MINUTES_PER_DAY
         return self
 
+    def __int__(self):
+        return self._minute_of_day
+
     def __hash__(self):
-        return int(self.hours) + int(self.minutes)
+        return self._minute_of_day
 
     def __str__(self):
-        return self.__rawTime
+        return from_minute_of_day(self._minute_of_day)
+
+    def __repr__(self):
+        return f'WdcTime({str(self)!r})'
 
     def __eq__(self, other):
-        return hash(self) == hash(other)
+        if not isinstance(other, WdcTime):
+            return NotImplemented
+        return self._minute_of_day == other._minute_of_day
 
     def __lt__(self, other):
-        return hash(self) < hash(other)
-
-    def __gt__(self, other):
-        return hash(self) > hash(other)
-
-    def __le__(self, other):
-        return hash(self) <= hash(other)
-
-    def __ge__(self, other):
-        return hash(self) >= hash(other)
+        if not isinstance(other, WdcTime):
+            return NotImplemented
+        return self._minute_of_day < other._minute_of_day